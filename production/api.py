@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+"""
+InspiroAI - Headless Inference API
+Serves the status / emotion / reach / best-time predictors over HTTP without
+Streamlit. Models load once per worker process, on the first request.
+
+Run locally:
+    python api.py                          # Flask dev server on config.API_PORT
+    gunicorn -w 4 -b 0.0.0.0:8000 api:app  # multi-worker
+
+Example:
+    curl -X POST localhost:8000/status -H "Content-Type: application/json" \
+         -d '{"caption": "Just finished my capstone project!"}'
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from flask import Flask, jsonify, request
+from werkzeug.exceptions import HTTPException
+
+import config
+from utils.inference import EmotionPredictor, StatusPredictor, ReachPredictor, predict_batch
+from utils.feature_engineering import predict_reach_for_hours
+from utils.best_time import find_best_posting_week
+from utils.reach_sweep import DAY_MAP
+
+
+class ApiError(Exception):
+    """Request validation error returned to the client as JSON"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class ModelHolder:
+    """Loads the registry and embedder once per process (thread-safe)"""
+
+    def __init__(self, model_registry=None, embedder=None):
+        self.model_registry = model_registry
+        self.embedder = embedder
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self.model_registry is None or self.embedder is None:
+            with self._lock:
+                if self.model_registry is None:
+                    from utils.model_loader import get_model_registry
+                    self.model_registry = get_model_registry(preload=config.PRELOAD_MODELS)
+                if self.embedder is None:
+                    from utils.model_loader import load_embedder
+                    # Concurrent requests share encode batches
+                    self.embedder = load_embedder(micro_batching=True)
+        return self.model_registry, self.embedder
+
+
+def _jsonable(obj):
+    """Convert NumPy / pandas values into plain JSON types"""
+    if isinstance(obj, dict):
+        return {str(k): _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _jsonable(obj.tolist())
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    return obj
+
+
+def _frame_records(frame):
+    """DataFrame (or predictor error dict) -> JSON-ready list of rows"""
+    if isinstance(frame, dict):
+        raise ApiError(frame.get("error", "Prediction failed"), 500)
+    return _jsonable(frame.to_dict(orient="records"))
+
+
+def _validate_caption(caption, field="caption"):
+    if not isinstance(caption, str) or not caption.strip():
+        raise ApiError(f"'{field}' must be a non-empty string")
+    if len(caption) > config.MAX_CAPTION_LENGTH:
+        raise ApiError(f"'{field}' exceeds {config.MAX_CAPTION_LENGTH} characters")
+    return caption
+
+
+def _json_body():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        raise ApiError("Request body must be a JSON object")
+    return payload
+
+
+def _read_caption():
+    return _validate_caption(_json_body().get("caption"))
+
+
+def _read_captions():
+    captions = _json_body().get("captions")
+    if not isinstance(captions, list) or not captions:
+        raise ApiError("'captions' must be a non-empty list of strings")
+    if len(captions) > config.API_MAX_BATCH_SIZE:
+        raise ApiError(f"At most {config.API_MAX_BATCH_SIZE} captions per request")
+    return [_validate_caption(c, field=f"captions[{i}]") for i, c in enumerate(captions)]
+
+
+def _result(result):
+    """Single-caption predictor dict -> JSON response"""
+    status_code = 500 if "error" in result else 200
+    return jsonify(_jsonable(result)), status_code
+
+
+def create_app(model_registry=None, embedder=None):
+    """Build the Flask app; pass preloaded models to skip lazy loading"""
+    app = Flask(__name__)
+    models = ModelHolder(model_registry, embedder)
+    app.config["MODELS"] = models
+
+    try:
+        from flask_cors import CORS
+        CORS(app, origins=config.CORS_ORIGINS)
+    except ImportError:
+        pass
+
+    @app.errorhandler(ApiError)
+    def handle_api_error(error):
+        return jsonify({"error": error.message}), error.status_code
+
+    @app.errorhandler(Exception)
+    def handle_unexpected_error(error):
+        # 404 / 405 / ... keep their status; anything else is a JSON 500, never Flask's HTML page
+        if isinstance(error, HTTPException):
+            return jsonify({"error": error.description}), error.code
+        print(f"[ERROR] {request.method} {request.path} failed: {error}")
+        return jsonify({"error": f"Prediction failed: {str(error)}"}), 500
+
+    @app.get("/health")
+    def health():
+        registry = models.model_registry
+        return jsonify({
+            "status": "ok",
+            "models_loaded": registry is not None,
+            "artifacts": sorted(
+                name for name in registry.artifact_names() if registry.is_loaded(name)
+            ) if registry is not None else [],
+        })
+
+    @app.get("/metrics")
+    def metrics():
+        """Embedding cache and micro-batching counters for this worker"""
+        embedder = models.embedder
+        layers = {}
+        while embedder is not None:
+            if callable(getattr(type(embedder), "stats", None)):
+                layers[type(embedder).__name__] = embedder.stats()
+            # Only wrappers define `inner`; the raw model would delegate it through __getattr__
+            embedder = embedder.inner if isinstance(getattr(type(embedder), "inner", None), property) else None
+        return jsonify(_jsonable(layers))
+
+    # ---------- single caption ----------
+    @app.post("/status")
+    def status():
+        caption = _read_caption()
+        registry, embedder = models.get()
+        return _result(StatusPredictor.predict(caption, embedder=embedder, model_registry=registry))
+
+    @app.post("/emotion")
+    def emotion():
+        caption = _read_caption()
+        registry, _ = models.get()
+        return _result(EmotionPredictor.predict(caption, model_registry=registry))
+
+    @app.post("/reach")
+    def reach():
+        caption = _read_caption()
+        registry, embedder = models.get()
+        return _result(ReachPredictor.predict(caption, embedder=embedder, model_registry=registry))
+
+    @app.post("/best-time")
+    def best_time():
+        payload = _json_body()
+        caption = _validate_caption(payload.get("caption"))
+        day = payload.get("day")
+        top_k = payload.get("top_k", 5)
+        if day is not None and day not in DAY_MAP:
+            raise ApiError(f"'day' must be one of {list(DAY_MAP)}")
+        if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+            raise ApiError("'top_k' must be a positive integer")
+
+        registry, embedder = models.get()
+        if day is None:
+            # Whole week: 168 slots in one model call
+            return jsonify(_jsonable(find_best_posting_week(caption, registry, embedder, top_k=top_k)))
+
+        hourly = predict_reach_for_hours(caption, day, embedder, registry)
+        ranked = sorted(hourly, key=lambda x: x[1], reverse=True)[:top_k]
+        return jsonify(_jsonable({
+            "day": day,
+            "hourly": [{"hour": h, "hour_str": s, "probability": p} for s, p, h in hourly],
+            "top_slots": [{"hour": h, "hour_str": s, "probability": p} for s, p, h in ranked],
+        }))
+
+    # ---------- batch ----------
+    @app.post("/status/batch")
+    def status_batch():
+        captions = _read_captions()
+        registry, embedder = models.get()
+        return jsonify({"results": _frame_records(
+            StatusPredictor.predict_batch(captions, embedder=embedder, model_registry=registry))})
+
+    @app.post("/emotion/batch")
+    def emotion_batch():
+        captions = _read_captions()
+        registry, _ = models.get()
+        return jsonify({"results": _frame_records(
+            EmotionPredictor.predict_batch(captions, model_registry=registry))})
+
+    @app.post("/reach/batch")
+    def reach_batch():
+        captions = _read_captions()
+        registry, embedder = models.get()
+        return jsonify({"results": _frame_records(
+            ReachPredictor.predict_batch(captions, embedder=embedder, model_registry=registry))})
+
+    @app.post("/best-time/batch")
+    def best_time_batch():
+        captions = _read_captions()
+        registry, embedder = models.get()
+        return jsonify({"results": [
+            _jsonable(find_best_posting_week(c, registry, embedder)) for c in captions
+        ]})
+
+    @app.post("/predict/batch")
+    def all_batch():
+        captions = _read_captions()
+        registry, embedder = models.get()
+        return jsonify({"results": _frame_records(predict_batch(captions, embedder, registry))})
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    app.run(host=config.API_HOST, port=config.API_PORT, debug=config.DEBUG, threaded=True)
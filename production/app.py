@@ -37,68 +37,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# ============================================
-# AUTO-REFRESH FOR SCHEDULED POSTS
-# ============================================
-# Check if there are pending posts and auto-refresh
-if 'check_interval' not in st.session_state:
-    st.session_state.check_interval = 0
-
-st.session_state.check_interval += 1
-
-# Check pending posts FIRST, before rendering anything (ON EVERY RENDER)
-try:
-    pending_posts = [p for p in st.session_state.get('scheduled_posts', []) if p.get('status') == 'Pending']
-    
-    if pending_posts:
-        from datetime import datetime
-        now = datetime.now()
-        posted_any = False
-        
-        for post in pending_posts:
-            scheduled_dt = post.get('scheduled_dt')
-            if scheduled_dt and scheduled_dt <= now:
-                # Time to post!
-                try:
-                    from utils.facebook_posting import FacebookPoster
-                    fb_token = st.session_state.get('fb_token', '')
-                    fb_page_id = st.session_state.get('fb_page_id', '')
-                    
-                    if fb_token and fb_page_id:
-                        poster = FacebookPoster(page_token=fb_token, page_id=fb_page_id)
-                        success, result = poster.publish_post(message=post['caption'])
-                        
-                        if success:
-                            post['status'] = 'Posted'
-                            post['posted_at'] = now
-                            post['post_id'] = result.get('post_id', 'unknown')
-                            posted_any = True
-                        else:
-                            post['status'] = 'Failed'
-                            post['error'] = result.get('error', 'Unknown error')
-                            posted_any = True
-                except Exception as e:
-                    post['status'] = 'Failed'
-                    post['error'] = str(e)
-                    posted_any = True
-        
-        # Refresh UI immediately if any post was updated
-        if posted_any:
-            from utils.post_storage import PostStorage
-            PostStorage.save_posts(st.session_state.scheduled_posts)
-            st.rerun()
-except:
-    pass
-
-# Auto-rerun every 1 second if there are pending posts
-try:
-    pending_posts = [p for p in st.session_state.get('scheduled_posts', []) if p.get('status') == 'Pending']
-    if pending_posts:
-        time.sleep(1)
-        st.rerun()
-except:
-    pass
-
 # ============================================
 # CUSTOM STYLING
 # ============================================
@@ -374,17 +312,24 @@ st.markdown("""
 @st.cache_resource
 def load_models():
     try:
-        from utils.model_loader import get_model_registry
-        from sentence_transformers import SentenceTransformer
+        import config
+        from utils.model_loader import get_model_registry, load_embedder
         
         print("[INFO] Loading models...")
-        registry = get_model_registry()
+        registry = get_model_registry(preload=config.PRELOAD_MODELS)
         print(f"[OK] Model registry loaded - status_rf: {registry.status_rf is not None}")
         
         print("[INFO] Loading embedder...")
-        embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        embedder = load_embedder()
         print(f"[OK] Embedder loaded: {embedder is not None}")
         
+        if config.WARM_EMOTION_ENGINE:
+            # Pay the transformer cold start here instead of on the first Analyze click
+            try:
+                print(f"[INFO] Warming emotion engine: {registry.emotion_engine.warmup()}")
+            except Exception as e:
+                print(f"[WARN] Emotion engine warmup failed: {e}")
+        
         if registry.status_rf is None:
             print("[ERROR] Status RF model not loaded!")
             return None, None, False
@@ -415,10 +360,10 @@ if not models_loaded:
 # ============================================
 # INITIALIZE PERSISTENT STORAGE
 # ============================================
-# Load scheduled posts from persistent storage at app startup (BEFORE anything else)
-if 'scheduled_posts' not in st.session_state:
-    from utils.post_storage import PostStorage
-    st.session_state.scheduled_posts = PostStorage.load_posts()
+# Scheduled posts are published by scheduler_daemon.py; the UI re-reads storage
+# on every render so it always shows the daemon's latest status changes
+from utils.post_storage import PostStorage
+st.session_state.scheduled_posts = PostStorage.load_posts()
 
 # ============================================
 # SIDEBAR - AUTHENTICATION
@@ -693,7 +638,7 @@ with tab1:
                 
                 # Get predictions - emotion now uses pretrained transformer
                 status_result = StatusPredictor.predict(caption, embedder=embedder, model_registry=model_registry)
-                emotion_result = EmotionPredictor.predict(caption)  # No model_registry needed - uses transformer
+                emotion_result = EmotionPredictor.predict(caption, model_registry=model_registry)  # Shared transformer engine
                 
                 # Check for errors
                 has_error = False
@@ -918,6 +863,7 @@ with tab2:
             
             with col3:
                 suggest_btn = st.button("Suggest Best Time", use_container_width=True, key="suggest_btn")
+                week_btn = st.button("Full Week Heatmap", use_container_width=True, key="week_btn")
         
         if suggest_btn:
             # ML-based reach prediction for each hour
@@ -1010,6 +956,46 @@ with tab2:
                     except Exception as e:
                         st.error(f"❌ Reach prediction error: {str(e)}")
                         st.info("Please ensure all models are loaded correctly")
+        
+        if week_btn:
+            # All 7 days x 24 hours scored in one batched model call
+            if not caption:
+                st.error("❌ Please enter a caption to analyze")
+            else:
+                st.markdown("---")
+                st.subheader("📅 Weekly Reach Heatmap")
+                
+                from utils.best_time import find_best_posting_week
+                
+                with st.spinner("🔮 Scoring every hour of the week..."):
+                    try:
+                        week = find_best_posting_week(caption, model_registry, embedder, top_k=5)
+                        
+                        try:
+                            import plotly.graph_objects as go
+                            fig = go.Figure(go.Heatmap(
+                                z=week["grid"],
+                                x=[f"{h:02d}:00" for h in week["hours"]],
+                                y=week["days"],
+                                colorscale="Purples",
+                                zmin=0.0,
+                                zmax=1.0,
+                                hovertemplate="%{y} %{x}<br>Reach: %{z:.1%}<extra></extra>",
+                            ))
+                            fig.update_layout(height=360, margin=dict(l=10, r=10, t=10, b=10), yaxis=dict(autorange="reversed"))
+                            st.plotly_chart(fig, use_container_width=True)
+                        except ImportError:
+                            import pandas as pd
+                            grid_df = pd.DataFrame(week["grid"], index=week["days"], columns=[f"{h:02d}:00" for h in week["hours"]])
+                            st.dataframe(grid_df.style.format("{:.1%}"), use_container_width=True)
+                        
+                        st.markdown("**🏆 Top Posting Slots**")
+                        for rank, slot in enumerate(week["top_slots"], 1):
+                            st.write(f"{rank}. **{slot['day']} {slot['hour_str']}** - Reach Score: {slot['probability']:.1%}")
+                    
+                    except Exception as e:
+                        st.error(f"❌ Reach prediction error: {str(e)}")
+                        st.info("Please ensure all models are loaded correctly")
 
 
 # ============================================
@@ -1109,13 +1095,12 @@ with tab3:
                 st.error("Cannot schedule post in the past. Please select a future date/time.")
             else:
                 # Create scheduled post entry WITHOUT posting immediately
-                post_id = len(st.session_state.scheduled_posts) + 1
                 time_diff = scheduled_dt - now
                 hours = time_diff.total_seconds() / 3600
                 minutes = (time_diff.total_seconds() % 3600) / 60
                 
                 scheduled_post = {
-                    'id': post_id,
+                    'id': None,  # Assigned by the storage backend on insert
                     'caption': schedule_caption,
                     'date': str(schedule_date),
                     'time': str(schedule_time),
@@ -1123,28 +1108,30 @@ with tab3:
                     'created_at': now,
                     'posted_at': None,
                     'post_id': None,
-                    'status': 'Pending'  # Will be posted when time arrives
+                    'page_id': fb_page_id,
+                    'status': 'Pending'  # Published by scheduler_daemon.py when time arrives
                 }
-                st.session_state.scheduled_posts.append(scheduled_post)
-                
-                # Save to persistent storage
-                from utils.post_storage import PostStorage
-                PostStorage.save_posts(st.session_state.scheduled_posts)
                 
-                # Show confirmation that post is scheduled
-                st.success(f"✅ Post scheduled successfully!")
-                st.info(f"📅 Scheduled for: {schedule_date} at {schedule_time}")
-                st.info(f"⏱️ Time remaining: {int(hours)}h {int(minutes)}m")
-                st.info(f"📝 Caption: {schedule_caption[:80]}...")
-                
-                # Show confirmation details
-                st.markdown("---")
-                st.markdown("### Scheduled Post Details")
-                st.write(f"**Status:** Pending - Will post automatically at scheduled time")
-                st.write(f"**Date:** {schedule_date}")
-                st.write(f"**Time:** {schedule_time}")
-                st.write(f"**Caption:** {schedule_caption}")
-                st.write(f"**Facebook Page:** {fb_page_id}")
+                # Save to persistent storage (the daemon picks it up from there)
+                if not PostStorage.add_post(scheduled_post, return_posts=False):
+                    st.error("❌ Could not save the scheduled post - please try again")
+                else:
+                    st.session_state.scheduled_posts.append(scheduled_post)
+                    
+                    # Show confirmation that post is scheduled
+                    st.success(f"✅ Post scheduled successfully!")
+                    st.info(f"📅 Scheduled for: {schedule_date} at {schedule_time}")
+                    st.info(f"⏱️ Time remaining: {int(hours)}h {int(minutes)}m")
+                    st.info(f"📝 Caption: {schedule_caption[:80]}...")
+                    
+                    # Show confirmation details
+                    st.markdown("---")
+                    st.markdown("### Scheduled Post Details")
+                    st.write(f"**Status:** Pending - Will post automatically at scheduled time (requires `scheduler_daemon.py` running)")
+                    st.write(f"**Date:** {schedule_date}")
+                    st.write(f"**Time:** {schedule_time}")
+                    st.write(f"**Caption:** {schedule_caption}")
+                    st.write(f"**Facebook Page:** {fb_page_id}")
 
     
     # Show all scheduled posts and check if any need to be posted
@@ -1155,6 +1142,10 @@ with tab3:
         # Import for displaying posts
         from utils.scheduler import ScheduledPostManager
         
+        st.caption("Posts are published by the background scheduler (`python scheduler_daemon.py`).")
+        if st.button("🔄 Refresh status", key="refresh_scheduled_posts"):
+            st.rerun()
+        
         # Display all scheduled posts
         for post in st.session_state.scheduled_posts:
             status = post.get('status', 'Pending')
@@ -1191,9 +1182,7 @@ with tab3:
                 
                 with col2:
                     if st.button(f"Delete", key=f"delete_post_{post['id']}", use_container_width=True):
-                        from utils.post_storage import PostStorage
-                        st.session_state.scheduled_posts = [p for p in st.session_state.scheduled_posts if p['id'] != post['id']]
-                        PostStorage.save_posts(st.session_state.scheduled_posts)
+                        PostStorage.delete_post(post['id'], return_posts=False)
                         st.rerun()
 
 
@@ -0,0 +1,1105 @@
+#!/usr/bin/env python
+"""
+InspiroAI micro-benchmarks
+Run from the production folder:
+
+    python benchmark.py                # list available benchmarks
+    python benchmark.py reach-features # run one benchmark
+"""
+
+import os
+import sys
+import time
+import threading
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+
+def _time_it(fn, repeat=50, warmup=3):
+    """Median wall time of fn() in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+def _header(title):
+    print("=" * 80)
+    print(title)
+    print("=" * 80)
+
+
+def _require(ok, message):
+    """Exit non-zero when a parity check fails (timings of a wrong result mean nothing)"""
+    if not ok:
+        print(f"\n❌ {message}")
+        sys.exit(1)
+
+
+def _load_registry():
+    from utils.model_loader import get_model_registry
+    return get_model_registry()
+
+
+# ============================================
+# REACH FEATURE ASSEMBLY: sparse hstack vs dense buffer
+# ============================================
+def bench_reach_features(args):
+    from scipy import sparse
+    from utils.feature_assembler import ReachFeatureAssembler
+
+    _header("REACH FEATURES: scipy.sparse hstack vs preallocated dense buffer")
+    registry = _load_registry()
+    num_cols = registry.reach_meta.get("num_cols")
+    rng = np.random.RandomState(42)
+    assembler = ReachFeatureAssembler(num_cols, embedding_dim=384)
+
+    for n_rows in (1, 24, 168):
+        emb = rng.rand(1, 384).astype(np.float32)
+        num_scaled = registry.reach_scaler.transform(rng.rand(n_rows, len(num_cols)))
+
+        def sparse_path():
+            return sparse.hstack([
+                sparse.csr_matrix(np.repeat(emb, n_rows, axis=0)),
+                sparse.csr_matrix((n_rows, 0)),
+                sparse.csr_matrix(num_scaled),
+            ], format="csr")
+
+        def dense_path():
+            return assembler.assemble(emb, num_scaled)
+
+        X_sparse, X_dense = sparse_path(), dense_path()
+        p_sparse = registry.reach_model.predict_proba(X_sparse)[:, 1]
+        p_dense = registry.reach_model.predict_proba(X_dense)[:, 1]
+
+        t_sparse = _time_it(sparse_path, repeat=args.repeat)
+        t_dense = _time_it(dense_path, repeat=args.repeat)
+        t_sparse_e2e = _time_it(lambda: registry.reach_model.predict_proba(sparse_path()), repeat=args.repeat)
+        t_dense_e2e = _time_it(lambda: registry.reach_model.predict_proba(dense_path()), repeat=args.repeat)
+
+        print(f"\nrows={n_rows}")
+        print(f"   assemble   sparse {t_sparse:8.3f} ms | dense {t_dense:8.3f} ms | {t_sparse / t_dense:5.1f}x")
+        print(f"   + predict  sparse {t_sparse_e2e:8.3f} ms | dense {t_dense_e2e:8.3f} ms | {t_sparse_e2e / t_dense_e2e:5.1f}x")
+        print(f"   max |prob diff| = {np.abs(p_sparse - p_dense).max():.2e}")
+
+
+# ============================================
+# MMAP MODEL LOADING: per-process memory across workers
+# ============================================
+def _read_smaps_rollup():
+    """Rss / Pss / private memory of this process in bytes (Linux only)"""
+    fields = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def _mmap_worker(mmap_mode, models_dir, loaded, release, results):
+    import io
+    import contextlib
+    # Import the heavy libraries first so only model data is measured
+    import joblib, sklearn, xgboost, catboost, lightgbm  # noqa: F401
+    from utils.model_loader import ModelRegistry
+
+    before = _read_smaps_rollup()
+    with contextlib.redirect_stdout(io.StringIO()):
+        registry = ModelRegistry(models_dir, mmap_mode=mmap_mode or False, use_bundles=False)
+        registry.preload()
+
+    loaded.wait()  # every worker has loaded -> shared pages are now shared
+    after = _read_smaps_rollup()
+    results.put({key: after[key] - before[key] for key in after})
+    release.wait()
+
+
+def bench_mmap_rss(args):
+    import multiprocessing as mp
+
+    _header(f"MODEL MEMORY PER PROCESS: {args.workers} workers, private copies vs mmap_mode='r'")
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("❌ /proc/self/smaps_rollup not available - this report needs Linux")
+        return
+
+    models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+    ctx = mp.get_context("spawn")
+    report = {}
+
+    for mode in (None, "r"):
+        loaded = ctx.Barrier(args.workers + 1)
+        release = ctx.Event()
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(target=_mmap_worker, args=(mode, models_dir, loaded, release, results))
+            for _ in range(args.workers)
+        ]
+        for p in procs:
+            p.start()
+        loaded.wait()
+        rows = [results.get() for _ in procs]
+        release.set()
+        for p in procs:
+            p.join()
+
+        report[mode] = {key: np.mean([row[key] for row in rows]) for key in rows[0]}
+
+    mb = 1024 * 1024
+    print(f"\n{'mode':<10}{'RSS delta':>14}{'PSS delta':>14}{'private delta':>16}")
+    for mode, row in report.items():
+        print(f"{str(mode):<10}{row['rss'] / mb:>11.1f} MB{row['pss'] / mb:>11.1f} MB{row['private'] / mb:>13.1f} MB")
+
+    saved = report[None]["private"] - report["r"]["private"]
+    print(f"\nPrivate memory saved per worker: {saved / mb:.1f} MB "
+          f"({saved * args.workers / mb:.1f} MB across {args.workers} workers)")
+    print("Note: sklearn trees copy node arrays on unpickle and XGBoost/CatBoost keep")
+    print("      their own buffers, so only raw NumPy arrays (scalers, linear models) are shared.")
+
+
+# ============================================
+# HTTP API LOAD TEST (start api.py first)
+# ============================================
+def bench_api_load(args):
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+
+    endpoint = args.url.rstrip("/") + "/" + args.endpoint.lstrip("/")
+    _header(f"API LOAD TEST: {args.requests} requests to {endpoint}, concurrency {args.concurrency}")
+
+    captions = [
+        "Just finished my capstone project, so proud of the team!",
+        "AMAZING opportunity!!! DM me for details #success #goals",
+        "Quiet morning coffee before a long day of classes",
+        "Grateful for every mentor who believed in me 🙏",
+    ]
+    session = requests.Session()
+
+    def one(i):
+        caption = f"{captions[i % len(captions)]} #{i}"
+        body = {"captions": [caption] * args.batch} if args.endpoint.endswith("/batch") else {"caption": caption}
+        start = time.perf_counter()
+        response = session.post(endpoint, json=body, timeout=60)
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+    session.post(endpoint, json={"captions": captions} if args.endpoint.endswith("/batch") else {"caption": captions[0]}, timeout=300)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([ms for ms, _ in results])
+    errors = sum(1 for _, code in results if code != 200)
+    print(f"\nthroughput  {args.requests / elapsed:8.1f} req/s")
+    print(f"latency p50 {np.percentile(latencies, 50):8.1f} ms")
+    print(f"latency p95 {np.percentile(latencies, 95):8.1f} ms")
+    print(f"latency p99 {np.percentile(latencies, 99):8.1f} ms")
+    print(f"errors      {errors:8d}")
+
+
+# ============================================
+# EMBEDDER MICRO-BATCHING: concurrent single encodes vs shared batches
+# ============================================
+def bench_embed_batching(args):
+    from concurrent.futures import ThreadPoolExecutor
+    from sentence_transformers import SentenceTransformer
+    import config
+    from utils.embedding_batcher import EmbeddingBatcher
+
+    _header(f"EMBEDDER: {args.requests} single-caption encodes, concurrency {args.concurrency}")
+    model = SentenceTransformer(config.EMBEDDER_MODEL, device=config.EMBEDDER_DEVICE)
+    batcher = EmbeddingBatcher(model)
+    captions = [f"Caption number {i} about campus life and big goals #{i}" for i in range(args.requests)]
+    lock = threading.Lock()
+
+    def direct(caption):
+        # SentenceTransformer is not safe to call concurrently - serialize like a shared worker would
+        with lock:
+            return model.encode([caption], convert_to_numpy=True)
+
+    def batched(caption):
+        return batcher.encode([caption], convert_to_numpy=True)
+
+    for name, fn in (("direct", direct), ("batched", batched)):
+        fn(captions[0])
+        latencies = []
+
+        def timed(caption):
+            start = time.perf_counter()
+            fn(caption)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(timed, captions))
+        elapsed = time.perf_counter() - start
+        print(f"\n{name}")
+        print(f"   throughput  {args.requests / elapsed:8.1f} captions/s")
+        print(f"   latency p50 {np.percentile(latencies, 50):8.1f} ms | p95 {np.percentile(latencies, 95):8.1f} ms")
+
+    stats = batcher.stats()
+    print(f"\nbatches {stats['batches']} | avg batch size {stats['avg_batch_size']:.1f}")
+    print(f"batch size histogram  {stats['batch_size_hist']}")
+    print(f"queue depth histogram {stats['queue_depth_hist']}")
+
+    a = model.encode(captions[:8], convert_to_numpy=True)
+    b = np.vstack([batcher.encode([c]) for c in captions[:8]])
+    print(f"max |embedding diff| = {np.abs(a - b).max():.2e}")
+    batcher.close()
+
+
+# ============================================
+# DUE POSTS: linear scan vs DueIndex heap
+# ============================================
+def bench_due_index(args):
+    from datetime import datetime, timedelta
+    from utils.due_index import DueIndex
+
+    _header("DUE POSTS: linear scan per tick vs DueIndex (heap)")
+    rng = np.random.RandomState(42)
+    now = datetime(2025, 1, 1, 12, 0)
+
+    for n_posts in (10_000, 100_000, 1_000_000):
+        offsets = rng.randint(-3600, 30 * 24 * 3600, size=n_posts)
+        posts = [
+            {"id": i, "status": "Pending", "scheduled_dt": now + timedelta(seconds=int(off))}
+            for i, off in enumerate(offsets)
+        ]
+        repeat = max(3, args.repeat // (n_posts // 10_000))
+
+        start = time.perf_counter()
+        index = DueIndex.from_posts(posts)
+        t_build = (time.perf_counter() - start) * 1000
+
+        def scan():
+            return [p["id"] for p in posts if p["status"] == "Pending" and p["scheduled_dt"] <= now]
+
+        t_scan = _time_it(scan, repeat=repeat, warmup=1)
+        due = scan()
+
+        # pop_due removes what it returns, so it is timed once
+        start = time.perf_counter()
+        popped = index.pop_due(now)
+        t_pop = (time.perf_counter() - start) * 1000
+        assert sorted(popped) == sorted(due)
+
+        ids = rng.choice(np.arange(len(due), n_posts), size=1000, replace=False)
+        start = time.perf_counter()
+        for post_id in ids:
+            index.reschedule(int(post_id), now + timedelta(days=1))
+        t_resched = (time.perf_counter() - start) * 1e6 / len(ids)
+        start = time.perf_counter()
+        for post_id in ids:
+            index.cancel(int(post_id))
+        t_cancel = (time.perf_counter() - start) * 1e6 / len(ids)
+        start = time.perf_counter()
+        for post_id in ids:
+            index.add(int(post_id), now + timedelta(hours=1))
+        t_add = (time.perf_counter() - start) * 1e6 / len(ids)
+
+        print(f"\nposts={n_posts:,} (k={len(due)} due)")
+        print(f"   linear scan per tick   {t_scan:10.3f} ms")
+        print(f"   DueIndex pop_due       {t_pop:10.3f} ms | {t_scan / max(t_pop, 1e-6):8.0f}x")
+        print(f"   DueIndex build (once)  {t_build:10.3f} ms")
+        print(f"   add {t_add:6.2f} us | reschedule {t_resched:6.2f} us | cancel {t_cancel:6.2f} us")
+
+
+# ============================================
+# POST STORAGE: per-update cost of each backend
+# ============================================
+def bench_post_storage(args):
+    import tempfile
+    from datetime import datetime, timedelta
+    from utils.post_storage import JsonPostStore
+    from utils.sqlite_post_store import SqlitePostStore
+    from utils.journal_post_store import JournalPostStore
+
+    _header("POST STORAGE: status update latency (json rewrite vs sqlite row vs journal append)")
+    now = datetime(2025, 1, 1, 12, 0)
+    n_updates = 200
+
+    for n_posts in (1_000, 10_000):
+        posts = [
+            {"id": i, "caption": f"Scheduled caption number {i} #campus", "scheduled_dt": now + timedelta(minutes=i),
+             "created_at": now, "posted_at": None, "post_id": None, "page_id": "1", "status": "Pending"}
+            for i in range(1, n_posts + 1)
+        ]
+        print(f"\nposts={n_posts:,}, {n_updates} updates")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            stores = {
+                "json": JsonPostStore(os.path.join(tmp, "posts.json")),
+                "sqlite": SqlitePostStore(os.path.join(tmp, "posts.db")),
+                "journal (fsync always)": JournalPostStore(
+                    os.path.join(tmp, "snap.json"), os.path.join(tmp, "posts.jsonl"), fsync="always"),
+                "journal (fsync never)": JournalPostStore(
+                    os.path.join(tmp, "snap2.json"), os.path.join(tmp, "posts2.jsonl"), fsync="never"),
+            }
+            for name, store in stores.items():
+                store.save_posts(posts)
+                start = time.perf_counter()
+                for post in posts[:n_updates]:
+                    updated = dict(post, status="Posted", posted_at=now, post_id=f"page_{post['id']}")
+                    store.update_post(post["id"], updated)
+                per_update = (time.perf_counter() - start) * 1000 / n_updates
+                assert store.get_post(posts[0]["id"])["status"] == "Posted"
+                print(f"   {name:<24}{per_update:10.3f} ms / update")
+
+
+# ============================================
+# GRAPH CLIENT: local stub Graph server
+# ============================================
+def start_graph_stub(fail_first=0, error_code=17, usage_pct=10, latency=0.0, batch_error=None):
+    """
+    Serve a minimal Graph API on 127.0.0.1 (random port) in a background thread
+
+    POST /<version>/<page_id>/feed returns {"id": "<page_id>_<n>"}; the first
+    `fail_first` requests to page 999 get Graph error `error_code`. Every
+    request is delayed by `latency` seconds to mimic a remote server.
+    POST /<version>/ with a `batch` form field answers each operation like
+    the feed endpoint, or fails the whole batch with HTTP status `batch_error`.
+    Returns (server, base_url, state) - state["count"] is the number of feed posts created.
+    """
+    import json
+    import threading
+    from urllib.parse import parse_qs
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    state = {"count": 0, "flaky": 0}
+    lock = threading.Lock()
+
+    class GraphStub(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, body):
+            raw = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.send_header("X-App-Usage", json.dumps({"call_count": usage_pct, "total_cputime": 1, "total_time": 1}))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def _feed(self, page_id):
+            """(status, body) for one feed post"""
+            with lock:
+                state["count"] += 1
+                n = state["count"]
+                if page_id == "999":
+                    state["flaky"] += 1
+                    if state["flaky"] <= fail_first:
+                        return 400, {"error": {"message": "Rate limited", "code": error_code, "type": "OAuthException"}}
+            return 200, {"id": f"{page_id}_{n}"}
+
+        def do_POST(self):
+            raw = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+            time.sleep(latency)
+            parts = self.path.strip("/").split("/")
+            if len(parts) == 1:
+                if batch_error:
+                    return self._reply(batch_error, {"error": {"message": "Batch failed", "code": 1 if batch_error >= 500 else 190}})
+                operations = json.loads(parse_qs(raw)["batch"][0])
+                responses = []
+                for op in operations:
+                    status, body = self._feed(op["relative_url"].split("/")[0])
+                    responses.append({"code": status, "headers": [], "body": json.dumps(body)})
+                return self._reply(200, responses)
+            self._reply(*self._feed(parts[1]))
+
+        def do_GET(self):
+            self._reply(200, {"id": "me"})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GraphStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v18.0", state
+
+
+def bench_graph_client(args):
+    import requests
+    from utils.graph_client import GraphClient
+    from utils.facebook_posting import FacebookPoster
+    from utils.rate_limiter import KeyedRateLimiter
+
+    _header(f"GRAPH CLIENT: {args.requests} feed posts against a local stub server")
+    server, base_url, _ = start_graph_stub(fail_first=2)
+    token = "x" * 120
+
+    def bare():
+        requests.post(f"{base_url}/123/feed", data={"message": "hi", "access_token": token}, timeout=15)
+
+    client = GraphClient(base_url=base_url)
+    unlimited = KeyedRateLimiter(rate=1e9, capacity=1e9)
+    poster = FacebookPoster(page_token=token, page_id="123", client=client, rate_limiter=unlimited)
+
+    def pooled():
+        ok, _ = poster.publish_post("hi")
+        assert ok
+
+    t_bare = _time_it(bare, repeat=args.requests)
+    t_pooled = _time_it(pooled, repeat=args.requests)
+    print(f"\nnew connection per post  {t_bare:8.3f} ms")
+    print(f"pooled keep-alive client {t_pooled:8.3f} ms | {t_bare / t_pooled:5.1f}x")
+
+    flaky = FacebookPoster(page_token=token, page_id="999", rate_limiter=unlimited,
+                           client=GraphClient(base_url=base_url, backoff_base=0.01))
+    ok, result = flaky.publish_post("retry me")
+    print(f"\nerror 17 twice, then success -> ok={ok}, post_id={result.get('post_id')}, "
+          f"retries={flaky.client.retries}")
+    server.shutdown()
+
+
+def bench_bulk_publish(args):
+    from datetime import datetime
+    from utils.graph_client import GraphClient
+    from utils.facebook_posting import FacebookPoster
+    from utils.rate_limiter import KeyedRateLimiter
+    from utils.scheduler import ScheduledPostManager
+
+    n_pages = 8
+    _header(f"BULK PUBLISH: {args.requests} due posts across {n_pages} pages, 100 ms stub latency")
+    server, base_url, _ = start_graph_stub(latency=0.1)
+    client = GraphClient(base_url=base_url)
+    token = "x" * 120
+    unlimited = KeyedRateLimiter(rate=1e9, capacity=1e9)
+    posters = {str(1000 + p): FacebookPoster(page_token=token, page_id=str(1000 + p), client=client,
+                                             rate_limiter=unlimited)
+               for p in range(n_pages)}
+
+    def make_posts():
+        return [{"id": i, "caption": f"Campaign post {i}", "status": "Pending",
+                 "scheduled_dt": datetime.now(), "page_id": str(1000 + i % n_pages)}
+                for i in range(args.requests)]
+
+    def poster_for(post):
+        return posters[post["page_id"]]
+
+    posts = make_posts()
+    start = time.perf_counter()
+    for post in posts:
+        ScheduledPostManager.publish(post, poster_for(post))
+    t_serial = time.perf_counter() - start
+
+    posts = make_posts()
+    start = time.perf_counter()
+    report = ScheduledPostManager.publish_bulk(posts, poster_for)
+    t_bulk = time.perf_counter() - start
+
+    ok = sum(row["success"] for row in report)
+    print(f"\nserial publish   {t_serial:8.2f} s")
+    print(f"publish_bulk     {t_bulk:8.2f} s | {t_serial / t_bulk:5.1f}x  ({ok}/{len(report)} ok)")
+    print(f"per-post latency p50 {np.percentile([r['elapsed_ms'] for r in report], 50):.0f} ms")
+    server.shutdown()
+
+
+def bench_batch_publish(args):
+    from utils.graph_client import GraphClient
+    from utils.facebook_posting import FacebookPoster
+    from utils.rate_limiter import KeyedRateLimiter
+
+    _header(f"BATCH PUBLISH: {args.requests} posts, one request each vs Graph batch (50 per call)")
+    server, base_url, _ = start_graph_stub(latency=0.05, fail_first=10 ** 9, error_code=100)
+    client = GraphClient(base_url=base_url, max_retries=0)
+    unlimited = KeyedRateLimiter(rate=1e9, capacity=1e9)
+    poster = FacebookPoster(page_token="x" * 120, page_id="1000", client=client, rate_limiter=unlimited)
+    posts = [{"message": f"Launch post {i}", "page_id": str(1000 + i % 5)} for i in range(args.requests)]
+    posts.append({"message": "goes to the flaky page", "page_id": "999"})
+    posts.append({"message": "   "})
+
+    start = time.perf_counter()
+    single = [FacebookPoster(poster.page_token, p.get("page_id") or "1000", client=client, rate_limiter=unlimited)
+              .publish_post(p["message"]) for p in posts]
+    t_single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = poster.publish_batch(posts)
+    t_batch = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"\nindividual posts {t_single:8.2f} s ({len(posts)} HTTP calls)")
+    print(f"publish_batch    {t_batch:8.2f} s ({(len(posts) + 49) // 50} HTTP calls) | {t_single / t_batch:5.1f}x")
+    print(f"success pattern identical: {[ok for ok, _ in single] == [ok for ok, _ in batched]}")
+    print(f"sub-response error mapped: {batched[-2][1].get('error')}")
+
+    for status in (400, 500):
+        server, base_url, state = start_graph_stub(batch_error=status)
+        outcome = FacebookPoster(page_token="x" * 120, page_id="1000", rate_limiter=unlimited,
+                                 client=GraphClient(base_url=base_url, max_retries=0)).publish_batch(posts[:3])
+        server.shutdown()
+        codes = sorted({str(result.get('error_code')) for ok, result in outcome if not ok}) or ["-"]
+        print(f"batch-level HTTP {status} -> {state['count']} individual resends, "
+              f"{sum(ok for ok, _ in outcome)}/3 ok, error codes {', '.join(codes)}")
+
+
+# ============================================
+# KEYED RATE LIMITER: shared SQLite budget across processes
+# ============================================
+def _limiter_worker(db_path, seconds, results):
+    from utils.rate_limiter import KeyedRateLimiter, SqliteBucketStore
+    limiter = KeyedRateLimiter(rate=20, capacity=10, store=SqliteBucketStore(db_path))
+    keys = KeyedRateLimiter.keys_for(page_id="123", access_token="shared-token")
+    granted, deadline = 0, time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if limiter.try_acquire(keys):
+            granted += 1
+        else:
+            time.sleep(0.001)
+    results.put(granted)
+
+
+def bench_rate_limiter(args):
+    import tempfile
+    import multiprocessing as mp
+    from utils.rate_limiter import KeyedRateLimiter
+
+    seconds = 2.0
+    _header(f"RATE LIMITER: {args.workers} processes sharing one 20 req/s budget (burst 10) for {seconds:.0f}s")
+    limiter = KeyedRateLimiter(rate=1e9, capacity=1e9)
+    keys = KeyedRateLimiter.keys_for(page_id="123", access_token="t")
+    print(f"\nmemory try_acquire  {_time_it(lambda: limiter.try_acquire(keys), repeat=10000) * 1000:8.2f} us")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "limits.db")
+        ctx = mp.get_context("spawn")
+        results = ctx.Queue()
+        procs = [ctx.Process(target=_limiter_worker, args=(db_path, seconds, results)) for _ in range(args.workers)]
+        for p in procs:
+            p.start()
+        granted = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+    allowed = 10 + 20 * seconds
+    print(f"sqlite shared store granted {sum(granted)} requests (per worker {granted}); "
+          f"budget allows ~{allowed:.0f} (+ startup skew)")
+
+
+# ============================================
+# CAPTION FEATURES: single-pass extractor vs the original per-feature scans
+# ============================================
+def _legacy_style_features(caption):
+    """Style features exactly as engineer_status/reach_features computed them before caption_features"""
+    import re
+    words = caption.split()
+    return {
+        "char_count": len(caption),
+        "word_count": len(words),
+        "avg_word_len": np.mean([len(w) for w in words]) if len(words) > 0 else 0.0,
+        "num_emojis": len(re.findall(r'[\U00010000-\U0010ffff]', str(caption))),
+        "has_hashtag": 1 if "#" in caption else 0,
+        "punctuation_count": len(re.findall(r'[!?]', caption)),
+        "has_links": 1 if re.search(r'http|www', caption) else 0,
+        "num_hashtags": len(re.findall(r'#', caption)),
+        "num_mentions": len(re.findall(r'@', caption)),
+        "uppercase_ratio": sum(1 for c in caption if c.isupper()) / len(caption) if len(caption) > 0 else 0.0,
+    }
+
+
+def _legacy_clean_text_basic(text):
+    import re
+    t = re.sub(r'http\S+', '', str(text))
+    t = re.sub(r'@\w+', '', t)
+    t = re.sub(r'#\w+', '', t)
+    t = re.sub(r'[^a-zA-Z\s]', ' ', t)
+    return t.lower().strip()
+
+
+def _legacy_analyze_fakeness(caption):
+    import re
+    from utils.caption_rewriter import CaptionRewriter
+    issues = []
+    if re.search(CaptionRewriter.SPAM_PATTERNS['urls'], caption, re.IGNORECASE):
+        issues.append("Contains URLs or links")
+    hashtags = re.findall(r'#\w+', caption)
+    if len(hashtags) > 2:
+        issues.append(f"Too many hashtags ({len(hashtags)} found, keep to 2 max)")
+    if re.search(r'[!?]{2,}', caption):
+        issues.append("Excessive punctuation (!!!  or ???)")
+    all_caps_words = re.findall(r'\b[A-Z]{4,}\b', caption)
+    if len(all_caps_words) > 0:
+        issues.append(f"Too many ALL CAPS words ({len(all_caps_words)} found)")
+    if any(re.search(p, caption, re.IGNORECASE) for p in CaptionRewriter.SPAM_PATTERNS['generic_phrases']):
+        issues.append("Contains generic/templated phrases")
+    found_cliches = [
+        p.replace(r'\s+', ' ') for p in CaptionRewriter.SPAM_PATTERNS['motivational_cliches']
+        if re.search(r'\b' + p + r'\b', caption, re.IGNORECASE)
+    ]
+    if found_cliches:
+        issues.append(f"Contains motivational clichés (e.g., '{found_cliches[0]}')")
+    if any(w in caption.lower() for w in ['opportunity', 'professional', 'endeavor', 'pursuant', 'hereby']):
+        issues.append("Too formal/professional tone")
+    return issues
+
+
+# Fragments random captions are built from - chosen to hit every pattern boundary
+_CAPTION_TOKENS = [
+    "hello", "World", "AMAZING", "WOW", "GREAT!", "ThIs", "so", "blessed", "Never  give up", "life changing",
+    "i am a student", "DM me", "link in bio", "opportunity", "#", "#goals", "#A_b1", "##x", "@", "@user", "a@b",
+    "http", "https://x.co/a#b", "HTTP://X.CO", "www.", "WWW.SITE.COM", "wwwx", "!", "?", "!!", "?!?", "...",
+    "\U0001F600", "\U0001F525\U0001F525", "\u2764\ufe0f", "\u00e9t\u00e9", "\u00c9COLE", "\u0130STANBUL",
+    "\u017fuccess", "\u212a", "\ud83d", "\t", "\n", "  ", "123", "ABCD1", "_ABCD_", "\u00a0",
+]
+
+
+def _random_caption(rng):
+    n = rng.randint(0, 25)
+    seps = ["", " ", " ", " ", "\n"]
+    return "".join(_CAPTION_TOKENS[rng.randint(len(_CAPTION_TOKENS))] + seps[rng.randint(len(seps))] for _ in range(n))
+
+
+def bench_caption_features(args):
+    from utils.caption_features import extract
+    from utils.caption_rewriter import CaptionRewriter
+    from utils.preprocess import clean_text_basic, count_emojis
+
+    _header("CAPTION FEATURES: single-pass extractor vs per-feature regex scans")
+    rng = np.random.RandomState(42)
+    captions = [_random_caption(rng) for _ in range(args.captions)]
+
+    mismatches = 0
+    for caption in captions:
+        expected = _legacy_style_features(caption)
+        got = extract(caption)
+        got = {key: got[key] for key in expected}
+        if (got != expected or clean_text_basic(caption) != _legacy_clean_text_basic(caption)
+                or count_emojis(caption) != expected["num_emojis"]
+                or CaptionRewriter.analyze_fakeness(caption)["issues"] != _legacy_analyze_fakeness(caption)):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"   MISMATCH {caption!r}")
+    print(f"\nproperty check: {len(captions):,} random captions, {mismatches} mismatches")
+    _require(mismatches == 0, f"caption features differ from the per-feature regex scans on {mismatches} captions")
+
+    sample = captions[:2000]
+    rows = [
+        ("style features", lambda: [_legacy_style_features(c) for c in sample], lambda: [extract(c) for c in sample]),
+        ("clean_text_basic", lambda: [_legacy_clean_text_basic(c) for c in sample],
+         lambda: [clean_text_basic(c) for c in sample]),
+        ("analyze_fakeness", lambda: [_legacy_analyze_fakeness(c) for c in sample],
+         lambda: [CaptionRewriter.analyze_fakeness(c) for c in sample]),
+    ]
+    repeat = max(3, args.repeat // 10)
+    print(f"\n{len(sample):,} captions")
+    for name, old, new in rows:
+        t_old = _time_it(old, repeat=repeat, warmup=1)
+        t_new = _time_it(new, repeat=repeat, warmup=1)
+        print(f"   {name:<18} old {t_old:8.2f} ms | new {t_new:8.2f} ms | {t_old / t_new:5.1f}x")
+
+
+# ============================================
+# BATCH FEATURES: Series-vectorized vs per-caption dicts
+# ============================================
+def bench_batch_features(args):
+    import pandas as pd
+    from datetime import datetime
+    import config
+    from utils.preprocess import get_sentiment
+    from utils.feature_engineering import (
+        engineer_status_features, engineer_reach_features,
+        engineer_status_features_batch, engineer_reach_features_batch,
+    )
+    from utils.readability import flesch_kincaid_grade
+
+    n_rows = args.rows
+    _header(f"BATCH FEATURES: {n_rows:,} captions, pandas Series batch vs per-row loop")
+    rng = np.random.RandomState(42)
+    captions = pd.Series([_random_caption(rng) for _ in range(n_rows)])
+    timestamp = datetime(2025, 1, 1, 12, 0)
+    style_features, num_cols = config.STATUS_STYLE_FEATURES, config.REACH_NUMERIC_FEATURES
+
+    rows = [
+        ("status", lambda: pd.DataFrame([engineer_status_features(c) for c in captions])[style_features],
+         lambda: engineer_status_features_batch(captions, style_features)),
+        ("reach", lambda: pd.DataFrame([engineer_reach_features(c, timestamp=timestamp) for c in captions])[num_cols],
+         lambda: engineer_reach_features_batch(captions, timestamp, num_cols)),
+    ]
+    # Both paths share the sentiment token cache and the syllable cache - warm them first
+    for caption in captions:
+        get_sentiment(caption)
+        flesch_kincaid_grade(caption)
+
+    # Median of several runs: a single pass mostly measures allocator / cache warm-up noise
+    repeat = max(3, args.repeat // 10)
+    for name, loop, batch in rows:
+        expected, got = loop(), batch()
+        _require(list(got.columns) == list(expected.columns), f"{name}: batch columns differ from the per-row loop")
+        _require(np.array_equal(got.to_numpy(dtype=float), expected.to_numpy(dtype=float)),
+                 f"{name}: batch values differ from the per-row loop")
+        t_loop = _time_it(loop, repeat=repeat, warmup=0) / 1000
+        t_batch = _time_it(batch, repeat=repeat, warmup=0) / 1000
+        print(f"\n{name}: columns match, values identical (median of {repeat} runs)")
+        print(f"   per-row loop {t_loop:8.2f} s ({n_rows / t_loop:10,.0f} captions/s)")
+        print(f"   batch        {t_batch:8.2f} s ({n_rows / t_batch:10,.0f} captions/s) | {t_loop / t_batch:5.1f}x")
+
+# ============================================
+# SENTIMENT: SentimentScorer vs TextBlob(text).sentiment
+# ============================================
+_SENTIMENT_EXTRAS = [
+    "not", "no", "never", "n't", "very", "really", "extremely", "!", "!!", ":)", ": )", ":(", "(!)", "( ! )",
+    "xD", "x D", "o . O", "...", ".", "?", "\n\n", "\r\n", "don't", "it's", "\u201cquoted\u201d", "'single'",
+    '"dbl"', "U.S.", "Mr.", "etc.", "(", ")", "#tag", "@me", "\U0001F600", "www.x.com", "a", "is", "the", "so",
+    ":-.", "<3", "\u2665", "terribly", "happily",
+]
+
+
+def _sentiment_caption(rng, vocabulary):
+    """Random caption mixing lexicon words with negations, modifiers, emoticons and sentence breaks"""
+    parts = []
+    for _ in range(rng.randint(0, 30)):
+        if rng.rand() < 0.4:
+            parts.append(vocabulary[rng.randint(len(vocabulary))])
+        else:
+            parts.append(_SENTIMENT_EXTRAS[rng.randint(len(_SENTIMENT_EXTRAS))])
+        parts.append(["", " ", " ", " ", "\n"][rng.randint(5)])
+    caption = "".join(parts)
+    return caption.upper() if rng.rand() < 0.05 else caption
+
+
+def bench_sentiment(args):
+    from textblob import TextBlob
+    from utils.sentiment import SentimentScorer, polarity_label
+
+    _header("SENTIMENT: SentimentScorer vs TextBlob(text).sentiment.polarity")
+    start = time.perf_counter()
+    # The fast scorer itself, not get_sentiment_scorer() (which may have fallen back to TextBlob)
+    scorer = SentimentScorer()
+    print(f"lexicon: {len(scorer.lexicon):,} words loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = np.random.RandomState(42)
+    vocabulary = sorted(scorer.lexicon)
+    captions = [_sentiment_caption(rng, vocabulary) for _ in range(args.captions)]
+    captions += [_random_caption(rng) for _ in range(args.captions // 4)]
+
+    expected = [TextBlob(c).sentiment.polarity for c in captions]
+    got = [scorer.polarity(c) for c in captions]
+    polarity_diff = sum(e != g for e, g in zip(expected, got))
+    label_diff = int((np.array([polarity_label(p) for p in expected]) != scorer.label_batch(captions)).sum())
+    print(f"\nparity: {len(captions):,} captions, {polarity_diff} polarity / {label_diff} label mismatches")
+    _require(polarity_diff == 0 and label_diff == 0, "SentimentScorer disagrees with TextBlob on this textblob version")
+
+    sample = captions[:5000]
+    t_blob = _time_it(lambda: [TextBlob(c).sentiment for c in sample], repeat=3, warmup=1)
+    t_fast = _time_it(lambda: [scorer.label(c) for c in sample], repeat=3, warmup=1)
+    t_batch = _time_it(lambda: scorer.label_batch(sample), repeat=3, warmup=1)
+    per = 1000 / len(sample)
+    print(f"\n{len(sample):,} captions")
+    print(f"   TextBlob per caption   {t_blob * per:8.1f} us / caption")
+    print(f"   SentimentScorer.label  {t_fast * per:8.1f} us / caption | {t_blob / t_fast:5.1f}x")
+    print(f"   label_batch            {t_batch * per:8.1f} us / caption | {t_blob / t_batch:5.1f}x")
+
+
+# ============================================
+# READABILITY: cached fk_grade vs textstat
+# ============================================
+def bench_readability(args):
+    import textstat
+    from utils.readability import flesch_kincaid_grade, flesch_kincaid_grade_batch, word_syllables
+    from utils.sentiment import get_sentiment_scorer
+
+    _header("READABILITY: utils.readability vs textstat.flesch_kincaid_grade")
+    rng = np.random.RandomState(42)
+    vocabulary = sorted(get_sentiment_scorer().lexicon)
+    captions = [_sentiment_caption(rng, vocabulary) for _ in range(args.captions)]
+    captions += [_random_caption(rng) for _ in range(args.captions // 4)]
+
+    expected = np.array([textstat.flesch_kincaid_grade(c) for c in captions])
+    single = np.array([flesch_kincaid_grade(c) for c in captions])
+    batch = flesch_kincaid_grade_batch(captions)
+    single_diff, batch_diff = int((single != expected).sum()), int((batch != expected).sum())
+    print(f"\nparity: {len(captions):,} captions, {single_diff} single / {batch_diff} batch mismatches")
+    _require(single_diff == 0 and batch_diff == 0, "fk_grade disagrees with textstat.flesch_kincaid_grade")
+
+    # Fresh captions for timing so neither side starts from a warm per-text cache
+    sample = [_sentiment_caption(rng, vocabulary) for _ in range(5000)]
+    word_syllables.cache_clear()
+    start = time.perf_counter()
+    [textstat.flesch_kincaid_grade(c) for c in sample]
+    t_textstat = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    [flesch_kincaid_grade(c) for c in sample]
+    t_cold = (time.perf_counter() - start) * 1000
+    info = word_syllables.cache_info()
+    t_warm = _time_it(lambda: [flesch_kincaid_grade(c) for c in sample], repeat=3, warmup=0)
+    t_batch = _time_it(lambda: flesch_kincaid_grade_batch(sample), repeat=3, warmup=0)
+
+    per = 1000 / len(sample)
+    print(f"\n{len(sample):,} captions ({info.currsize:,} distinct words cached, "
+          f"{info.hits / max(info.hits + info.misses, 1):.0%} hits on first pass)")
+    print(f"   textstat            {t_textstat * per:8.1f} us / caption")
+    print(f"   cold syllable cache {t_cold * per:8.1f} us / caption | {t_textstat / t_cold:5.1f}x")
+    print(f"   warm syllable cache {t_warm * per:8.1f} us / caption | {t_textstat / t_warm:5.1f}x")
+    print(f"   batch (warm)        {t_batch * per:8.1f} us / caption | {t_textstat / t_batch:5.1f}x")
+
+
+# ============================================
+# MODEL BUNDLES: loose artifact files vs one bundle per task
+# ============================================
+def _bundle_worker(models_dir, use_bundles, results):
+    import io
+    import contextlib
+    import warnings
+    # Import the heavy libraries first so only artifact reads are measured
+    import joblib, sklearn, xgboost, catboost, lightgbm  # noqa: F401
+    from utils.model_loader import ModelRegistry
+
+    opened = []
+    sys.addaudithook(lambda event, hook_args: opened.append(hook_args[0])
+                     if event == "open" and str(hook_args[0]).startswith(models_dir) else None)
+
+    row = {}
+    for group in ("emotion", "reach", "status"):
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            registry = ModelRegistry(models_dir, use_bundles=use_bundles)
+            del opened[:]
+            start = time.perf_counter()
+            ok = all(registry.preload(group).values())
+            row[group] = ((time.perf_counter() - start) * 1000, len(opened), ok)
+    results.put(row)
+
+
+def bench_model_bundle(args):
+    import multiprocessing as mp
+
+    _header("MODEL LOADING: loose artifact files vs models/<task>.bundle")
+    models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+    missing = [g for g in ("emotion", "reach", "status") if not os.path.exists(os.path.join(models_dir, f"{g}.bundle"))]
+    if missing:
+        print(f"❌ No bundle for {', '.join(missing)} - run `python export_models.py --bundle` first")
+        return
+
+    # Fresh process per run: nothing is cached in the registry or unpickler
+    ctx = mp.get_context("spawn")
+    runs = max(1, min(args.repeat, 5))
+    report = {}
+    for use_bundles in (False, True):
+        rows = []
+        for _ in range(runs):
+            results = ctx.Queue()
+            p = ctx.Process(target=_bundle_worker, args=(models_dir, use_bundles, results))
+            p.start()
+            rows.append(results.get())
+            p.join()
+        report[use_bundles] = rows
+
+    print(f"\nmedian of {runs} fresh processes (page cache warm - on cold or network")
+    print("storage each file open is an extra round trip)")
+    print(f"\n{'group':<10}{'loose files':>14}{'opens':>7}{'bundle':>12}{'opens':>7}{'speedup':>10}")
+    for group in ("emotion", "reach", "status"):
+        loose = [row[group] for row in report[False]]
+        bundled = [row[group] for row in report[True]]
+        t_loose = float(np.median([r[0] for r in loose]))
+        t_bundle = float(np.median([r[0] for r in bundled]))
+        ok = all(r[2] for r in loose + bundled)
+        print(f"{group:<10}{t_loose:>11.1f} ms{loose[0][1]:>7}{t_bundle:>9.1f} ms{bundled[0][1]:>7}"
+              f"{t_loose / t_bundle:>9.2f}x{'' if ok else '  (load errors)'}")
+
+
+# ============================================
+# MODEL MEMORY: per-artifact footprint (tracemalloc on for this registry only)
+# ============================================
+def bench_model_memory(args):
+    import io
+    import contextlib
+    import warnings
+    from utils.model_loader import ModelRegistry
+
+    _header("MODEL MEMORY: per-artifact load time and footprint (TRACK_MODEL_MEMORY)")
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        registry = ModelRegistry("models", track_memory=True)
+        registry.preload(["reach", "status"])
+
+    print(f"\n{'artifact':<24}{'file':>14}{'python':>14}{'rss delta':>14}{'load':>12}")
+    for row in registry.memory_report():
+        sizes = [row.get(key) for key in ("file_bytes", "python_bytes", "rss_delta_bytes")]
+        cells = "".join(f"{size / 1e6:>11.2f} MB" if size is not None else f"{'-':>14}" for size in sizes)
+        status = "" if row["error"] is None else f"  (error: {row['error']})"
+        print(f"{row['artifact']:<24}{cells}{row['seconds'] * 1000:>9.1f} ms{status}")
+
+
+# ============================================
+# ONNX BACKEND: sklearn predict_proba vs onnxruntime
+# ============================================
+def bench_onnx_backend(args):
+    import io
+    import contextlib
+    import warnings
+    from utils.model_loader import ModelRegistry
+
+    _header("TREE ENSEMBLES: sklearn / joblib vs onnxruntime (MODEL_BACKEND = \"onnx\")")
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        sk = ModelRegistry("models", backend="sklearn", use_bundles=False)
+        ort = ModelRegistry("models", backend="onnx", use_bundles=False)
+        pairs = {name: (getattr(sk, name), getattr(ort, name)) for name in ("status_rf", "reach_model")}
+
+    rng = np.random.RandomState(42)
+    for name, (sk_model, ort_model) in pairs.items():
+        if ort.load_stats[name]["backend"] != "onnx":
+            print(f"\n❌ {name}: no ONNX export - run `python export_models.py --onnx` first")
+            continue
+        width = sk_model.n_features_in_
+        X = rng.rand(2048, width)
+        diff = np.abs(sk_model.predict_proba(X) - ort_model.predict_proba(X)).max()
+        print(f"\n{name} ({type(sk_model).__name__}, {width} features): max |Δp| = {diff:.1e} on {len(X):,} rows")
+        print(f"   {'rows':>6}{'sklearn':>14}{'onnxruntime':>16}{'speedup':>10}")
+        for rows in (1, 16, 256, 2048):
+            batch = X[:rows]
+            t_sk = _time_it(lambda: sk_model.predict_proba(batch), repeat=args.repeat)
+            t_ort = _time_it(lambda: ort_model.predict_proba(batch), repeat=args.repeat)
+            print(f"   {rows:>6}{t_sk:>11.3f} ms{t_ort:>13.3f} ms{t_sk / t_ort:>9.1f}x")
+
+
+# ============================================
+# ONNX EMBEDDER: validation report + per-core throughput
+# ============================================
+def bench_embedder_onnx(args):
+    import io
+    import contextlib
+    import warnings
+    import pandas as pd
+    import torch
+    from sentence_transformers import SentenceTransformer
+    import config
+    from utils.inference import ReachPredictor, StatusPredictor
+    from utils.model_loader import ModelRegistry
+    from utils.onnx_embedder import EMBEDDER_META, OnnxSentenceEmbedder, embedder_dir
+    from utils.sentiment import get_sentiment_scorer
+
+    _header(f"EMBEDDER: {config.EMBEDDER_MODEL} torch vs ONNX fp32 / int8")
+    model_dir = embedder_dir()
+    if not os.path.exists(os.path.join(model_dir, EMBEDDER_META)):
+        print(f"❌ No ONNX embedder in {model_dir} - run `python export_models.py --onnx-embedder` first")
+        return
+
+    rng = np.random.RandomState(42)
+    vocabulary = sorted(get_sentiment_scorer().lexicon)
+    captions = [_sentiment_caption(rng, vocabulary) for _ in range(args.sample)]
+
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        backends = {"torch": SentenceTransformer(config.EMBEDDER_MODEL, device="cpu")}
+        for variant in ("fp32", "int8"):
+            try:
+                backends[f"onnx-{variant}"] = OnnxSentenceEmbedder(model_dir, quantized=variant == "int8")
+            except ValueError:
+                continue
+        registry = ModelRegistry("models")
+        registry.preload(["status", "reach"])
+
+    embeddings = {
+        name: np.asarray(model.encode(captions, batch_size=config.EMBEDDER_BATCH_SIZE, convert_to_numpy=True))
+        for name, model in backends.items()
+    }
+    ref = embeddings["torch"]
+    onnx_names = [name for name in backends if name != "torch"]
+
+    print(f"\nCosine similarity to torch ({len(captions):,} captions)")
+    print(f"   {'backend':<12}{'mean':>10}{'p1':>10}{'min':>10}")
+    for name in onnx_names:
+        emb = embeddings[name]
+        cos = (ref * emb).sum(axis=1) / (np.linalg.norm(ref, axis=1) * np.linalg.norm(emb, axis=1))
+        print(f"   {name:<12}{cos.mean():>10.6f}{np.percentile(cos, 1):>10.6f}{cos.min():>10.6f}")
+
+    # Downstream drift: same captions, same models, only the embeddings differ
+    timestamp = pd.Timestamp("2024-01-01 18:00")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        status = {name: StatusPredictor.predict_batch(captions, model_registry=registry, embeddings=emb)
+                  for name, emb in embeddings.items()}
+        reach = {name: ReachPredictor.predict_batch(captions, model_registry=registry, embeddings=emb,
+                                                    timestamp=timestamp)
+                 for name, emb in embeddings.items()}
+    print(f"\nPrediction drift vs torch embeddings")
+    print(f"   {'backend':<12}{'model':<8}{'max |Δp|':>12}{'mean |Δp|':>12}{'label flips':>14}")
+    for name in onnx_names:
+        for task, results, p_col, label_col in (("status", status, "suspicion_score", "status"),
+                                               ("reach", reach, "probability", "prediction")):
+            base, other = results["torch"], results[name]
+            if isinstance(base, dict) or isinstance(other, dict):
+                print(f"   {name:<12}{task:<8}  {base.get('error') if isinstance(base, dict) else other.get('error')}")
+                continue
+            diff = np.abs(base[p_col].to_numpy() - other[p_col].to_numpy())
+            flips = int((base[label_col].to_numpy() != other[label_col].to_numpy()).sum())
+            print(f"   {name:<12}{task:<8}{diff.max():>12.2e}{diff.mean():>12.2e}{flips:>8} / {len(captions):,}")
+
+    # Throughput on one core: torch intra-op threads and onnxruntime intra-op threads = 1
+    torch.set_num_threads(1)
+    single_core = {"torch": backends["torch"]}
+    for name in onnx_names:
+        single_core[name] = OnnxSentenceEmbedder(model_dir, quantized=name == "onnx-int8", intra_op_threads=1)
+    sample = captions[:min(len(captions), 512)]
+    print(f"\nThroughput per core ({len(sample)} captions, batch {config.EMBEDDER_BATCH_SIZE})")
+    print(f"   {'backend':<12}{'captions/s':>12}{'1-caption':>14}{'speedup':>10}")
+    rates = {}
+    for name, model in single_core.items():
+        t_batch = _time_it(lambda: model.encode(sample, batch_size=config.EMBEDDER_BATCH_SIZE), repeat=3, warmup=1)
+        t_single = _time_it(lambda: model.encode([sample[0]]), repeat=args.repeat)
+        rates[name] = len(sample) / (t_batch / 1000)
+        print(f"   {name:<12}{rates[name]:>12.0f}{t_single:>11.2f} ms{rates[name] / rates['torch']:>9.2f}x")
+
+
+BENCHMARKS = {
+    "reach-features": bench_reach_features,
+    "mmap-rss": bench_mmap_rss,
+    "api-load": bench_api_load,
+    "embed-batching": bench_embed_batching,
+    "due-index": bench_due_index,
+    "post-storage": bench_post_storage,
+    "graph-client": bench_graph_client,
+    "bulk-publish": bench_bulk_publish,
+    "batch-publish": bench_batch_publish,
+    "rate-limiter": bench_rate_limiter,
+    "caption-features": bench_caption_features,
+    "batch-features": bench_batch_features,
+    "sentiment": bench_sentiment,
+    "readability": bench_readability,
+    "model-bundle": bench_model_bundle,
+    "model-memory": bench_model_memory,
+    "onnx-backend": bench_onnx_backend,
+    "embedder-onnx": bench_embedder_onnx,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="InspiroAI micro-benchmarks")
+    parser.add_argument("benchmark", nargs="?", choices=sorted(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=50, help="timed repetitions per measurement (model-bundle: up to 5 processes)")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes for mmap-rss / rate-limiter")
+    parser.add_argument("--url", default="http://localhost:8000", help="api.py base URL for api-load")
+    parser.add_argument("--endpoint", default="/status", help="endpoint for api-load (e.g. /reach, /status/batch)")
+    parser.add_argument("--requests", type=int, default=200, help="total requests for api-load / embed-batching")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients for api-load / embed-batching")
+    parser.add_argument("--batch", type=int, default=16, help="captions per request for /batch endpoints")
+    parser.add_argument("--captions", type=int, default=20000, help="random captions for caption-features / sentiment / readability")
+    parser.add_argument("--rows", type=int, default=100_000, help="captions for batch-features")
+    parser.add_argument("--sample", type=int, default=1000, help="captions for the embedder-onnx validation report")
+    args = parser.parse_args()
+
+    if args.benchmark is None:
+        print("Available benchmarks:")
+        for name in sorted(BENCHMARKS):
+            print(f"   {name}")
+        return
+
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,14 @@ FACEBOOK_PAGE_ID = None       # Your Facebook page ID (numeric)
 FACEBOOK_API_VERSION = "v18.0"
 FACEBOOK_GRAPH_URL = "https://graph.facebook.com"
 
+# Shared Graph API client (utils/graph_client.py)
+GRAPH_POOL_SIZE = 10           # keep-alive connections per host
+GRAPH_REQUEST_TIMEOUT = 15     # seconds
+GRAPH_MAX_RETRIES = 3          # retries for 5xx and error codes 1/2/4/17/32/341/613
+GRAPH_BACKOFF_BASE = 1.0       # seconds; doubles per retry, full jitter
+GRAPH_BACKOFF_MAX = 30.0       # cap for one backoff / usage pause
+GRAPH_USAGE_PAUSE_PCT = 95     # pause when X-App-Usage / X-Page-Usage reaches this percent
+
 # ============================================================
 # MODEL CONFIGURATION
 # ============================================================
@@ -22,6 +30,29 @@ FACEBOOK_GRAPH_URL = "https://graph.facebook.com"
 # Model directories
 MODELS_DIR = "models"
 EMBEDDER_MODEL = "all-MiniLM-L6-v2"  # SentenceTransformer model ID
+EMBEDDING_DIM = 384                  # all-MiniLM-L6-v2 output size
+
+# Registry artifacts load lazily on first use; these are warmed at app startup
+# (names from ModelRegistry or whole groups: "emotion", "reach", "status")
+PRELOAD_MODELS = ["status_rf", "status_style_features"]
+# tracemalloc per artifact load; process-global and slows every thread, so only
+# for diagnostics (python benchmark.py model-memory turns it on for its own registry)
+TRACK_MODEL_MEMORY = False
+
+# joblib mmap mode for model artifacts: None (private copy per process) or "r"
+# (NumPy arrays shared through the page cache across workers on one box)
+MODEL_MMAP_MODE = None
+
+# Read each model group from models/<group>.bundle (export_models.py --bundle)
+# when one exists; loose artifact files are used otherwise. Ignored with mmap.
+MODEL_BUNDLES = True
+
+# Inference backend for status_rf and the reach VotingClassifier: "sklearn"
+# (joblib pickles) or "onnx" (export_models.py --onnx, run with onnxruntime;
+# falls back to the pickle when an export or onnxruntime is missing)
+MODEL_BACKEND = "sklearn"
+ONNX_INTRA_OP_THREADS = 0            # 0 = onnxruntime default (all cores)
+ONNX_PROBA_TOLERANCE = 1e-4          # Max |p_onnx - p_sklearn| accepted at export
 
 # Decision thresholds
 REACH_THRESHOLD = 0.40               # Threshold for high/low reach classification
@@ -38,6 +69,10 @@ STATUS_ENSEMBLE_WEIGHTS = {
 # FEATURE CONFIGURATION
 # ============================================================
 
+# The reach ensemble (XGB + CatBoost + LogReg) accepts dense input; set True
+# only for a model that requires scipy.sparse CSR
+REACH_MODEL_SPARSE_INPUT = False
+
 # Reach prediction features (exact order from notebooks)
 REACH_NUMERIC_FEATURES = [
     "char_count",
@@ -58,6 +93,9 @@ REACH_NUMERIC_FEATURES = [
 # Categorical features
 REACH_CATEGORICAL_FEATURES = ["category", "language"]
 
+# Per-word syllable counts memoized for fk_grade (bounded LRU, entries)
+READABILITY_SYLLABLE_CACHE = 100_000
+
 # Status detection features
 STATUS_STYLE_FEATURES = [
     "text_length",
@@ -84,6 +122,11 @@ TFIDF_MAX_DF = 0.9
 # Emotion classes
 EMOTION_CLASSES = ["joy", "sadness", "anger", "neutral", "surprise", "fear"]
 
+# Pretrained transformer used by EmotionPredictor
+EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+EMOTION_MAX_CHARS = 512            # Captions are truncated before classification
+WARM_EMOTION_ENGINE = True         # Load + run one dummy inference at startup
+
 # ============================================================
 # STREAMLIT UI CONFIGURATION
 # ============================================================
@@ -107,8 +150,15 @@ ERROR_COLOR = "#f5576c"
 
 # Cache settings
 CACHE_EMBEDDINGS = True
+EMBEDDING_CACHE_MB = 64  # LRU budget for cached caption embeddings
 EMBEDDER_BATCH_SIZE = 32
+EMBEDDER_MICRO_BATCHING = False  # Queue concurrent single-caption encodes into shared batches
+EMBEDDER_BATCH_WAIT_MS = 5       # Max time a caption waits for its batch to fill
 EMBEDDER_DEVICE = "cpu"  # or "cuda" for GPU
+EMBEDDER_BACKEND = "torch"      # "torch" (SentenceTransformer) or "onnx" (export_models.py --onnx-embedder)
+EMBEDDER_ONNX_DIR = "embedder_onnx"  # Export folder inside the models directory
+EMBEDDER_ONNX_QUANTIZED = True  # Serve the int8 export (False = fp32 ONNX)
+EMBEDDER_ONNX_THREADS = 0       # onnxruntime intra-op threads (0 = all cores)
 
 # Inference settings
 INFERENCE_TIMEOUT = 30  # seconds
@@ -132,9 +182,34 @@ DEBUG = False
 # CORS settings for API
 CORS_ORIGINS = ["*"]
 
-# Rate limiting
+# Headless inference API (api.py)
+API_HOST = "0.0.0.0"
+API_PORT = 8000
+API_MAX_BATCH_SIZE = 1000  # captions per batch request
+
+# Rate limiting (client-side token buckets per page and per access token)
 RATE_LIMIT_REQUESTS = 100
 RATE_LIMIT_WINDOW = 60  # seconds
+RATE_LIMIT_BACKEND = "memory"      # "memory" (per process) or "sqlite" (shared by all workers on the host)
+RATE_LIMIT_DB = "rate_limits.db"
+RATE_LIMIT_MAX_WAIT = 30           # seconds a publish waits for budget before failing
+
+# Bulk publishing of due posts (ScheduledPostManager.publish_bulk)
+BULK_PUBLISH_WORKERS = 8    # concurrent publish requests overall
+BULK_PUBLISH_PER_PAGE = 2   # concurrent publish requests per Facebook page
+
+# Scheduled-post daemon (scheduler_daemon.py)
+SCHEDULER_POLL_INTERVAL = 5  # max seconds between checks for posts added/deleted in the UI
+
+# Scheduled-post storage: "sqlite" (WAL, row-level writes), "journal" (JSON snapshot +
+# append-only journal) or "json" (one file rewritten per change)
+# The first sqlite run imports an existing scheduled_posts.json (which is then left as-is)
+POST_STORAGE_BACKEND = "sqlite"
+POST_STORAGE_DB = "scheduled_posts.db"
+POST_STORAGE_JOURNAL = "scheduled_posts.journal.jsonl"
+POST_JOURNAL_FSYNC = "always"       # "always" (every append), "interval" or "never" (leave it to the OS)
+POST_JOURNAL_FSYNC_INTERVAL = 1.0   # seconds between fsyncs in "interval" mode
+POST_JOURNAL_COMPACT_EVERY = 500    # journal entries before folding them into the snapshot
 
 # ============================================================
 # ADVANCED SETTINGS
@@ -227,9 +302,11 @@ def load_config():
     config = {
         "facebook_token": os.getenv("FACEBOOK_TOKEN", FACEBOOK_ACCESS_TOKEN),
         "facebook_page_id": os.getenv("FACEBOOK_PAGE_ID", FACEBOOK_PAGE_ID),
+        "facebook_graph_url": os.getenv("FACEBOOK_GRAPH_URL", FACEBOOK_GRAPH_URL),
         "models_dir": os.getenv("MODELS_DIR", MODELS_DIR),
         "debug": debug,
         "embedder_device": os.getenv("EMBEDDER_DEVICE", EMBEDDER_DEVICE),
+        "model_mmap_mode": os.getenv("MODEL_MMAP_MODE", MODEL_MMAP_MODE),
     }
     return config
 
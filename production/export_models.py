@@ -198,5 +198,232 @@ def create_dummy_models():
     return True
 
 
+def export_for_mmap(models_dir="models"):
+    """
+    Re-export every .joblib artifact uncompressed (compress=0)
+    
+    joblib can only memory-map NumPy arrays stored raw in an uncompressed
+    dump, so run this before setting MODEL_MMAP_MODE = "r". Artifacts are
+    rewritten in place through a temporary file.
+    """
+    print("=" * 60)
+    print("Re-exporting artifacts uncompressed for mmap loading...")
+    print("=" * 60)
+    
+    for filename in sorted(os.listdir(models_dir)):
+        if not filename.endswith(".joblib"):
+            continue
+        path = os.path.join(models_dir, filename)
+        before = os.path.getsize(path)
+        
+        obj = joblib.load(path)
+        tmp_path = path + ".tmp"
+        joblib.dump(obj, tmp_path, compress=0)
+        os.replace(tmp_path, path)
+        
+        print(f"   ✅ {filename} ({before:,} -> {os.path.getsize(path):,} bytes)")
+    
+    print("\n" + "=" * 60)
+    print(f"✅ Artifacts in ./{models_dir}/ can be loaded with mmap_mode='r'")
+    print("=" * 60)
+    
+    return True
+
+
+def onnx_check_rows(registry, captions, embedder):
+    """
+    status_rf / reach_model inputs for real captions, built the way
+    utils.inference builds them for prediction
+    
+    Returns:
+        dict of artifact name -> model input rows
+    """
+    import config
+    from utils.inference import encode_captions
+    from utils.feature_engineering import build_status_feature_matrix, build_reach_feature_frame
+    from utils.feature_assembler import to_model_input
+    
+    captions = list(captions)
+    embeddings = encode_captions(embedder, captions)
+    num_cols = registry.reach_meta.get("num_cols", config.REACH_NUMERIC_FEATURES)
+    numeric = build_reach_feature_frame(captions, num_cols).to_numpy(dtype=float)
+    return {
+        "status_rf": np.hstack([embeddings, build_status_feature_matrix(captions, registry.status_style_features)]),
+        "reach_model": to_model_input(
+            registry.reach_assembler.assemble(embeddings, registry.reach_scaler.transform(numeric))
+        ),
+    }
+
+
+def load_onnx_check_rows(path, registry=None):
+    """
+    Validation rows for export_onnx_models from a file
+    
+    Args:
+        path: .npz with one array per artifact name (e.g. the notebooks'
+            validation split: status_rf=X_val_status, reach_model=X_val_reach),
+            or a text file with one caption per line (turned into model inputs
+            with the configured embedder and the production feature pipeline)
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    
+    from utils.model_loader import load_embedder
+    with open(path, "r", encoding="utf-8") as f:
+        captions = [line.rstrip("\n") for line in f if line.strip()]
+    return onnx_check_rows(registry, captions, load_embedder(micro_batching=False))
+
+
+def export_onnx_models(models_dir="models", names=("status_rf", "reach_model"), X_check=None, check_path=None):
+    """
+    Export the tree-ensemble models to ONNX for MODEL_BACKEND = "onnx"
+    
+    status_rf becomes status_rf.onnx; the reach VotingClassifier's members
+    are merged into one soft-voting graph, reach_voting.onnx. Each export is
+    compared with the sklearn model's predict_proba and not written if any
+    probability differs by more than config.ONNX_PROBA_TOLERANCE.
+    Needs skl2onnx, onnxmltools and onnxruntime.
+    
+    Args:
+        X_check: dict of artifact name -> real validation rows to compare on
+        check_path: file for load_onnx_check_rows (.npz rows or captions, one per line)
+        Without either, exports are only compared on uniform random rows.
+    """
+    from utils.model_loader import ModelRegistry
+    from utils.onnx_backend import export_onnx
+    
+    print("=" * 60)
+    print("Exporting models to ONNX...")
+    print("=" * 60)
+    
+    registry = ModelRegistry(models_dir, use_bundles=False, backend="sklearn")
+    if X_check is None and check_path is not None:
+        X_check = load_onnx_check_rows(check_path, registry)
+    if not X_check:
+        print("   ⚠️ No validation rows given (--onnx-check) - comparing on uniform random rows only")
+    X_check = X_check or {}
+    ok = True
+    for name in names:
+        artifact = getattr(ModelRegistry, name)
+        model = getattr(registry, name)
+        if model is None:
+            print(f"   ❌ {artifact.filename} could not be loaded")
+            ok = False
+            continue
+        path = os.path.join(models_dir, artifact.onnx)
+        rows = X_check.get(name)
+        try:
+            diff = export_onnx(model, path, X_check=rows)
+        except Exception as e:
+            print(f"   ❌ {artifact.onnx}: {e}")
+            ok = False
+            continue
+        checked = f"{rows.shape[0]:,} validation rows" if rows is not None else "random rows"
+        print(f"   ✅ {artifact.onnx} ({os.path.getsize(path):,} bytes, max |Δp| = {diff:.1e} on {checked})")
+    
+    print("\n" + "=" * 60)
+    print(f"{'✅' if ok else '❌'} ONNX models in ./{models_dir}/ (used when MODEL_BACKEND = \"onnx\")")
+    print("=" * 60)
+    
+    return ok
+
+
+def export_onnx_embedder(models_dir="models", quantize=True):
+    """
+    Export the caption embedder (config.EMBEDDER_MODEL) to ONNX + int8
+    
+    Writes models/<EMBEDDER_ONNX_DIR>/ for EMBEDDER_BACKEND = "onnx". Needs
+    sentence-transformers, torch and onnxruntime; check the result with
+    `python benchmark.py embedder-onnx` before switching backends.
+    """
+    import config
+    from utils.onnx_embedder import embedder_dir, export_embedder
+    
+    print("=" * 60)
+    print(f"Exporting {config.EMBEDDER_MODEL} to ONNX...")
+    print("=" * 60)
+    
+    out_dir = embedder_dir(models_dir)
+    meta = export_embedder(out_dir, quantize=quantize)
+    for variant, filename in meta["models"].items():
+        path = os.path.join(out_dir, filename)
+        print(f"   ✅ {filename} ({variant}, {os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+    
+    print("\n" + "=" * 60)
+    print(f"✅ Embedder exported to {out_dir} (used when EMBEDDER_BACKEND = \"onnx\")")
+    print("=" * 60)
+    
+    return True
+
+
+def export_bundles(models_dir="models", tasks=("emotion", "reach", "status"), version=None):
+    """
+    Pack each task's artifacts into models/<task>.bundle
+    
+    One file per task with a manifest (checksums, feature order, thresholds,
+    embedder, bundle version) that ModelRegistry reads in a single pass and
+    validates. Artifacts whose widths disagree with the recorded feature
+    order are refused, so a mismatched set never ships.
+    """
+    from utils.model_loader import ModelRegistry
+    from utils.model_bundle import BundleError, write_bundle
+    
+    print("=" * 60)
+    print("Packing model bundles...")
+    print("=" * 60)
+    
+    ok = True
+    for task in tasks:
+        artifacts = [getattr(ModelRegistry, name) for name in ModelRegistry.artifact_names(group=task)]
+        files = [artifact.filename for artifact in artifacts]
+        # ONNX exports travel with their task when they exist
+        files += [a.onnx for a in artifacts if a.onnx and os.path.exists(os.path.join(models_dir, a.onnx))]
+        try:
+            path, manifest = write_bundle(models_dir, task, files, version=version)
+        except (BundleError, OSError) as e:
+            print(f"   ❌ {task}: {e}")
+            ok = False
+            continue
+        print(f"   ✅ {os.path.basename(path)} v{manifest['version']} "
+              f"({len(manifest['members'])} artifacts, {os.path.getsize(path):,} bytes)")
+    
+    print("\n" + "=" * 60)
+    print(f"{'✅' if ok else '❌'} Bundles written to ./{models_dir}/ (used when MODEL_BUNDLES = True)")
+    print("=" * 60)
+    
+    return ok
+
+
 if __name__ == "__main__":
-    create_dummy_models()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Export InspiroAI model artifacts")
+    parser.add_argument("--mmap", action="store_true",
+                        help="re-export existing artifacts uncompressed for memory-mapped loading")
+    parser.add_argument("--onnx", action="store_true",
+                        help="export status_rf and the reach ensemble to ONNX (verified against sklearn)")
+    parser.add_argument("--onnx-check", default=None, metavar="FILE",
+                        help="with --onnx: validation rows (.npz keyed status_rf / reach_model) "
+                             "or a text file of captions, one per line")
+    parser.add_argument("--onnx-embedder", action="store_true",
+                        help="export the sentence embedder to ONNX with a dynamic int8 copy")
+    parser.add_argument("--no-quantize", action="store_true",
+                        help="with --onnx-embedder: skip the int8 model")
+    parser.add_argument("--bundle", action="store_true",
+                        help="pack existing artifacts into one versioned bundle per task")
+    parser.add_argument("--version", default=None,
+                        help="version label for --bundle (default: UTC timestamp)")
+    args = parser.parse_args()
+    
+    if args.mmap:
+        export_for_mmap()
+    elif args.onnx or args.onnx_embedder or args.bundle:
+        if args.onnx_embedder:
+            export_onnx_embedder(quantize=not args.no_quantize)
+        if args.onnx:
+            export_onnx_models(check_path=args.onnx_check)
+        if args.bundle:
+            export_bundles(version=args.version)
+    else:
+        create_dummy_models()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+InspiroAI - Scheduled Post Daemon
+Publishes posts from PostStorage when their scheduled time arrives, so
+scheduling no longer depends on a browser tab keeping app.py rerunning.
+
+Credentials come from the environment (see config.load_config):
+    export FACEBOOK_TOKEN=...      # page access token
+    export FACEBOOK_PAGE_ID=...    # default page (posts may carry their own page_id)
+
+Run from the production folder:
+    python scheduler_daemon.py          # run until Ctrl+C / SIGTERM
+    python scheduler_daemon.py --once   # publish whatever is due now and exit
+"""
+import os
+import sys
+import signal
+import argparse
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from utils.post_storage import PostStorage
+from utils.scheduler import ScheduledPostManager
+from utils.due_index import DueIndex
+from utils.facebook_posting import FacebookPoster
+
+
+class SchedulerDaemon:
+    """
+    Sleeps until the next due post (DueIndex on scheduled_dt) and publishes it
+
+    PostStorage is the only shared state with the Streamlit app: the app
+    adds/deletes posts, the daemon writes status changes. The daemon re-reads
+    the pending posts whenever PostStorage.change_token() changes, and wakes
+    at least every `poll_interval` seconds to notice new posts.
+    """
+
+    def __init__(self, page_token, page_id=None, poll_interval=None):
+        self.page_token = page_token
+        self.page_id = page_id
+        self.poll_interval = poll_interval or config.SCHEDULER_POLL_INTERVAL
+
+        self.posts = {}
+        self.due_index = DueIndex()
+        self._token = None
+        self._posters = {}
+        self._stop = threading.Event()
+
+    # ---------- storage ----------
+    def refresh(self, force=False):
+        """
+        Reload pending posts if the store changed and apply the difference to
+        the due index (new -> add, moved -> reschedule, gone -> cancel)
+        """
+        token = PostStorage.change_token()
+        if not force and token == self._token:
+            return False
+
+        self._token = token
+        pending = {post['id']: post for post in PostStorage.load_pending()}
+        for post_id in self.posts.keys() - pending.keys():
+            self.due_index.cancel(post_id)
+        for post_id, post in pending.items():
+            # Unchanged posts keep their entry; a popped post that is still Pending
+            # in the store (its status write failed) is not re-queued and re-sent
+            known = self.posts.get(post_id)
+            if known is None or known['scheduled_dt'] != post['scheduled_dt']:
+                self.due_index.reschedule(post_id, post['scheduled_dt'])
+        self.posts = pending
+        return True
+
+    def _persist(self, post):
+        # The change token is left alone: advancing it here would also swallow an
+        # app write that landed during the publish batch. On sqlite our own commits
+        # never move it (PRAGMA data_version); on json / journal the next refresh
+        # reloads once after each batch.
+        PostStorage.update_post(post['id'], post, return_posts=False)
+
+    # ---------- publishing ----------
+    def _poster_for(self, post):
+        page_id = str(post.get('page_id') or self.page_id or '')
+        if page_id not in self._posters:
+            self._posters[page_id] = FacebookPoster(page_token=self.page_token, page_id=page_id)
+        return self._posters[page_id]
+
+    def run_once(self, now=None):
+        """Publish every post that is due; returns the ids that were published"""
+        self.refresh()
+        now = now or datetime.now()
+        published = []
+
+        due = [self.posts.get(post_id) for post_id in self.due_index.pop_due(now)]
+        due = [post for post in due if post is not None and post.get('status') == 'Pending']
+        if not due:
+            return published
+
+        print(f"[INFO] Publishing {len(due)} scheduled post(s)")
+
+        def on_result(post, row):
+            if row['success']:
+                published.append(row['id'])
+                print(f"[OK] Post #{row['id']} published: {row['post_id']} ({row['elapsed_ms']:.0f} ms)")
+            else:
+                print(f"[ERROR] Post #{row['id']} failed: {row['error']}")
+            self._persist(post)
+
+        # Campaigns that fire at the same minute go out concurrently
+        ScheduledPostManager.publish_bulk(due, self._poster_for, on_result=on_result)
+        return published
+
+    def seconds_until_next(self, now=None):
+        """Seconds to sleep: until the next due post, capped at poll_interval"""
+        wait = self.due_index.seconds_until_next(now)
+        if wait is None:
+            return self.poll_interval
+        return min(wait, self.poll_interval)
+
+    def run(self):
+        """Main loop - returns after stop() or SIGINT/SIGTERM"""
+        print(f"[INFO] Scheduler daemon started (storage: {PostStorage.location()})")
+        self.refresh(force=True)
+        print(f"[INFO] {len(self.due_index)} pending post(s) queued")
+
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[ERROR] Scheduler tick failed: {e}")
+            self._stop.wait(self.seconds_until_next())
+
+        print("[INFO] Scheduler daemon stopped")
+
+    def stop(self, *_):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish scheduled InspiroAI posts")
+    parser.add_argument("--once", action="store_true", help="publish due posts once and exit")
+    parser.add_argument("--poll", type=float, default=config.SCHEDULER_POLL_INTERVAL,
+                        help="max seconds between storage checks")
+    args = parser.parse_args()
+
+    settings = config.load_config()
+    if not settings["facebook_token"]:
+        print("[ERROR] FACEBOOK_TOKEN is not set - the daemon cannot publish")
+        sys.exit(1)
+
+    daemon = SchedulerDaemon(
+        page_token=settings["facebook_token"],
+        page_id=settings["facebook_page_id"],
+        poll_interval=args.poll,
+    )
+
+    if args.once:
+        published = daemon.run_once()
+        print(f"[OK] Published {len(published)} post(s)")
+        return
+
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()
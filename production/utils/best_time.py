@@ -1,12 +1,11 @@
 """
 Best posting time prediction engine
 """
-import numpy as np
-from scipy import sparse
-from utils.feature_engineering import generate_temporal_features
+import config
+from utils.reach_sweep import ReachSweep, DAY_NAMES, top_slots
 
 
-def find_best_posting_hour(caption, model_registry, embedder, scaler, ohe):
+def find_best_posting_hour(caption, model_registry, embedder, scaler=None, ohe=None, dow=None):
     """
     Find optimal posting hour (0-23) for maximum reach
     
@@ -14,69 +13,26 @@ def find_best_posting_hour(caption, model_registry, embedder, scaler, ohe):
         caption: Post caption text
         model_registry: Loaded models
         embedder: Sentence transformer for embeddings
-        scaler: Feature scaler
-        ohe: One-hot encoder for categorical features
+        scaler: Unused - the scaler is taken from model_registry (kept for compatibility)
+        ohe: Unused - no categorical features for new posts (kept for compatibility)
+        dow: Day of week (Monday=0); defaults to config.DEFAULT_POSTING_DAY
     
     Returns:
         dict with best hour, reach probability, and hourly predictions
     """
-    results = {}
-    reach_probs = []
+    if dow is None:
+        dow = config.DEFAULT_POSTING_DAY
     
-    # Get caption embedding (constant across hours)
-    caption_embedding = embedder.encode([caption], convert_to_numpy=True)
-    caption_emb_sparse = sparse.csr_matrix(caption_embedding)
-    
-    # Loop through each hour (0-23)
-    for hour in range(24):
-        # Generate temporal features for this hour
-        hour_features = generate_temporal_features(hour)
-        
-        # Extract numeric features in correct order (from reach_meta)
-        num_cols = model_registry.reach_meta.get("num_cols", [
-            "char_count", "word_count", "avg_word_len", "emoji_count", 
-            "has_hashtag", "fk_grade", "hour", "dow", "is_weekend",
-            "hour_sin", "hour_cos", "dow_sin", "dow_cos"
-        ])
-        
-        # Build numeric feature array
-        num_values = np.array([[
-            len(caption),
-            len(caption.split()),
-            np.mean([len(w) for w in caption.split()]) if len(caption.split()) > 0 else 0,
-            caption.count("🙂") + caption.count("😊"),  # approximation
-            1 if "#" in caption else 0,
-            0.0,  # fk_grade
-            hour,
-            2,  # dow (Wednesday)
-            0,  # is_weekend
-            hour_features["hour_sin"],
-            hour_features["hour_cos"],
-            hour_features["dow_sin"],
-            hour_features["dow_cos"],
-        ]])
-        
-        # Scale numeric features
-        num_scaled = scaler.transform(num_values)
-        num_sparse = sparse.csr_matrix(num_scaled)
-        
-        # Empty categorical (no category/language for new posts)
-        cat_sparse = sparse.csr_matrix((1, 0))
-        
-        # Combine features
-        X_hour = sparse.hstack([caption_emb_sparse, cat_sparse, num_sparse], format="csr")
-        
-        # Predict reach probability
-        if hasattr(model_registry.reach_model, "predict_proba"):
-            prob = float(model_registry.reach_model.predict_proba(X_hour)[:, 1][0])
-        else:
-            prob = float(model_registry.reach_model.predict(X_hour)[0])
-        
-        reach_probs.append({
+    # All 24 hours scored in one model call with the caption's real text features
+    sweep = ReachSweep(caption, embedder, model_registry)
+    reach_probs = [
+        {
             "hour": hour,
             "probability": prob,
             "label": "High" if prob >= model_registry.reach_threshold else "Low"
-        })
+        }
+        for _, prob, hour in sweep.day(dow)
+    ]
     
     # Find best hour
     best_hour_data = max(reach_probs, key=lambda x: x["probability"])
@@ -87,3 +43,33 @@ def find_best_posting_hour(caption, model_registry, embedder, scaler, ohe):
         "hourly_predictions": reach_probs,
         "recommendation": f"Best time to post: {best_hour_data['hour']:02d}:00 with {best_hour_data['probability']:.1%} reach probability"
     }
+
+
+def find_best_posting_week(caption, model_registry, embedder, top_k=5):
+    """
+    Score every hour of every weekday (168 slots) in one batched model call
+    
+    Args:
+        caption: Post caption text
+        model_registry: Loaded models
+        embedder: Sentence transformer for embeddings
+        top_k: Number of best slots to rank
+    
+    Returns:
+        dict with the 7x24 probability grid (rows Monday..Sunday) and top-k slots
+    """
+    sweep = ReachSweep(caption, embedder, model_registry)
+    grid = sweep.week()
+    ranked = top_slots(grid, k=top_k, threshold=model_registry.reach_threshold)
+    best = ranked[0]
+    
+    return {
+        "days": list(DAY_NAMES),
+        "hours": list(range(24)),
+        "grid": grid.tolist(),
+        "top_slots": ranked,
+        "best_day": best["day"],
+        "best_hour": best["hour"],
+        "best_probability": best["probability"],
+        "recommendation": f"Best time to post: {best['day']} {best['hour']:02d}:00 with {best['probability']:.1%} reach probability"
+    }
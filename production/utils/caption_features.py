@@ -0,0 +1,102 @@
+"""
+Single-pass caption feature extraction
+Precompiled patterns and one shared scan per caption for the style features
+used by the status / reach models (feature_engineering), count_emojis /
+clean_text_basic (preprocess) and CaptionRewriter.analyze_fakeness.
+
+Single-character features (!?, #, @, links) use C-level str.count / `in`
+instead of regexes; the token patterns (URLs, #hashtags, !?-runs, ALL-CAPS
+words) overlap each other, so each keeps its own precompiled pattern and only
+runs when the cheap counts say it can match.
+"""
+import re
+
+
+EMOJI_PATTERN = re.compile(r'[\U00010000-\U0010ffff]')
+URL_PATTERN = re.compile(r'(http[s]?://|www\.)\S+', re.IGNORECASE)
+HASHTAG_PATTERN = re.compile(r'#\w+')
+PUNCT_RUN_PATTERN = re.compile(r'[!?]{2,}')
+ALL_CAPS_PATTERN = re.compile(r'\b[A-Z]{4,}\b')
+
+# clean_text_basic - applied in this order (removing one token can expose another)
+CLEAN_URL_PATTERN = re.compile(r'http\S+')
+CLEAN_MENTION_PATTERN = re.compile(r'@\w+')
+CLEAN_HASHTAG_PATTERN = re.compile(r'#\w+')
+NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z\s]')
+
+_ASCII_UPPER = bytes(range(ord('A'), ord('Z') + 1))
+
+
+def count_astral(text):
+    """Characters above U+FFFF (what EMOJI_PATTERN matches), without a regex"""
+    if text.isascii():
+        return 0
+    # Each astral character is a surrogate pair (4 bytes) in UTF-16, everything else 2 bytes
+    return len(text.encode('utf-16-le', 'surrogatepass')) // 2 - len(text)
+
+
+def count_upper(text):
+    """Number of characters with str.isupper()"""
+    if text.isascii():
+        data = text.encode('ascii')
+        return len(data) - len(data.translate(None, _ASCII_UPPER))
+    return sum(map(str.isupper, text))
+
+
+def clean_text(text):
+    """Same result as the original clean_text_basic, skipping patterns that cannot match"""
+    t = str(text)
+    if 'http' in t:
+        t = CLEAN_URL_PATTERN.sub('', t)
+    if '@' in t:
+        t = CLEAN_MENTION_PATTERN.sub('', t)
+    if '#' in t:
+        t = CLEAN_HASHTAG_PATTERN.sub('', t)
+    t = NON_ALPHA_PATTERN.sub(' ', t)
+    return t.lower().strip()
+
+
+def extract(caption):
+    """
+    Every style feature of a caption in one pass
+
+    Args:
+        caption: caption text
+
+    Returns:
+        dict with char_count, word_count, avg_word_len, num_emojis,
+        num_hashtags, num_mentions, has_hashtag, has_links, has_url,
+        punctuation_count, has_punct_run, num_upper, uppercase_ratio,
+        hashtags (list of #words) and all_caps_words (list)
+    """
+    caption = str(caption)
+    char_count = len(caption)
+    words = caption.split()
+    word_count = len(words)
+
+    num_hashtags = caption.count('#')
+    punctuation_count = caption.count('!') + caption.count('?')
+    num_upper = count_upper(caption)
+    has_links = 'http' in caption or 'www' in caption
+    # URL_PATTERN is case-insensitive and needs http/www in some letter case
+    lowered = caption if has_links else caption.lower()
+    has_url = ('http' in lowered or 'www' in lowered) and URL_PATTERN.search(caption) is not None
+
+    return {
+        "char_count": char_count,
+        "word_count": word_count,
+        "avg_word_len": sum(map(len, words)) / word_count if word_count > 0 else 0.0,
+        "num_emojis": count_astral(caption),
+        "num_hashtags": num_hashtags,
+        "num_mentions": caption.count('@'),
+        "has_hashtag": 1 if num_hashtags else 0,
+        "has_links": 1 if has_links else 0,
+        "has_url": has_url,
+        "punctuation_count": punctuation_count,
+        "has_punct_run": punctuation_count >= 2 and PUNCT_RUN_PATTERN.search(caption) is not None,
+        "num_upper": num_upper,
+        "uppercase_ratio": num_upper / char_count if char_count > 0 else 0.0,
+        "hashtags": HASHTAG_PATTERN.findall(caption) if num_hashtags else [],
+        # Four capitals are needed for an ALL-CAPS word
+        "all_caps_words": ALL_CAPS_PATTERN.findall(caption) if num_upper >= 4 else [],
+    }
@@ -5,6 +5,8 @@ Transforms fake/spam captions into authentic, human-sounding versions
 import re
 import random
 
+from utils.caption_features import extract
+
 
 class CaptionRewriter:
     """Intelligently rewrite captions to improve authenticity"""
@@ -38,6 +40,17 @@ class CaptionRewriter:
         ]
     }
     
+    # Precompiled once; (pattern, readable phrase) in SPAM_PATTERNS order
+    GENERIC_PHRASE_RES = [
+        (re.compile(p, re.IGNORECASE), p.replace(r'\s+', ' '))
+        for p in SPAM_PATTERNS['generic_phrases']
+    ]
+    CLICHE_RES = [
+        (re.compile(r'\b' + p + r'\b', re.IGNORECASE), p.replace(r'\s+', ' '))
+        for p in SPAM_PATTERNS['motivational_cliches']
+    ]
+    FORMAL_WORDS = ['opportunity', 'professional', 'endeavor', 'pursuant', 'hereby']
+    
     AUTHENTIC_TRANSITIONS = [
         'honestly', 'ngl', 'not gonna lie', 'tbh', 'real talk',
         'like', 'literally', 'literally me', 'fr fr',
@@ -104,9 +117,9 @@ class CaptionRewriter:
         text = caption
         
         # Remove standalone cliche words
-        for pattern in CaptionRewriter.SPAM_PATTERNS['motivational_cliches']:
+        for pattern, _ in CaptionRewriter.CLICHE_RES:
             # Only remove if it's a standalone word/phrase
-            text = re.sub(r'\b' + pattern + r'\b', '', text, flags=re.IGNORECASE)
+            text = pattern.sub('', text)
         
         # Clean up extra spaces
         text = re.sub(r'\s+', ' ', text)
@@ -247,44 +260,38 @@ class CaptionRewriter:
         Returns explanation and specific issues found
         """
         issues = []
+        text = extract(caption)
         
         # Check for URLs
-        if re.search(CaptionRewriter.SPAM_PATTERNS['urls'], caption, re.IGNORECASE):
+        if text["has_url"]:
             issues.append("Contains URLs or links")
         
         # Check for excessive hashtags
-        hashtags = re.findall(r'#\w+', caption)
+        hashtags = text["hashtags"]
         if len(hashtags) > 2:
             issues.append(f"Too many hashtags ({len(hashtags)} found, keep to 2 max)")
         
         # Check for excessive punctuation
-        if re.search(r'[!?]{2,}', caption):
+        if text["has_punct_run"]:
             issues.append("Excessive punctuation (!!!  or ???)")
         
         # Check for ALL CAPS
-        all_caps_words = re.findall(r'\b[A-Z]{4,}\b', caption)
+        all_caps_words = text["all_caps_words"]
         if len(all_caps_words) > 0:
             issues.append(f"Too many ALL CAPS words ({len(all_caps_words)} found)")
         
         # Check for generic phrases
-        found_generic = []
-        for pattern in CaptionRewriter.SPAM_PATTERNS['generic_phrases']:
-            if re.search(pattern, caption, re.IGNORECASE):
-                found_generic.append(pattern.replace(r'\s+', ' '))
-        if found_generic:
+        if any(pattern.search(caption) for pattern, _ in CaptionRewriter.GENERIC_PHRASE_RES):
             issues.append(f"Contains generic/templated phrases")
         
         # Check for cliches
-        found_cliches = []
-        for pattern in CaptionRewriter.SPAM_PATTERNS['motivational_cliches']:
-            if re.search(r'\b' + pattern + r'\b', caption, re.IGNORECASE):
-                found_cliches.append(pattern.replace(r'\s+', ' '))
-        if found_cliches:
-            issues.append(f"Contains motivational clichés (e.g., '{found_cliches[0]}')")
+        first_cliche = next((phrase for pattern, phrase in CaptionRewriter.CLICHE_RES if pattern.search(caption)), None)
+        if first_cliche is not None:
+            issues.append(f"Contains motivational clichés (e.g., '{first_cliche}')")
         
         # Check for overly formal language
-        formal_words = ['opportunity', 'professional', 'endeavor', 'pursuant', 'hereby']
-        if any(word in caption.lower() for word in formal_words):
+        lowered = caption.lower()
+        if any(word in lowered for word in CaptionRewriter.FORMAL_WORDS):
             issues.append("Too formal/professional tone")
         
         return {
@@ -0,0 +1,129 @@
+"""
+Due-time index for scheduled posts
+Min-heap on scheduled_dt with lazy deletion, so finding due posts no longer
+means scanning and comparing every post on each scheduler tick.
+"""
+import heapq
+import itertools
+from datetime import datetime
+
+
+class DueIndex:
+    """
+    Priority queue of post ids ordered by scheduled time
+
+    - add / reschedule: O(log n)
+    - cancel:           O(1) (entry is marked dead and skipped when it surfaces)
+    - pop_due:          O(k log n) for k due posts
+    - next_due:         O(1) amortized
+
+    Post dicts passed to from_posts / add are kept with their entry, so
+    pop_due_posts hands back the due posts without an id -> post lookup table.
+
+    Usage:
+    ------
+    index = DueIndex.from_posts(PostStorage.load_posts())
+    for post in index.pop_due_posts(datetime.now()):
+        ...
+    """
+
+    _REMOVED = object()
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._posts = {}
+        self._counter = itertools.count()
+
+    @classmethod
+    def from_posts(cls, posts):
+        """Build from post dicts in O(n) (only 'Pending' posts are indexed)"""
+        index = cls()
+        for post in posts:
+            if post.get('status') == 'Pending' and isinstance(post.get('scheduled_dt'), datetime):
+                entry = [post['scheduled_dt'], next(index._counter), post['id']]
+                index._entries[post['id']] = entry
+                index._posts[post['id']] = post
+                index._heap.append(entry)
+        heapq.heapify(index._heap)
+        return index
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, post_id):
+        return post_id in self._entries
+
+    def get(self, post_id):
+        """Post dict stored for an indexed id (None if not indexed or added without one)"""
+        return self._posts.get(post_id)
+
+    def add(self, post_id, scheduled_dt, post=None):
+        """Index a post (replaces any existing entry for the same id)"""
+        if post_id in self._entries:
+            self.cancel(post_id)
+        entry = [scheduled_dt, next(self._counter), post_id]
+        self._entries[post_id] = entry
+        if post is not None:
+            self._posts[post_id] = post
+        heapq.heappush(self._heap, entry)
+
+    def reschedule(self, post_id, scheduled_dt, post=None):
+        """Move a post to a new time (and optionally replace its stored dict)"""
+        previous = self._posts.get(post_id)
+        self.add(post_id, scheduled_dt, post if post is not None else previous)
+
+    def cancel(self, post_id):
+        """Remove a post; returns False if it was not indexed"""
+        entry = self._entries.pop(post_id, None)
+        if entry is None:
+            return False
+        self._posts.pop(post_id, None)
+        entry[2] = self._REMOVED
+        # Keep dead entries from piling up under heavy cancel churn
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._entries):
+            self._compact()
+        return True
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if entry[2] is not self._REMOVED]
+        heapq.heapify(self._heap)
+
+    def _prune(self):
+        while self._heap and self._heap[0][2] is self._REMOVED:
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        """(scheduled_dt, post_id) of the earliest post, or None if empty"""
+        self._prune()
+        if not self._heap:
+            return None
+        scheduled_dt, _, post_id = self._heap[0]
+        return scheduled_dt, post_id
+
+    def _pop_due(self, now):
+        now = now or datetime.now()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, post_id = heapq.heappop(self._heap)
+            if post_id is self._REMOVED:
+                continue
+            del self._entries[post_id]
+            due.append((post_id, self._posts.pop(post_id, None)))
+        return due
+
+    def pop_due(self, now=None):
+        """Remove and return ids of all posts due at `now`, earliest first"""
+        return [post_id for post_id, _ in self._pop_due(now)]
+
+    def pop_due_posts(self, now=None):
+        """Like pop_due, but returns the stored post dicts (ids added without one are skipped)"""
+        return [post for _, post in self._pop_due(now) if post is not None]
+
+    def seconds_until_next(self, now=None):
+        """Seconds until the earliest post is due (0 if overdue, None if empty)"""
+        nxt = self.next_due()
+        if nxt is None:
+            return None
+        now = now or datetime.now()
+        return max(0.0, (nxt[0] - now).total_seconds())
@@ -0,0 +1,170 @@
+"""
+Dynamic micro-batching for the caption embedder
+Concurrent single-caption encode calls are collected for up to
+`max_wait_ms` or `max_batch_size` items and encoded together, which is far
+cheaper per caption on CPU than many one-row encodes.
+"""
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import config
+
+
+class EmbeddingBatcher:
+    """
+    Async dynamic-batching queue in front of a SentenceTransformer-like encoder
+
+    The batcher owns a background event loop. Sync callers (Streamlit, Flask
+    worker threads) use `encode()`, which has the same signature as
+    SentenceTransformer.encode; asyncio callers use `await encode_async(text)`
+    from any event loop. Encodes run one batch at a time on a single worker
+    thread so the model is never called concurrently.
+    """
+
+    def __init__(self, embedder, max_batch_size=None, max_wait_ms=None):
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size or config.EMBEDDER_BATCH_SIZE
+        self.max_wait = (config.EMBEDDER_BATCH_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000.0
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-batch")
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="embed-batcher", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+        self._stats_lock = threading.Lock()
+        self.batch_size_hist = Counter()
+        self.queue_depth_hist = Counter()
+        self.batches = 0
+        self.items = 0
+
+    def __getattr__(self, name):
+        if name == "embedder":
+            raise AttributeError(name)
+        return getattr(self.embedder, name)
+
+    @property
+    def inner(self):
+        """The wrapped encoder (may itself be a wrapper)"""
+        return self.embedder
+
+    # ---------- event loop ----------
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._arrived = asyncio.Event()
+        self._worker_task = self._loop.create_task(self._worker())
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                # Wait on an event rather than queue.get() so a timeout can never drop an item
+                self._arrived.clear()
+                try:
+                    await asyncio.wait_for(self._arrived.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            self._record(len(batch), self._queue.qsize())
+            texts = [text for text, _ in batch]
+            try:
+                vectors = await self._loop.run_in_executor(self._executor, self._encode_now, texts)
+                for (_, future), vector in zip(batch, vectors):
+                    if not future.done():
+                        future.set_result(vector)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _encode_now(self, texts):
+        return np.asarray(self.embedder.encode(texts, batch_size=self.max_batch_size, convert_to_numpy=True))
+
+    async def _submit(self, text):
+        future = self._loop.create_future()
+        self._queue.put_nowait((text, future))
+        self._arrived.set()
+        return await future
+
+    def _record(self, batch_size, queue_depth):
+        with self._stats_lock:
+            self.batch_size_hist[batch_size] += 1
+            self.queue_depth_hist[queue_depth] += 1
+            self.batches += 1
+            self.items += batch_size
+
+    # ---------- public API ----------
+    async def encode_async(self, text):
+        """Embed one caption from any asyncio loop; resolves when its batch is encoded"""
+        future = asyncio.run_coroutine_threadsafe(self._submit(str(text)), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        """Drop-in for SentenceTransformer.encode; small numpy requests go through the queue"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        passthrough = (
+            not convert_to_numpy or normalize_embeddings
+            or any(k not in ("show_progress_bar",) for k in kwargs)
+            or len(texts) >= self.max_batch_size
+        )
+        if passthrough:
+            # Already a full batch (or non-default options) - call the model directly
+            return self.embedder.encode(
+                sentences, batch_size=batch_size, convert_to_numpy=convert_to_numpy,
+                normalize_embeddings=normalize_embeddings, **kwargs
+            )
+
+        futures = [asyncio.run_coroutine_threadsafe(self._submit(str(t)), self._loop) for t in texts]
+        vectors = [f.result(timeout=config.INFERENCE_TIMEOUT) for f in futures]
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        result = np.vstack(vectors)
+        return result[0] if single else result
+
+    def stats(self):
+        """Batch-size and queue-depth histograms plus totals"""
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+                "batch_size_hist": dict(sorted(self.batch_size_hist.items())),
+                "queue_depth_hist": dict(sorted(self.queue_depth_hist.items())),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+    def close(self):
+        """Stop the background loop and worker thread"""
+        async def _shutdown():
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._loop.stop()
+
+        if self._thread.is_alive():
+            asyncio.run_coroutine_threadsafe(_shutdown(), self._loop)
+            self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,144 @@
+"""
+Embedding cache - sits in front of the SentenceTransformer
+Identical captions (after normalization) are encoded only once per process
+"""
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Rough per-entry bookkeeping cost (key string, OrderedDict node, array header)
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+def normalize_caption(text):
+    """
+    Normalize caption text for cache keys
+    NFC + collapsed whitespace; MiniLM tokenization is unaffected by either
+    """
+    text = unicodedata.normalize("NFC", str(text))
+    return " ".join(text.split())
+
+
+def caption_key(text, normalize_embeddings=False):
+    """Hash of the normalized caption (plus encode options that change the output)"""
+    digest = hashlib.sha1(normalize_caption(text).encode("utf-8")).hexdigest()
+    return f"{digest}:{int(bool(normalize_embeddings))}"
+
+
+class CachedEmbedder:
+    """
+    LRU embedding cache wrapping a SentenceTransformer-like encoder
+
+    Exposes the same `encode()` call the predictors already use, so it can be
+    passed anywhere an embedder is expected. Misses inside one call are
+    encoded together in a single batch. Memory use is bounded by `max_mb`.
+    """
+
+    def __init__(self, embedder, max_mb=64):
+        self.embedder = embedder
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getattr__(self, name):
+        # Delegate everything else (device, get_sentence_embedding_dimension, ...)
+        if name == "embedder":
+            raise AttributeError(name)
+        return getattr(self.embedder, name)
+
+    @property
+    def inner(self):
+        """The wrapped encoder (may itself be a wrapper)"""
+        return self.embedder
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        """Encode with caching; non-numpy or custom-output requests bypass the cache"""
+        if not convert_to_numpy or kwargs.get("convert_to_tensor") or kwargs.get("output_value", "sentence_embedding") != "sentence_embedding":
+            return self.embedder.encode(
+                sentences, batch_size=batch_size, convert_to_numpy=convert_to_numpy,
+                normalize_embeddings=normalize_embeddings, **kwargs
+            )
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        keys = [caption_key(t, normalize_embeddings) for t in texts]
+
+        vectors = {}
+        missing = OrderedDict()
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key in vectors or key in missing:
+                    continue
+                vector = self._entries.get(key)
+                if vector is None:
+                    missing[key] = normalize_caption(text)
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    vectors[key] = vector
+                    self.hits += 1
+
+        if missing:
+            encoded = self.embedder.encode(
+                list(missing.values()), batch_size=batch_size, convert_to_numpy=True,
+                normalize_embeddings=normalize_embeddings, **kwargs
+            )
+            encoded = np.asarray(encoded)
+            with self._lock:
+                for key, vector in zip(missing.keys(), encoded):
+                    vector = np.array(vector, copy=True)
+                    vector.setflags(write=False)
+                    vectors[key] = vector
+                    self._store(key, vector)
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        result = np.vstack([vectors[k] for k in keys])
+        return result[0] if single else result
+
+    def _store(self, key, vector):
+        """Insert under the lock, evicting least-recently-used entries past the budget"""
+        size = vector.nbytes + _ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.current_bytes -= previous.nbytes + _ENTRY_OVERHEAD_BYTES
+
+        self._entries[key] = vector
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.nbytes + _ENTRY_OVERHEAD_BYTES
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached embedding (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Hit/miss/eviction counters and current memory use"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size_mb": self.current_bytes / (1024 * 1024),
+                "max_mb": self.max_bytes / (1024 * 1024),
+            }
@@ -4,16 +4,34 @@ Facebook API integration for posting captions
 import requests
 from datetime import datetime
 
+import config
+from utils.graph_client import get_graph_client
+from utils.rate_limiter import KeyedRateLimiter, get_keyed_limiter
+
 
 class FacebookAPI:
     """Facebook Graph API wrapper for posting"""
     
-    def __init__(self, access_token=None):
+    def __init__(self, access_token=None, client=None, rate_limiter=None):
         self.access_token = access_token
-        self.base_url = "https://graph.facebook.com/v18.0"
+        self.client = client or get_graph_client()
+        self.rate_limiter = rate_limiter or get_keyed_limiter()
+        self.base_url = self.client.base_url
         self.last_post_id = None
         self.last_error = None
     
+    def _acquire_budget(self, page_id):
+        """Take one request from the page's and token's rate-limit buckets"""
+        keys = KeyedRateLimiter.keys_for(page_id=page_id, access_token=self.access_token)
+        return self.rate_limiter.acquire(keys, timeout=config.RATE_LIMIT_MAX_WAIT)
+    
+    def _rate_limited(self):
+        return {
+            "success": False,
+            "error": "Client-side rate limit reached for this page/token. Try again shortly.",
+            "status_code": 429
+        }
+    
     def post_caption(self, page_id, caption):
         """
         Post caption to Facebook page
@@ -31,14 +49,17 @@ class FacebookAPI:
                 "error": "No access token provided. Set token in sidebar."
             }
         
-        url = f"{self.base_url}/{page_id}/feed"
+        if not self._acquire_budget(page_id):
+            return self._rate_limited()
+        
+        url = f"{page_id}/feed"
         params = {
             "message": caption,
             "access_token": self.access_token
         }
         
         try:
-            response = requests.post(url, json=params, timeout=10)
+            response = self.client.post(url, json=params, timeout=10)
             
             if response.status_code == 200:
                 post_data = response.json()
@@ -94,7 +115,10 @@ class FacebookAPI:
                 "error": "No access token provided."
             }
         
-        url = f"{self.base_url}/{page_id}/feed"
+        if not self._acquire_budget(page_id):
+            return self._rate_limited()
+        
+        url = f"{page_id}/feed"
         params = {
             "message": caption,
             "published": "false",
@@ -103,7 +127,7 @@ class FacebookAPI:
         }
         
         try:
-            response = requests.post(url, json=params, timeout=10)
+            response = self.client.post(url, json=params, timeout=10)
             
             if response.status_code == 200:
                 post_data = response.json()
@@ -129,8 +153,7 @@ class FacebookAPI:
 def validate_facebook_token(token):
     """Validate Facebook access token"""
     try:
-        url = "https://graph.facebook.com/v18.0/me"
-        response = requests.get(url, params={"access_token": token}, timeout=5)
+        response = get_graph_client().get("me", params={"access_token": token}, timeout=5)
         return response.status_code == 200
     except:
         return False
@@ -5,6 +5,7 @@ Handles posting captions to Facebook Pages using the latest Graph API.
 
 Features:
 - Publish posts with message/media
+- Batch-publish up to 50 posts per HTTP call
 - Error handling for invalid tokens, permissions
 - Response with Post ID on success
 - Detailed error messages for debugging
@@ -12,7 +13,12 @@ Features:
 
 import requests
 import json
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+from urllib.parse import urlencode
+
+import config
+from utils.graph_client import get_graph_client, never_sent
+from utils.rate_limiter import KeyedRateLimiter, get_keyed_limiter
 
 
 class FacebookPoster:
@@ -32,16 +38,23 @@ class FacebookPoster:
     # Timeout for API requests (seconds)
     REQUEST_TIMEOUT = 15
     
-    def __init__(self, page_token: str, page_id: str):
+    # Max operations per Graph batch request
+    BATCH_LIMIT = 50
+    
+    def __init__(self, page_token: str, page_id: str, client=None, rate_limiter=None):
         """
         Initialize Facebook Poster.
         
         Args:
             page_token (str): Facebook Page Access Token (from Meta Developer Dashboard)
             page_id (str): Facebook Page ID (numeric)
+            client (GraphClient, optional): defaults to the shared pooled client
+            rate_limiter (KeyedRateLimiter, optional): defaults to the shared per-page/per-token limiter
         """
         self.page_token = page_token.strip() if page_token else None
         self.page_id = page_id.strip() if page_id else None
+        self.client = client or get_graph_client()
+        self.rate_limiter = rate_limiter or get_keyed_limiter()
         self.last_post_id = None
         self.last_error = None
     
@@ -110,8 +123,16 @@ class FacebookPoster:
         
         message = str(message).strip()
         
-        # Build endpoint
-        endpoint = f"{self.GRAPH_URL}/{self.page_id}/feed"
+        # Wait for client-side budget on this page and token
+        if not self._acquire_budget():
+            return self._rate_limited()
+        
+        return self._send(message, media_url)
+    
+    def _send(self, message: str, media_url: Optional[str] = None) -> Tuple[bool, Dict]:
+        """POST one validated, budgeted message to the page feed."""
+        # Build endpoint (relative to the client's Graph URL + version)
+        endpoint = f"{self.page_id}/feed"
         
         # Build payload
         payload = {
@@ -124,46 +145,15 @@ class FacebookPoster:
             payload['picture'] = media_url
         
         try:
-            # Make POST request to Facebook
-            response = requests.post(
+            # Make POST request to Facebook (pooled connection, retries transient errors)
+            response = self.client.post(
                 endpoint,
                 data=payload,
                 timeout=self.REQUEST_TIMEOUT
             )
             
             # Parse response
-            response_data = response.json()
-            
-            # Check for success (200 status code)
-            if response.status_code == 200:
-                post_id = response_data.get('id', 'unknown')
-                self.last_post_id = post_id
-                
-                return True, {
-                    'post_id': post_id,
-                    'message': message[:100] + ('...' if len(message) > 100 else ''),
-                    'timestamp': self._get_timestamp(),
-                    'url': f"https://facebook.com/{post_id}"
-                }
-            
-            # Handle errors from Facebook
-            else:
-                error_info = response_data.get('error', {})
-                error_message = error_info.get('message', 'Unknown error from Facebook')
-                error_code = error_info.get('code', response.status_code)
-                error_type = error_info.get('type', 'Unknown')
-                
-                # Map common errors to user-friendly messages
-                detailed_msg = self._interpret_error(error_code, error_message, error_type)
-                
-                self.last_error = detailed_msg
-                
-                return False, {
-                    'error': f"❌ {detailed_msg}",
-                    'error_code': error_code,
-                    'details': error_message,
-                    'error_type': error_type
-                }
+            return self._parse_response(response.status_code, response.json(), message)
         
         except requests.exceptions.Timeout:
             error_msg = "❌ Request timed out (15 seconds). Facebook servers may be slow or unreachable."
@@ -210,6 +200,182 @@ class FacebookPoster:
                 'details': str(e)
             }
     
+    def _acquire_budget(self) -> bool:
+        """Take one request from this page's and token's rate-limit buckets."""
+        keys = KeyedRateLimiter.keys_for(page_id=self.page_id, access_token=self.page_token)
+        return self.rate_limiter.acquire(keys, timeout=config.RATE_LIMIT_MAX_WAIT)
+    
+    def _rate_limited(self) -> Tuple[bool, Dict]:
+        error_msg = "❌ Client-side rate limit reached for this page/token. Try again shortly."
+        self.last_error = error_msg
+        return False, {
+            'error': error_msg,
+            'error_code': 429,
+            'details': f"More than {config.RATE_LIMIT_REQUESTS} requests per {config.RATE_LIMIT_WINDOW}s"
+        }
+    
+    def _parse_response(self, status_code: int, response_data: Dict, message: str) -> Tuple[bool, Dict]:
+        """
+        Build the publish_post result from a Graph response (or batch sub-response).
+        
+        Args:
+            status_code (int): HTTP status of the (sub-)response
+            response_data (dict): Parsed JSON body
+            message (str): Caption that was posted
+        
+        Returns:
+            Tuple[bool, Dict]: (success, response_data) as returned by publish_post
+        """
+        # Check for success (200 status code)
+        if status_code == 200:
+            post_id = response_data.get('id', 'unknown')
+            self.last_post_id = post_id
+            
+            return True, {
+                'post_id': post_id,
+                'message': message[:100] + ('...' if len(message) > 100 else ''),
+                'timestamp': self._get_timestamp(),
+                'url': f"https://facebook.com/{post_id}"
+            }
+        
+        # Handle errors from Facebook
+        error_info = response_data.get('error', {})
+        error_message = error_info.get('message', 'Unknown error from Facebook')
+        error_code = error_info.get('code', status_code)
+        error_type = error_info.get('type', 'Unknown')
+        
+        # Map common errors to user-friendly messages
+        detailed_msg = self._interpret_error(error_code, error_message, error_type)
+        
+        self.last_error = detailed_msg
+        
+        return False, {
+            'error': f"❌ {detailed_msg}",
+            'error_code': error_code,
+            'details': error_message,
+            'error_type': error_type
+        }
+    
+    def publish_batch(self, posts: List[Dict]) -> List[Tuple[bool, Dict]]:
+        """
+        Publish several posts with Graph API batch requests (up to 50 per HTTP call).
+        
+        Args:
+            posts (list): dicts with 'message' (or 'caption') and optional
+                'page_id', 'page_token' and 'media_url'. Missing page_id /
+                page_token default to this poster's credentials, so one batch
+                can cover several pages.
+        
+        Returns:
+            List[Tuple[bool, Dict]]: one publish_post-style result per post, in order.
+            Posts are only resent one by one when Facebook provably did not run
+            them: the batch never left this host, Graph rejected the whole batch
+            with an error body, or a sub-response is null. A timeout or 5xx is
+            reported as an unknown outcome (error_code 'unknown') and not resent,
+            since the posts may already be live.
+        """
+        results = [None] * len(posts)
+        pending = []
+        
+        for i, post in enumerate(posts):
+            poster = FacebookPoster(
+                page_token=post.get('page_token') or self.page_token,
+                page_id=str(post.get('page_id') or self.page_id or ''),
+                client=self.client,
+                rate_limiter=self.rate_limiter
+            )
+            message = post.get('message', post.get('caption'))
+            
+            # Same validation as publish_post - invalid posts never reach Facebook
+            is_valid, validation_msg = poster.validate_credentials()
+            if not is_valid:
+                results[i] = (False, {'error': validation_msg, 'error_code': 400,
+                                      'details': 'Credentials validation failed'})
+            elif not message or not str(message).strip():
+                results[i] = (False, {'error': 'Message is empty', 'error_code': 400,
+                                      'details': 'Please provide caption text'})
+            else:
+                pending.append((i, poster, str(message).strip(), post.get('media_url')))
+        
+        # Every batch operation counts against its page's and token's budget
+        allowed = []
+        for item in pending:
+            if item[1]._acquire_budget():
+                allowed.append(item)
+            else:
+                results[item[0]] = item[1]._rate_limited()
+        
+        for start in range(0, len(allowed), self.BATCH_LIMIT):
+            chunk = allowed[start:start + self.BATCH_LIMIT]
+            for i, result in zip([item[0] for item in chunk], self._publish_chunk(chunk)):
+                results[i] = result
+        
+        return results
+    
+    def _publish_chunk(self, chunk) -> List[Tuple[bool, Dict]]:
+        """One Graph batch call for up to BATCH_LIMIT posts, with per-post fallback."""
+        operations = []
+        for _, poster, message, media_url in chunk:
+            body = {'message': message, 'access_token': poster.page_token}
+            if media_url:
+                body['picture'] = media_url
+            operations.append({
+                'method': 'POST',
+                'relative_url': f"{poster.page_id}/feed",
+                'body': urlencode(body)
+            })
+        
+        def send_individually():
+            return [poster._send(message, media_url) for _, poster, message, media_url in chunk]
+        
+        try:
+            response = self.client.post(
+                '',
+                data={'batch': json.dumps(operations), 'access_token': chunk[0][1].page_token},
+                timeout=self.REQUEST_TIMEOUT * 2
+            )
+        except requests.exceptions.RequestException as e:
+            if never_sent(e):
+                # The batch never reached Facebook - nothing was published
+                return send_individually()
+            return [self._unknown_outcome(str(e)) for _ in chunk]
+        
+        try:
+            sub_responses = response.json()
+        except ValueError:
+            sub_responses = None
+        
+        if response.status_code < 500 and isinstance(sub_responses, dict) and sub_responses.get('error'):
+            # Graph rejected the batch as a whole (no operation ran) - publish individually
+            return send_individually()
+        if (response.status_code != 200 or not isinstance(sub_responses, list)
+                or len(sub_responses) != len(chunk)):
+            # 5xx / unreadable reply: some posts may be live, resending could duplicate them
+            return [self._unknown_outcome(f"HTTP {response.status_code}") for _ in chunk]
+        
+        results = []
+        for (_, poster, message, media_url), sub in zip(chunk, sub_responses):
+            if sub is None:
+                # Not processed by Facebook (e.g. batch timed out) - safe to send on its own
+                results.append(poster._send(message, media_url))
+                continue
+            try:
+                body = json.loads(sub.get('body') or '{}')
+            except ValueError:
+                body = {}
+            results.append(self._parse_response(sub.get('code', 500), body, message))
+        return results
+    
+    def _unknown_outcome(self, details: str) -> Tuple[bool, Dict]:
+        """Result for a batch post whose outcome is unknown (sent, but no usable reply)."""
+        error_msg = "❌ Batch request failed after it was sent - the post may already be live. Check the page before retrying."
+        self.last_error = error_msg
+        return False, {
+            'error': error_msg,
+            'error_code': 'unknown',
+            'details': details
+        }
+    
     def _interpret_error(self, error_code: int, error_message: str, error_type: str) -> str:
         """
         Map Facebook error codes to user-friendly messages.
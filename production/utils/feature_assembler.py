@@ -0,0 +1,79 @@
+"""
+Dense feature assembly for the reach model
+Writes embedding, categorical (OHE) and scaled numeric blocks into one
+preallocated NumPy buffer instead of building and hstacking scipy.sparse
+matrices for every request.
+"""
+import threading
+
+import numpy as np
+from scipy import sparse
+
+import config
+
+
+class ReachFeatureAssembler:
+    """
+    Reusable [embedding | categorical | numeric] buffer for reach inputs
+
+    The buffer grows to the largest batch seen and is then reused. Each
+    thread gets its own buffer, so the returned matrix is a view that is
+    only valid until the same thread calls assemble() again.
+    """
+
+    def __init__(self, num_cols, embedding_dim=384, n_categorical=0, capacity=24):
+        self.num_cols = list(num_cols)
+        self.embedding_dim = int(embedding_dim)
+        self.n_categorical = int(n_categorical)
+        self.capacity = int(capacity)
+        self._local = threading.local()
+
+    @property
+    def width(self):
+        return self.embedding_dim + self.n_categorical + len(self.num_cols)
+
+    def _buffer(self, n_rows):
+        buf = getattr(self._local, "buffer", None)
+        if buf is None or buf.shape[0] < n_rows or buf.shape[1] != self.width:
+            rows = max(n_rows, self.capacity)
+            buf = np.empty((rows, self.width), dtype=np.float64)
+            self._local.buffer = buf
+        return buf[:n_rows]
+
+    def assemble(self, embeddings, numeric_scaled, categorical=None):
+        """
+        Write all blocks in place and return the (n_rows, width) dense matrix
+
+        Args:
+            embeddings: (n_rows, dim) or (1, dim) - a single row is broadcast
+            numeric_scaled: (n_rows, n_num_cols) scaled numeric features
+            categorical: optional (n_rows, n_categorical) one-hot block
+        """
+        embeddings = np.asarray(embeddings)
+        numeric_scaled = np.asarray(numeric_scaled)
+        n_rows = numeric_scaled.shape[0]
+
+        if embeddings.shape[1] != self.embedding_dim:
+            # First call with a different embedder - resize once
+            self.embedding_dim = embeddings.shape[1]
+
+        X = self._buffer(n_rows)
+        emb_end = self.embedding_dim
+        cat_end = emb_end + self.n_categorical
+
+        X[:, :emb_end] = embeddings
+        if self.n_categorical:
+            if categorical is None:
+                X[:, emb_end:cat_end] = 0.0
+            else:
+                X[:, emb_end:cat_end] = categorical.toarray() if sparse.issparse(categorical) else categorical
+        X[:, cat_end:] = numeric_scaled
+        return X
+
+
+def to_model_input(X, sparse_input=None):
+    """Convert to CSR only when the reach model is configured to require it"""
+    if sparse_input is None:
+        sparse_input = config.REACH_MODEL_SPARSE_INPUT
+    return sparse.csr_matrix(X) if sparse_input else X
+
@@ -1,12 +1,13 @@
 """
 Feature engineering utilities - EXACT logic from notebooks
 """
+import sys
 import numpy as np
 import pandas as pd
-import textstat
-import re
 from datetime import datetime
-from utils.preprocess import get_sentiment, count_emojis
+from utils.preprocess import get_sentiment, get_sentiment_batch, count_emojis
+from utils.caption_features import extract
+from utils.readability import flesch_kincaid_grade, flesch_kincaid_grade_batch
 
 # Simple emoji counter to avoid emoji module dependency
 def emoji_count(text):
@@ -31,54 +32,23 @@ def engineer_reach_features(caption, timestamp=None, category="", language=""):
         timestamp = datetime.now()
     
     features = {}
+    text = extract(caption)
     
     # Text features
-    features["char_count"] = len(caption)
-    features["word_count"] = len(caption.split())
+    features["char_count"] = text["char_count"]
+    features["word_count"] = text["word_count"]
     
     # Average word length
-    words = caption.split()
-    features["avg_word_len"] = np.mean([len(w) for w in words]) if len(words) > 0 else 0.0
+    features["avg_word_len"] = text["avg_word_len"]
     
     # Emoji count
-    features["emoji_count"] = emoji_count(caption)
+    features["emoji_count"] = text["num_emojis"]
     
     # Hashtag presence
-    features["has_hashtag"] = 1 if "#" in caption else 0
+    features["has_hashtag"] = text["has_hashtag"]
     
     # Flesch-Kincaid grade
-    try:
-        if len(words) > 0:
-            fk_fn = getattr(textstat, "flesch_kincaid_grade", None)
-            if callable(fk_fn):
-                features["fk_grade"] = fk_fn(caption)
-            else:
-                # fallback to various possible TextStat class locations in different textstat versions
-                TextStatClass = (
-                    getattr(textstat, "TextStat", None)
-                    or getattr(textstat, "Textstat", None)
-                    or getattr(textstat, "textstat", None)
-                )
-                if TextStatClass is None:
-                    # try submodule import
-                    try:
-                        from textstat import textstat as _ttextstat  # type: ignore
-                        TextStatClass = getattr(_ttextstat, "TextStat", None) or getattr(_ttextstat, "Textstat", None) or _ttextstat
-                    except Exception:
-                        TextStatClass = None
-                if TextStatClass is not None:
-                    inst = TextStatClass() if callable(TextStatClass) else TextStatClass
-                    fk_method = getattr(inst, "flesch_kincaid_grade", None)
-                    if callable(fk_method):
-                        features["fk_grade"] = fk_method(caption)
-                    else:
-                        features["fk_grade"] = 0.0
-                else:
-                    features["fk_grade"] = 0.0
-        else:
-            features["fk_grade"] = 0.0
-    except Exception:
-        features["fk_grade"] = 0.0
+    features["fk_grade"] = flesch_kincaid_grade(caption) if text["word_count"] > 0 else 0.0
     
     # Time features
     features["hour"] = timestamp.hour
@@ -111,19 +81,19 @@ def engineer_status_features(caption):
     EXACT logic from status_final_cap_C.ipynb
     """
     features = {}
-    words = caption.split()
+    text = extract(caption)
     
     # Text length features
-    features["text_length"] = len(words)
+    features["text_length"] = text["word_count"]
     
     # Emoji features
-    features["num_emojis"] = count_emojis(caption)
+    features["num_emojis"] = text["num_emojis"]
     
     # Punctuation
-    features["punctuation_count"] = len(re.findall(r'[!?]', caption))
+    features["punctuation_count"] = text["punctuation_count"]
     
     # Link detection
-    features["has_links"] = 1 if re.search(r'http|www', caption) else 0
+    features["has_links"] = text["has_links"]
     
     # Sentiment (mapped: -1, 0, 1)
     features["sentiment"] = get_sentiment(caption)
@@ -133,16 +103,208 @@ def engineer_status_features(caption):
     features["log_engagement"] = 0
     
     # Advanced text features
-    features["avg_word_len"] = np.mean([len(w) for w in words]) if len(words) > 0 else 0.0
-    features["num_hashtags"] = len(re.findall(r'#', caption))
-    features["num_mentions"] = len(re.findall(r'@', caption))
+    features["avg_word_len"] = text["avg_word_len"]
+    features["num_hashtags"] = text["num_hashtags"]
+    features["num_mentions"] = text["num_mentions"]
     
     # Uppercase ratio
-    features["uppercase_ratio"] = sum(1 for c in caption if c.isupper()) / len(caption) if len(caption) > 0 else 0.0
+    features["uppercase_ratio"] = text["uppercase_ratio"]
     
     return features
 
 
+# ============================================
+# BATCH (pandas Series) VERSIONS
+# ============================================
+# Code points str.isspace() / str.split() treat as whitespace (none are above the BMP)
+_WHITESPACE = np.array([c for c in range(0x10000) if chr(c).isspace()], dtype=np.uint32)
+
+
+def _as_series(captions):
+    if isinstance(captions, pd.Series):
+        return captions.astype(str)
+    return pd.Series(list(captions), dtype=object).astype(str)
+
+
+def _codepoints(values):
+    """All captions as one uint32 code-point array plus each caption's [start, end) offsets"""
+    lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+    ends = np.cumsum(lengths)
+    cps = np.frombuffer("".join(values).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    return cps, ends - lengths, ends
+
+
+def _per_caption(mask, starts, ends):
+    """Number of True positions inside each caption's slice of `mask`"""
+    counts = np.zeros(len(starts), dtype=np.int64)
+    nonempty = ends > starts
+    if nonempty.any():
+        # Empty captions are skipped so every reduceat segment is exactly one caption
+        counts[nonempty] = np.add.reduceat(mask.view(np.uint8), starts[nonempty], dtype=np.int64)
+    return counts
+
+
+_UPPER_TABLE = None
+
+
+def _upper_table():
+    """str.isupper() for every code point (built on first use, ~1 MB)"""
+    global _UPPER_TABLE
+    if _UPPER_TABLE is None:
+        size = sys.maxunicode + 1
+        _UPPER_TABLE = np.fromiter(map(str.isupper, map(chr, range(size))), dtype=bool, count=size)
+    return _UPPER_TABLE
+
+
+def _contains(cps, needle, starts, ends):
+    """Per caption: 1 if `needle` occurs inside it (matches may not straddle two captions)"""
+    width = len(needle)
+    hits = np.zeros(len(cps), dtype=bool)
+    n_pos = len(cps) - width + 1
+    if n_pos > 0:
+        found = np.ones(n_pos, dtype=bool)
+        for k, ch in enumerate(needle):
+            found &= cps[k:k + n_pos] == ord(ch)
+        owner_end = np.repeat(ends, ends - starts)[:n_pos]
+        hits[:n_pos] = found & (np.arange(n_pos) + width <= owner_end)
+    return _per_caption(hits, starts, ends) > 0
+
+
+def _text_columns(captions):
+    """Style columns shared by the status and reach batch features (same values as extract())"""
+    values = captions.tolist()
+    cps, starts, ends = _codepoints(values)
+    char_count = ends - starts
+
+    space = np.isin(cps, _WHITESPACE)
+    # A word starts at a non-space character that follows a space or opens its caption
+    after_space = np.concatenate(([True], space[:-1]))
+    after_space[starts[char_count > 0]] = True
+    word_count = _per_caption(~space & after_space, starts, ends)
+    word_chars = char_count - _per_caption(space, starts, ends)
+    avg_word_len = np.where(word_count > 0, word_chars / np.maximum(word_count, 1), 0.0)
+
+    num_upper = _per_caption(_upper_table()[cps], starts, ends)
+    uppercase_ratio = np.where(char_count > 0, num_upper / np.maximum(char_count, 1), 0.0)
+
+    return {
+        "char_count": char_count,
+        "word_count": word_count,
+        "avg_word_len": avg_word_len,
+        "num_emojis": _per_caption(cps >= 0x10000, starts, ends),
+        "num_hashtags": _per_caption(cps == ord('#'), starts, ends),
+        "num_mentions": _per_caption(cps == ord('@'), starts, ends),
+        "punctuation_count": _per_caption((cps == ord('!')) | (cps == ord('?')), starts, ends),
+        "has_links": (_contains(cps, "http", starts, ends) | _contains(cps, "www", starts, ends)).astype(np.int64),
+        "uppercase_ratio": uppercase_ratio,
+    }
+
+
+def engineer_status_features_batch(captions, style_features=None):
+    """
+    engineer_status_features for a whole Series of captions
+    
+    Args:
+        captions: pd.Series (or any iterable) of caption strings
+        style_features: column order (status_style_features.joblib); defaults to
+            the order engineer_status_features returns
+    
+    Returns:
+        DataFrame with one row per caption, index aligned with `captions`
+    """
+    series = _as_series(captions)
+    text = _text_columns(series)
+    zeros = np.zeros(len(series), dtype=np.int64)
+    frame = pd.DataFrame({
+        "text_length": text["word_count"],
+        "num_emojis": text["num_emojis"],
+        "punctuation_count": text["punctuation_count"],
+        "has_links": text["has_links"],
+        "sentiment": get_sentiment_batch(series),
+        "total_engagement": zeros,
+        "log_engagement": zeros,
+        "avg_word_len": text["avg_word_len"],
+        "num_hashtags": text["num_hashtags"],
+        "num_mentions": text["num_mentions"],
+        "uppercase_ratio": text["uppercase_ratio"],
+    }, index=series.index)
+    if style_features is not None:
+        frame = frame.reindex(columns=list(style_features), fill_value=0)
+    return frame
+
+
+def engineer_reach_features_batch(captions, timestamps=None, num_cols=None):
+    """
+    engineer_reach_features for a whole Series of captions
+    
+    Args:
+        captions: pd.Series (or any iterable) of caption strings
+        timestamps: one timestamp shared by every caption, or one per caption
+            (unparseable values fall back to now, like the single-caption version)
+        num_cols: column order (reach_meta["num_cols"]); defaults to the order
+            engineer_reach_features returns
+    
+    Returns:
+        DataFrame with one row per caption, index aligned with `captions`
+    """
+    series = _as_series(captions)
+    text = _text_columns(series)
+    now = datetime.now()
+
+    if not pd.api.types.is_list_like(timestamps):
+        stamp = pd.to_datetime(timestamps, errors="coerce") if isinstance(timestamps, str) else timestamps
+        if not isinstance(stamp, (datetime, pd.Timestamp)) or pd.isna(stamp):
+            stamp = now
+        hour = np.full(len(series), stamp.hour, dtype=np.int64)
+        dow = np.full(len(series), stamp.weekday(), dtype=np.int64)
+    else:
+        stamps = pd.Series(pd.to_datetime(list(timestamps), errors="coerce")).fillna(pd.Timestamp(now))
+        hour = stamps.dt.hour.to_numpy(dtype=np.int64)
+        dow = stamps.dt.dayofweek.to_numpy(dtype=np.int64)
+
+    has_words = text["word_count"] > 0
+    fk_grade = np.zeros(len(series), dtype=float)
+    if has_words.any():
+        fk_grade[has_words] = flesch_kincaid_grade_batch(series[has_words])
+
+    frame = pd.DataFrame({
+        "char_count": text["char_count"],
+        "word_count": text["word_count"],
+        "avg_word_len": text["avg_word_len"],
+        "emoji_count": text["num_emojis"],
+        "has_hashtag": (text["num_hashtags"] > 0).astype(np.int64),
+        "fk_grade": fk_grade,
+        "hour": hour,
+        "dow": dow,
+        "is_weekend": (dow >= 5).astype(np.int64),
+        "hour_sin": np.sin(2 * np.pi * hour / 24),
+        "hour_cos": np.cos(2 * np.pi * hour / 24),
+        "dow_sin": np.sin(2 * np.pi * dow / 7),
+        "dow_cos": np.cos(2 * np.pi * dow / 7),
+    }, index=series.index)
+    if num_cols is not None:
+        frame = frame.reindex(columns=list(num_cols), fill_value=0)
+    return frame
+
+
+def build_status_feature_matrix(captions, style_features):
+    """
+    Build the (n_captions, n_style_features) matrix for the status model
+    Columns follow `style_features` (the order stored in status_style_features.joblib)
+    """
+    return engineer_status_features_batch(captions, style_features).to_numpy(dtype=float)
+
+
+def build_reach_feature_frame(captions, num_cols, timestamp=None):
+    """
+    Build the numeric reach features for many captions as a DataFrame
+    Columns follow `num_cols` (reach_meta["num_cols"]); every caption shares `timestamp`
+    """
+    if timestamp is None:
+        timestamp = datetime.now()
+    return engineer_reach_features_batch(captions, timestamp, num_cols).reset_index(drop=True)
+
+
 def generate_temporal_features(hour):
     """
     Generate temporal features for a specific hour (0-23)
@@ -163,6 +325,7 @@ def generate_temporal_features(hour):
 def predict_reach_for_hours(caption, day_name, embedder, model_registry):
     """
     Predict reach for each hour of a given day using ML model
+    All 24 hours are scored as one matrix in a single predict_proba call
     
     Args:
         caption: Post caption text
@@ -172,85 +335,14 @@ def predict_reach_for_hours(caption, day_name, embedder, model_registry):
     
     Returns:
         List of tuples: (hour_str, reach_probability, hour_int)
+    
+    Raises:
+        ReachSweepError if the reach model call fails
     """
-    from datetime import datetime
-    from scipy import sparse
-    import numpy as np
+    from utils.reach_sweep import ReachSweep, DAY_MAP
     
     # Map day name to integer (Monday=0, ..., Sunday=6)
-    day_map = {
-        "Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3,
-        "Friday": 4, "Saturday": 5, "Sunday": 6
-    }
-    day_int = day_map.get(day_name, 2)
-    
-    # Pre-compute day-level features (same for all hours)
-    day_sin = np.sin(2 * np.pi * day_int / 7)
-    day_cos = np.cos(2 * np.pi * day_int / 7)
-    is_weekend = 1 if day_int in [5, 6] else 0
+    day_int = DAY_MAP.get(day_name, 2)
     
-    # Get caption embedding (single embedding reused for all hours)
-    caption_emb = embedder.encode([caption], convert_to_numpy=True)
-    caption_emb_sparse = sparse.csr_matrix(caption_emb)
-    
-    # Column names for numeric features
-    num_cols = model_registry.reach_meta.get("num_cols", [
-        "char_count", "word_count", "avg_word_len", "emoji_count",
-        "has_hashtag", "fk_grade", "hour", "dow", "is_weekend",
-        "hour_sin", "hour_cos", "dow_sin", "dow_cos"
-    ])
-    
-    results = []
-    
-    # Predict for each hour (0-23)
-    for hour in range(24):
-        # Hour-specific trigonometric encoding
-        hour_sin = np.sin(2 * np.pi * hour / 24)
-        hour_cos = np.cos(2 * np.pi * hour / 24)
-        
-        # Engineer base features for reach
-        reach_features = engineer_reach_features(caption, timestamp=datetime.now(), category="", language="")
-        
-        # Override with specific hour and day
-        reach_features["hour"] = hour
-        reach_features["dow"] = day_int
-        reach_features["is_weekend"] = is_weekend
-        reach_features["hour_sin"] = hour_sin
-        reach_features["hour_cos"] = hour_cos
-        reach_features["dow_sin"] = day_sin
-        reach_features["dow_cos"] = day_cos
-        
-        # Build numeric feature vector
-        num_values = np.array([[reach_features.get(col, 0) for col in num_cols]])
-        num_scaled = model_registry.reach_scaler.transform(num_values)
-        num_sparse = sparse.csr_matrix(num_scaled)
-        
-        # Empty categorical features
-        cat_sparse = sparse.csr_matrix((1, 0))
-        
-        # Combine embeddings + categories + numeric features
-        X = sparse.hstack([caption_emb_sparse, cat_sparse, num_sparse], format="csr")
-        
-        # Get probability prediction
-        try:
-            if hasattr(model_registry.reach_model, "predict_proba"):
-                prob = float(model_registry.reach_model.predict_proba(X)[:, 1][0])
-            else:
-                prob = float(model_registry.reach_model.predict(X)[0])
-        except Exception:
-            prob = 0.0
-        
-        # Convert hour to 12-hour format for display
-        if hour == 0:
-            hour_str = "12:00 AM"
-        elif hour < 12:
-            hour_str = f"{hour}:00 AM"
-        elif hour == 12:
-            hour_str = "12:00 PM"
-        else:
-            hour_str = f"{hour-12}:00 PM"
-        
-        results.append((hour_str, prob, hour))
-    
-    return results
-
+    sweep = ReachSweep(caption, embedder, model_registry)
+    return sweep.day(day_int)
@@ -0,0 +1,217 @@
+"""
+Shared Facebook Graph API client
+One pooled keep-alive requests.Session per process, with exponential backoff
+and jitter for transient / rate-limit errors and a pause when Facebook's
+usage headers say the app or page is close to its quota.
+"""
+import json
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+import config
+
+
+# Graph error codes worth retrying: unknown/temporary service errors and throttling
+RETRYABLE_ERROR_CODES = {1, 2, 4, 17, 32, 341, 613}
+
+# Throttling codes: the call was rejected before it did anything, so even a POST can be resent
+THROTTLE_ERROR_CODES = {4, 17, 32, 613}
+
+USAGE_HEADERS = ("X-App-Usage", "X-Page-Usage", "X-Ad-Account-Usage", "X-Business-Use-Case-Usage")
+
+
+def _error_code(response):
+    """Graph error code from a response body (None if not a Graph error)"""
+    try:
+        error = response.json().get("error") or {}
+    except (ValueError, AttributeError):
+        return None
+    return error.get("code") if isinstance(error, dict) else None
+
+
+def never_sent(error):
+    """True if the request failed before reaching the server (safe to retry a POST)"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def parse_usage_headers(headers):
+    """
+    Usage percentages from Graph rate-limit headers
+
+    Returns:
+        (max_usage_pct, seconds_to_regain_access)
+    """
+    max_pct, regain_seconds = 0.0, 0.0
+    for name in USAGE_HEADERS:
+        raw = headers.get(name)
+        if not raw:
+            continue
+        try:
+            usage = json.loads(raw)
+        except ValueError:
+            continue
+        # X-Business-Use-Case-Usage is {business_id: [ {...}, ... ]}
+        entries = [usage] if name != "X-Business-Use-Case-Usage" else [
+            entry for values in usage.values() for entry in (values if isinstance(values, list) else [values])
+        ]
+        for entry in entries:
+            for key in ("call_count", "total_cputime", "total_time", "acc_id_util_pct"):
+                value = entry.get(key)
+                if isinstance(value, (int, float)):
+                    max_pct = max(max_pct, float(value))
+            minutes = entry.get("estimated_time_to_regain_access")
+            if isinstance(minutes, (int, float)):
+                regain_seconds = max(regain_seconds, float(minutes) * 60)
+    return max_pct, regain_seconds
+
+
+class GraphClient:
+    """
+    Pooled, retrying Graph API client
+
+    Usage:
+    ------
+    client = GraphClient()                                  # or get_graph_client()
+    response = client.post(f"{page_id}/feed", data={...})
+    client = GraphClient(base_url="http://127.0.0.1:9000")  # local stub server
+    """
+
+    def __init__(self, base_url=None, pool_size=None, max_retries=None,
+                 backoff_base=None, backoff_max=None, timeout=None, session=None):
+        self.base_url = (base_url or f"{config.FACEBOOK_GRAPH_URL}/{config.FACEBOOK_API_VERSION}").rstrip("/")
+        self.max_retries = config.GRAPH_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = config.GRAPH_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = config.GRAPH_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.timeout = timeout or config.GRAPH_REQUEST_TIMEOUT
+
+        pool_size = pool_size or config.GRAPH_POOL_SIZE
+        self.session = session or requests.Session()
+        # Retries are handled here (Graph error codes live in the body, not the status line)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.last_usage_pct = 0.0
+        self.retries = 0
+
+    def url(self, path):
+        return path if path.startswith(("http://", "https://")) else f"{self.base_url}/{path.lstrip('/')}"
+
+    # ---------- retry policy ----------
+    def _backoff(self, attempt, response=None):
+        """Full-jitter exponential backoff, honouring Retry-After when present"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def is_retryable(response, idempotent=True):
+        """
+        Whether a response is worth resending
+
+        A 5xx or code 1/2 on a POST may come after Facebook already created the
+        object, so non-idempotent requests are only retried when throttled.
+        """
+        if not idempotent:
+            return _error_code(response) in THROTTLE_ERROR_CODES
+        return response.status_code >= 500 or _error_code(response) in RETRYABLE_ERROR_CODES
+
+    def _count_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def _record_usage(self, response):
+        pct, regain = parse_usage_headers(response.headers)
+        with self._lock:
+            self.last_usage_pct = pct
+            if regain or pct >= config.GRAPH_USAGE_PAUSE_PCT:
+                # Close to (or over) quota - hold further calls instead of burning retries
+                pause = min(regain or self.backoff_max, self.backoff_max)
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def _wait_if_paused(self):
+        with self._lock:
+            delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            print(f"[INFO] Graph API usage at {self.last_usage_pct:.0f}% - pausing {delay:.1f}s")
+            time.sleep(delay)
+
+    # ---------- requests ----------
+    def request(self, method, path, timeout=None, **kwargs):
+        """
+        Send a Graph request, retrying transient failures
+
+        Args:
+            method: "GET" / "POST" / "DELETE"
+            path: node/edge path relative to the API version (e.g. "123/feed") or a full URL
+            **kwargs: passed to requests (params, data, json, ...)
+
+        Returns:
+            requests.Response - the last response if retries are exhausted
+
+        Raises:
+            requests.exceptions.RequestException on network failure. A POST that
+            timed out after being sent is not retried, since Facebook may already
+            have created the post; a POST response is only retried when throttled.
+        """
+        url = self.url(path)
+        timeout = timeout or self.timeout
+        idempotent = method.upper() in ("GET", "HEAD", "DELETE")
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_if_paused()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.max_retries or not (idempotent or never_sent(e)):
+                    raise
+                self._count_retry()
+                time.sleep(self._backoff(attempt))
+                continue
+
+            self._record_usage(response)
+            if attempt >= self.max_retries or not self.is_retryable(response, idempotent):
+                return response
+
+            self._count_retry()
+            time.sleep(self._backoff(attempt, response))
+
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_graph_client():
+    """Process-wide GraphClient (base URL from FACEBOOK_GRAPH_URL env / config)"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                settings = config.load_config()
+                _shared_client = GraphClient(
+                    base_url=f"{settings['facebook_graph_url']}/{config.FACEBOOK_API_VERSION}"
+                )
+    return _shared_client
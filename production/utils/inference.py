@@ -2,8 +2,37 @@
 Model inference functions - unified prediction interface
 """
 import numpy as np
-from scipy import sparse
-from utils.feature_engineering import engineer_reach_features, engineer_status_features
+import pandas as pd
+
+import config
+from utils.feature_assembler import to_model_input
+from utils.feature_engineering import (
+    engineer_reach_features,
+    engineer_status_features,
+    build_status_feature_matrix,
+    build_reach_feature_frame,
+)
+
+
+FALLBACK_EMOTIONS = {"anger": 0.1, "fear": 0.1, "joy": 0.2, "neutral": 0.4, "sadness": 0.1, "surprise": 0.1}
+
+
+def encode_captions(embedder, captions):
+    """
+    Encode many captions with one embedder call
+    The embedder batches internally in config.EMBEDDER_BATCH_SIZE chunks
+    """
+    return embedder.encode(
+        list(captions),
+        batch_size=config.EMBEDDER_BATCH_SIZE,
+        convert_to_numpy=True,
+    )
+
+
+def _calibrate_status(rf_prob):
+    """Sigmoid calibration centered at 0.46 (the observed RF mean)"""
+    z_score = (rf_prob - 0.46) / 0.008
+    return 1.0 / (1.0 + np.exp(-z_score))
 
 
 class EmotionPredictor:
@@ -17,19 +46,13 @@ class EmotionPredictor:
         Supports: anger, fear, joy, neutral, sadness, surprise
         """
         try:
-            from transformers import pipeline as hf_pipeline
+            from utils.model_loader import get_emotion_engine
             
-            # Initialize emotion pipeline (will download model on first use)
-            # top_k=None to get all 6 emotion probabilities
-            emotion_pipe = hf_pipeline(
-                "text-classification",
-                model="j-hartmann/emotion-english-distilroberta-base",
-                top_k=None,  # Get all emotion scores
-                device=-1  # CPU (use 0 for GPU if available)
-            )
+            # Reuse the process-wide pipeline (loaded once, see EmotionEngine)
+            engine = model_registry.emotion_engine if model_registry is not None else get_emotion_engine()
             
             # Get predictions for all emotions
-            results = emotion_pipe(text[:512])[0]  # Get first (and only) result
+            results = engine.classify(text)
             
             # Sort by score descending
             results = sorted(results, key=lambda x: x['score'], reverse=True)
@@ -53,9 +76,39 @@ class EmotionPredictor:
             return {
                 "emotion": "neutral",
                 "confidence": 0.5,
-                "all_emotions": {"anger": 0.1, "fear": 0.1, "joy": 0.2, "neutral": 0.4, "sadness": 0.1, "surprise": 0.1},
+                "all_emotions": dict(FALLBACK_EMOTIONS),
                 "note": f"Using fallback (error: {str(e)})"
             }
+    
+    @staticmethod
+    def predict_batch(texts, model_registry=None):
+        """
+        Predict emotions for many texts with one pipeline call
+        Returns a DataFrame with the same fields as predict(), or {"error": ...} on failure
+        """
+        texts = list(texts)
+        try:
+            from utils.model_loader import get_emotion_engine
+            
+            engine = model_registry.emotion_engine if model_registry is not None else get_emotion_engine()
+            batch_results = engine.classify_batch(texts)
+            
+            rows = []
+            for results in batch_results:
+                results = sorted(results, key=lambda x: x['score'], reverse=True)
+                rows.append({
+                    "emotion": results[0]['label'],
+                    "confidence": float(results[0]['score']),
+                    "all_emotions": {r['label']: float(r['score']) for r in results},
+                })
+            return pd.DataFrame(rows, columns=["emotion", "confidence", "all_emotions"])
+        except Exception as e:
+            return pd.DataFrame({
+                "emotion": ["neutral"] * len(texts),
+                "confidence": [0.5] * len(texts),
+                "all_emotions": [dict(FALLBACK_EMOTIONS) for _ in texts],
+                "note": [f"Using fallback (error: {str(e)})"] * len(texts),
+            })
 
 
 class ReachPredictor:
@@ -78,24 +131,15 @@ class ReachPredictor:
             
             # Get text embedding
             caption_emb = embedder.encode([caption], convert_to_numpy=True)
-            caption_emb_sparse = sparse.csr_matrix(caption_emb)
             
             # Get numeric features in correct order
-            num_cols = model_registry.reach_meta.get("num_cols", [
-                "char_count", "word_count", "avg_word_len", "emoji_count",
-                "has_hashtag", "fk_grade", "hour", "dow", "is_weekend",
-                "hour_sin", "hour_cos", "dow_sin", "dow_cos"
-            ])
+            num_cols = model_registry.reach_meta.get("num_cols", config.REACH_NUMERIC_FEATURES)
             
             num_values = np.array([[reach_features.get(col, 0) for col in num_cols]])
             num_scaled = model_registry.reach_scaler.transform(num_values)
-            num_sparse = sparse.csr_matrix(num_scaled)
             
-            # Empty categorical
-            cat_sparse = sparse.csr_matrix((1, 0))
-            
-            # Combine
-            X = sparse.hstack([caption_emb_sparse, cat_sparse, num_sparse], format="csr")
+            # Combine embedding + (empty) categorical + numeric in the reusable buffer
+            X = to_model_input(model_registry.reach_assembler.assemble(caption_emb, num_scaled))
             
             # Predict
             if hasattr(model_registry.reach_model, "predict_proba"):
@@ -113,6 +157,43 @@ class ReachPredictor:
             }
         except Exception as e:
             return {"error": f"Reach prediction failed: {str(e)}"}
+    
+    @staticmethod
+    def predict_batch(captions, embedder=None, model_registry=None, embeddings=None, timestamp=None):
+        """
+        Predict reach for many captions with one predict_proba call
+        Pass precomputed `embeddings` to skip encoding
+        Returns a DataFrame with the same fields as predict(), or {"error": ...} on failure
+        """
+        if model_registry is None or model_registry.reach_model is None or (embedder is None and embeddings is None):
+            return {"error": "Reach model or embedder not loaded"}
+        
+        try:
+            captions = list(captions)
+            if embeddings is None:
+                embeddings = encode_captions(embedder, captions)
+        
+            num_cols = model_registry.reach_meta.get("num_cols", config.REACH_NUMERIC_FEATURES)
+            features = build_reach_feature_frame(captions, num_cols, timestamp=timestamp)
+            num_scaled = model_registry.reach_scaler.transform(features.to_numpy(dtype=float))
+        
+            # Embeddings + empty categorical block + scaled numeric block
+            X = to_model_input(model_registry.reach_assembler.assemble(embeddings, num_scaled))
+        
+            if hasattr(model_registry.reach_model, "predict_proba"):
+                probs = model_registry.reach_model.predict_proba(X)[:, 1].astype(float)
+            else:
+                probs = model_registry.reach_model.predict(X).astype(float)
+        
+            threshold = model_registry.reach_threshold
+            return pd.DataFrame({
+                "probability": probs,
+                "prediction": np.where(probs >= threshold, "High Reach", "Low Reach"),
+                "threshold": threshold,
+                "features": features.to_dict(orient="records"),
+            })
+        except Exception as e:
+            return {"error": f"Reach prediction failed: {str(e)}"}
 
 
 class StatusPredictor:
@@ -149,8 +230,7 @@ class StatusPredictor:
             rf_prob = model_registry.status_rf.predict_proba(X)[:, 1][0]
             
             # Apply sigmoid calibration centered at 0.46 (the observed mean)
-            z_score = (rf_prob - 0.46) / 0.008
-            calibrated_score = 1.0 / (1.0 + np.exp(-z_score))
+            calibrated_score = _calibrate_status(rf_prob)
             
             label = "Fake/Spam" if calibrated_score >= 0.55 else "Real"
             
@@ -162,3 +242,80 @@ class StatusPredictor:
             }
         except Exception as e:
             return {"error": f"Status prediction failed: {str(e)}"}
+    
+    @staticmethod
+    def predict_batch(captions, embedder=None, model_registry=None, embeddings=None):
+        """
+        Predict fake/real status for many captions with one predict_proba call
+        Pass precomputed `embeddings` to skip encoding
+        Returns a DataFrame with the same fields as predict(), or {"error": ...} on failure
+        """
+        if model_registry is None:
+            return {"error": "Model registry not loaded"}
+        if embedder is None and embeddings is None:
+            return {"error": "Embedder not loaded"}
+        if model_registry.status_rf is None:
+            return {"error": "Status RF model not loaded"}
+        
+        try:
+            captions = list(captions)
+            if embeddings is None:
+                embeddings = encode_captions(embedder, captions)
+            
+            style_values = build_status_feature_matrix(captions, model_registry.status_style_features)
+            X = np.hstack([embeddings, style_values])
+            
+            rf_prob = model_registry.status_rf.predict_proba(X)[:, 1]
+            calibrated = _calibrate_status(rf_prob).astype(float)
+            
+            return pd.DataFrame({
+                "status": np.where(calibrated >= 0.55, "Fake/Spam", "Real"),
+                "suspicion_score": calibrated,
+                "threshold": 0.55,
+                "confidence": np.abs(calibrated - 0.5) * 2,
+            })
+        except Exception as e:
+            return {"error": f"Status prediction failed: {str(e)}"}
+
+
+def predict_batch(captions, embedder, model_registry, tasks=("status", "emotion", "reach")):
+    """
+    Score many captions across emotion, status and reach in one pass
+    
+    Captions are encoded once and the embeddings are shared by the status and
+    reach models. Each model's predict_proba is called once for the whole batch.
+    
+    Returns:
+        DataFrame with a `caption` column plus `<task>_<field>` columns
+    """
+    captions = [str(c) for c in captions]
+    result = pd.DataFrame({"caption": captions})
+    if not captions:
+        return result
+    
+    embeddings, embed_error = None, None
+    if "status" in tasks or "reach" in tasks:
+        try:
+            embeddings = encode_captions(embedder, captions)
+        except Exception as e:
+            embed_error = {"error": f"Embedding failed: {str(e)}"}
+    
+    frames = {}
+    if "status" in tasks:
+        frames["status"] = embed_error or StatusPredictor.predict_batch(
+            captions, model_registry=model_registry, embeddings=embeddings)
+    if "emotion" in tasks:
+        frames["emotion"] = EmotionPredictor.predict_batch(captions, model_registry=model_registry)
+    if "reach" in tasks:
+        frames["reach"] = embed_error or ReachPredictor.predict_batch(
+            captions, model_registry=model_registry, embeddings=embeddings)
+    
+    for task, frame in frames.items():
+        if isinstance(frame, dict):
+            result[f"{task}_error"] = frame["error"]
+            continue
+        for col in frame.columns:
+            name = col if col.startswith(task) else f"{task}_{col}"
+            result[name] = frame[col].to_numpy()
+    
+    return result
@@ -0,0 +1,262 @@
+"""
+Append-only journal backend for PostStorage
+Every add / update / delete appends one JSON line to a journal instead of
+rewriting the whole JSON file. Every `compact_every` entries the current state
+is written as a snapshot (the regular scheduled_posts.json, replaced
+atomically) and the journal starts over. Startup loads the snapshot and
+replays the journal on top of it.
+
+Entries carry the full post, so replaying them is idempotent: a crash between
+writing the snapshot and resetting the journal still converges to the right
+state. A torn last line (crash mid-append) is ignored and truncated by the
+next writer.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import config
+from utils.post_storage import serialize_post, deserialize_post, write_json_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows - single-process use only
+    fcntl = None
+
+
+def _file_id(path):
+    """(device, inode, mtime) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_dev, st.st_ino, st.st_mtime_ns
+
+
+class JournalPostStore:
+    """
+    Scheduled posts as snapshot + write-ahead journal
+
+    Several processes (app, scheduler daemon) can share the files: writers
+    serialize on a lock file, and every call first replays entries appended
+    by other processes since the last call (O(new entries), not O(posts)).
+    """
+
+    def __init__(self, snapshot_path, journal_path, fsync=None, fsync_interval=None, compact_every=None):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.fsync = fsync or config.POST_JOURNAL_FSYNC
+        self.fsync_interval = fsync_interval if fsync_interval is not None else config.POST_JOURNAL_FSYNC_INTERVAL
+        self.compact_every = compact_every or config.POST_JOURNAL_COMPACT_EVERY
+        if self.fsync not in ("always", "interval", "never"):
+            raise ValueError(f"Unknown POST_JOURNAL_FSYNC policy: {self.fsync!r}")
+
+        self._lock = threading.RLock()
+        self._posts = {}             # post id -> serialized (JSON-safe) post
+        self._snapshot_id = None
+        self._journal_id = None
+        self._offset = 0             # bytes of the journal already applied
+        self._entries = 0            # entries in the journal since the last compaction
+        self._last_fsync = 0.0
+
+        with self._lock:
+            self._catch_up()
+
+    # ---------- replay ----------
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return {}
+        with open(self.snapshot_path, 'r') as f:
+            return {post['id']: post for post in json.load(f)}
+
+    def _apply(self, entry):
+        op = entry.get('op')
+        if op in ('add', 'update'):
+            self._posts.pop(entry.get('id'), None)
+            self._posts[entry['post']['id']] = entry['post']
+        elif op == 'delete':
+            self._posts.pop(entry['id'], None)
+
+    def _catch_up(self):
+        """Apply snapshot / journal changes made since the last call (caller holds _lock)"""
+        snapshot_id = _file_id(self.snapshot_path)
+        if snapshot_id != self._snapshot_id:
+            # First load, or another process compacted - start from the new snapshot
+            self._posts = self._read_snapshot()
+            self._snapshot_id = snapshot_id
+            self._offset = 0
+            self._entries = 0
+
+        journal_id = _file_id(self.journal_path)
+        if journal_id is None:
+            self._journal_id, self._offset, self._entries = None, 0, 0
+            return
+        if self._journal_id is None or journal_id[:2] != self._journal_id[:2]:
+            # New journal file (created or reset by a compaction)
+            self._journal_id = journal_id
+            self._offset = 0
+            self._entries = 0
+
+        with open(self.journal_path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+
+        # Only complete lines are applied; an unterminated tail is a torn write
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError) as e:
+                print(f"[ERROR] Skipping corrupt journal entry: {e}")
+            self._entries += 1
+        self._offset += end
+
+    # ---------- writes ----------
+    @contextmanager
+    def _write_lock(self):
+        with self._lock:
+            with open(f"{self.journal_path}.lock", 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._catch_up()
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _sync(self, fd):
+        if self.fsync == "always":
+            os.fsync(fd)
+        elif self.fsync == "interval":
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(fd)
+                self._last_fsync = now
+
+    def _append(self, entry):
+        """Append one entry (caller holds _write_lock)"""
+        line = (json.dumps(entry) + "\n").encode('utf-8')
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            st = os.fstat(fd)
+            if self._journal_id is None:
+                self._journal_id = (st.st_dev, st.st_ino, st.st_mtime_ns)
+            if st.st_size > self._offset:
+                # Drop a torn line left by a crashed writer
+                os.ftruncate(fd, self._offset)
+            os.write(fd, line)
+            self._sync(fd)
+        finally:
+            os.close(fd)
+
+        self._offset += len(line)
+        self._entries += 1
+        self._apply(entry)
+
+        if self._entries >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        """Write the current state as the snapshot and start an empty journal (caller holds _write_lock)"""
+        write_json_atomic(self.snapshot_path, list(self._posts.values()))
+
+        tmp_path = f"{self.journal_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+        self._snapshot_id = _file_id(self.snapshot_path)
+        self._journal_id = _file_id(self.journal_path)
+        self._offset = 0
+        self._entries = 0
+
+    def compact(self):
+        """Fold the journal into the snapshot now"""
+        with self._write_lock():
+            self._compact()
+
+    # ---------- PostStorage backend API ----------
+    def load_posts(self):
+        try:
+            with self._lock:
+                self._catch_up()
+                return [deserialize_post(post.copy()) for post in self._posts.values()]
+        except Exception as e:
+            print(f"Error loading posts: {e}")
+            return []
+
+    def save_posts(self, posts):
+        try:
+            with self._write_lock():
+                self._posts = {post['id']: serialize_post(post) for post in posts}
+                # A full replacement is written straight to the snapshot
+                self._compact()
+            return True
+        except Exception as e:
+            print(f"Error saving posts: {e}")
+            return False
+
+    def add_post(self, post):
+        try:
+            with self._write_lock():
+                if post.get('id') is None:
+                    # Picked under the cross-process write lock, so writers never collide
+                    post['id'] = max(self._posts, default=0) + 1
+                elif post['id'] in self._posts:
+                    print(f"Error saving post: id {post['id']} already exists")
+                    return False
+                self._append({'op': 'add', 'id': post['id'], 'post': serialize_post(post)})
+            return True
+        except Exception as e:
+            print(f"Error saving post: {e}")
+            return False
+
+    def update_post(self, post_id, updated_post):
+        try:
+            with self._write_lock():
+                if post_id not in self._posts:
+                    return False
+                self._append({'op': 'update', 'id': post_id, 'post': serialize_post(updated_post)})
+            return True
+        except Exception as e:
+            print(f"Error saving post: {e}")
+            return False
+
+    def delete_post(self, post_id):
+        try:
+            with self._write_lock():
+                if post_id not in self._posts:
+                    return False
+                self._append({'op': 'delete', 'id': post_id})
+            return True
+        except Exception as e:
+            print(f"Error deleting post: {e}")
+            return False
+
+    def get_post(self, post_id):
+        with self._lock:
+            self._catch_up()
+            post = self._posts.get(post_id)
+            return deserialize_post(post.copy()) if post is not None else None
+
+    def load_pending(self, due_before=None):
+        pending = [
+            p for p in self.load_posts()
+            if p.get('status') == 'Pending' and isinstance(p.get('scheduled_dt'), datetime)
+            and (due_before is None or p['scheduled_dt'] <= due_before)
+        ]
+        return sorted(pending, key=lambda p: p['scheduled_dt'])
+
+    def next_post_id(self):
+        with self._lock:
+            self._catch_up()
+            return max(self._posts, default=0) + 1
+
+    def change_token(self):
+        return _file_id(self.snapshot_path), _file_id(self.journal_path)
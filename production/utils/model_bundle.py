@@ -0,0 +1,268 @@
+"""
+Versioned single-file model bundles
+export_models.py --bundle packs every artifact of a task (emotion, reach,
+status) into models/<task>.bundle: an uncompressed zip whose first member is
+manifest.json with the bundle version, per-artifact SHA-256 and size, the
+feature order, decision threshold and embedder the models were trained with,
+and the input width each model expects.
+
+ModelRegistry reads a bundle with one sequential read, checks it against the
+manifest and the running config, and deserializes members only when their
+artifact is first used. A model whose input width does not match the
+recorded feature order is rejected instead of failing at predict time.
+"""
+import hashlib
+import io
+import json
+import os
+import platform
+import zipfile
+from datetime import datetime, timezone
+
+import joblib
+
+import config
+
+
+BUNDLE_FORMAT = "inspiroai-model-bundle"
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_SUFFIX = ".bundle"
+MANIFEST_NAME = "manifest.json"
+
+# Library versions recorded in the manifest (unpickling across versions is the usual breakage)
+_RECORDED_LIBRARIES = ("numpy", "sklearn", "joblib", "xgboost", "lightgbm", "catboost")
+
+# Models whose n_features_in_ is checked: artifact file -> input layout
+_REACH_MODELS = {"reach_voting.joblib": "embedding+num", "reach_voting.onnx": "embedding+num",
+                 "reach_scaler.joblib": "num"}
+_STATUS_MODELS = {name: "embedding+style" for name in (
+    "status_xgb.joblib", "status_rf.joblib", "status_lgb.joblib", "status_rf.onnx")}
+
+
+class BundleError(ValueError):
+    """A bundle is corrupt or does not match its manifest / the running config"""
+
+
+def bundle_path(models_dir, task):
+    return os.path.join(models_dir, f"{task}{BUNDLE_SUFFIX}")
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _library_versions():
+    versions = {"python": platform.python_version()}
+    for name in _RECORDED_LIBRARIES:
+        try:
+            versions[name] = __import__(name).__version__
+        except Exception:
+            continue
+    return versions
+
+
+def _member_kind(filename):
+    return {".json": "json", ".onnx": "onnx"}.get(os.path.splitext(filename)[1], "joblib")
+
+
+def _deserialize(raw, kind):
+    if kind == "json":
+        return json.loads(raw.decode("utf-8"))
+    if kind == "onnx":
+        from utils.onnx_backend import OnnxClassifier
+        return OnnxClassifier(raw)
+    return joblib.load(io.BytesIO(raw))
+
+
+# ============================================
+# MANIFEST CONTENT PER TASK
+# ============================================
+def _task_metadata(task, load):
+    """
+    Embedder, feature order, thresholds and expected model widths for a task
+
+    Args:
+        task: "emotion", "reach" or "status"
+        load: callable(filename, kind) returning a deserialized artifact
+    """
+    embedding_dim = config.EMBEDDING_DIM
+    if task == "reach":
+        meta = load("reach_meta.json", "json")
+        num_cols = list(meta.get("num_cols", config.REACH_NUMERIC_FEATURES))
+        widths = {"embedding+num": embedding_dim + len(num_cols), "num": len(num_cols)}
+        return {
+            "embedder": meta.get("embedder", config.EMBEDDER_MODEL),
+            "embedding_dim": embedding_dim,
+            "feature_order": {"num_cols": num_cols, "cat_cols": list(meta.get("cat_cols", []))},
+            "thresholds": {"reach": load("reach_thresh.joblib", "joblib").get("best_thresh", 0.40)},
+            "n_features": {name: widths[layout] for name, layout in _REACH_MODELS.items()},
+        }
+    if task == "status":
+        style = list(load("status_style_features.joblib", "joblib"))
+        meta = load("status_meta.json", "json")
+        return {
+            "embedder": config.EMBEDDER_MODEL,
+            "embedding_dim": embedding_dim,
+            "feature_order": {"style_features": style},
+            "thresholds": {"status": meta.get("best_threshold", 0.55)},
+            "n_features": {name: embedding_dim + len(style) for name in _STATUS_MODELS},
+        }
+    # Emotion pipeline works on raw text
+    return {"embedder": None, "embedding_dim": None, "feature_order": {}, "thresholds": {}, "n_features": {}}
+
+
+def check_n_features(obj, expected, name):
+    """Raise BundleError if a fitted model / scaler expects a different input width"""
+    actual = getattr(obj, "n_features_in_", None)
+    if expected is not None and actual is not None and int(actual) != int(expected):
+        raise BundleError(f"{name} expects {actual} features, manifest feature order gives {expected}")
+
+
+# ============================================
+# WRITE
+# ============================================
+def write_bundle(models_dir, task, files, version=None, out_path=None):
+    """
+    Pack a task's artifacts into one bundle
+
+    The artifacts are loaded once so the manifest's feature order and
+    widths can be checked against the fitted models; an inconsistent set
+    (e.g. a scaler from another training run) is refused.
+
+    Args:
+        models_dir: folder holding the loose artifacts
+        task: "emotion", "reach" or "status"
+        files: artifact filenames (ModelRegistry filenames of the task, plus
+            any ONNX exports)
+        version: bundle version label (default: UTC timestamp)
+        out_path: destination (default: models_dir/<task>.bundle)
+
+    Returns:
+        (path, manifest)
+    """
+    raw = {}
+    for filename in sorted(set(files)):
+        with open(os.path.join(models_dir, filename), "rb") as f:
+            raw[filename] = f.read()
+
+    kinds = {name: _member_kind(name) for name in raw}
+    cache = {}
+
+    def load(filename, kind):
+        if filename not in cache:
+            cache[filename] = _deserialize(raw[filename], kind)
+        return cache[filename]
+
+    metadata = _task_metadata(task, load)
+    metadata["n_features"] = {name: n for name, n in metadata["n_features"].items() if name in raw}
+    for filename, expected in metadata["n_features"].items():
+        check_n_features(load(filename, kinds[filename]), expected, filename)
+
+    created = datetime.now(timezone.utc)
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "task": task,
+        "version": version or created.strftime("%Y%m%d%H%M%S"),
+        "created_at": created.isoformat(),
+        **metadata,
+        "members": {
+            name: {"kind": kinds[name], "bytes": len(data), "sha256": _sha256(data)}
+            for name, data in raw.items()
+        },
+        "libraries": _library_versions(),
+    }
+
+    out_path = out_path or bundle_path(models_dir, task)
+    tmp_path = out_path + ".tmp"
+    # Stored (not deflated): joblib dumps are already compact and loading stays one plain read
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED) as zf:
+        zf.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+        for name, data in raw.items():
+            zf.writestr(name, data)
+    os.replace(tmp_path, out_path)
+    return out_path, manifest
+
+
+# ============================================
+# READ
+# ============================================
+class ModelBundle:
+    """
+    A bundle read into memory and verified
+
+    Usage:
+    ------
+    bundle = ModelBundle.read("models/reach.bundle", task="reach")
+    model = bundle.load("reach_voting.joblib")
+    """
+
+    def __init__(self, path, manifest, members):
+        self.path = path
+        self.manifest = manifest
+        self._members = members
+
+    @classmethod
+    def read(cls, path, task=None, embedder=None, embedding_dim=None):
+        """
+        Read a bundle in one sequential read and validate it
+
+        Raises:
+            BundleError if the container, a checksum, the task, the embedder
+            or the embedding width does not match
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+
+        try:
+            zf = zipfile.ZipFile(io.BytesIO(data))
+            manifest = json.loads(zf.read(MANIFEST_NAME).decode("utf-8"))
+            members = {name: zf.read(name) for name in manifest.get("members", {})}
+        except (zipfile.BadZipFile, KeyError, ValueError) as e:
+            raise BundleError(f"{path} is not a readable model bundle: {e}")
+
+        if manifest.get("format") != BUNDLE_FORMAT:
+            raise BundleError(f"{path} is not a model bundle (format {manifest.get('format')!r})")
+        if manifest.get("format_version", 0) > BUNDLE_FORMAT_VERSION:
+            raise BundleError(f"{path} uses bundle format v{manifest['format_version']}, "
+                              f"this build reads up to v{BUNDLE_FORMAT_VERSION}")
+        if task is not None and manifest.get("task") != task:
+            raise BundleError(f"{path} holds task {manifest.get('task')!r}, expected {task!r}")
+
+        for name, info in manifest["members"].items():
+            if len(members[name]) != info["bytes"] or _sha256(members[name]) != info["sha256"]:
+                raise BundleError(f"{path}: checksum mismatch for {name}")
+
+        if manifest.get("embedder") is not None:
+            embedder = embedder or config.EMBEDDER_MODEL
+            embedding_dim = embedding_dim or config.EMBEDDING_DIM
+            if manifest["embedder"] != embedder:
+                raise BundleError(f"{path} was trained with embedder {manifest['embedder']!r}, "
+                                  f"config uses {embedder!r}")
+            if manifest.get("embedding_dim") != embedding_dim:
+                raise BundleError(f"{path} expects {manifest.get('embedding_dim')}-d embeddings, "
+                                  f"config gives {embedding_dim}")
+
+        return cls(path, manifest, members)
+
+    @property
+    def version(self):
+        return self.manifest.get("version")
+
+    def __contains__(self, filename):
+        return filename in self.manifest["members"]
+
+    def member_bytes(self, filename):
+        return self.manifest["members"][filename]["bytes"]
+
+    def release(self):
+        """Free the raw member bytes (the manifest is kept)"""
+        self._members = {}
+
+    def load(self, filename):
+        """Deserialize one member, checking its input width against the manifest"""
+        if filename not in self._members:
+            raise BundleError(f"{self.path} has no member {filename} (or it was released)")
+        obj = _deserialize(self._members[filename], self.manifest["members"][filename]["kind"])
+        check_n_features(obj, self.manifest.get("n_features", {}).get(filename), filename)
+        return obj
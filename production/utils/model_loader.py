@@ -3,15 +3,104 @@ Model loading utilities - handles all model artifacts
 """
 import os
 import json
+import time
+import threading
+import tracemalloc
 import joblib
 import numpy as np
 from pathlib import Path
 
+import config
+
+
+def _current_rss_bytes():
+    """Resident set size of this process (Linux only, None elsewhere)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+
+class _Artifact:
+    """
+    Registry attribute that is read from disk the first time it is accessed
+    
+    Failed loads are recorded once and fall back to `default` (None for
+    models), matching the old eager loader which left attributes at None.
+    `onnx` names the export served instead when MODEL_BACKEND is "onnx".
+    """
+    
+    def __init__(self, filename, group, kind="joblib", transform=None, default=None, onnx=None):
+        self.filename = filename
+        self.group = group
+        self.kind = kind
+        self.onnx = onnx
+        self.transform = transform
+        self.default = default
+        self.name = None
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, registry, owner=None):
+        if registry is None:
+            return self
+        if self.name not in registry._artifacts:
+            registry._load_artifact(self)
+        return registry._artifacts[self.name]
+    
+    def __set__(self, registry, value):
+        registry._artifacts[self.name] = value
+    
+    def default_value(self):
+        return self.default() if callable(self.default) else self.default
+
 
 class ModelRegistry:
-    """Central registry for all trained models"""
+    """
+    Central registry for all trained models
     
-    def __init__(self, models_dir="models"):
+    Artifacts load lazily on first attribute access, so a process only pays
+    for the models it actually uses. Call preload([...]) to warm specific
+    artifacts (or whole groups: "emotion", "reach", "status") up front.
+    Per-artifact load time and memory footprint are kept in `load_stats`.
+    
+    When models_dir holds a <group>.bundle (export_models.py --bundle) and
+    config.MODEL_BUNDLES is on, that group is read from the bundle instead
+    of the loose files; a bundle that fails validation leaves its artifacts
+    at their defaults with the error recorded, it is never silently skipped.
+    
+    With backend="onnx" (config.MODEL_BACKEND), models that have an ONNX
+    export (export_models.py --onnx) run on onnxruntime instead of sklearn.
+    """
+    
+    # Emotion (TF-IDF + LinearSVC) - unused by EmotionPredictor, kept for notebooks
+    emotion_model = _Artifact("emotion_svm_pipeline.joblib", "emotion")
+    emotion_le = _Artifact("emotion_label_encoder.joblib", "emotion")
+    
+    # Reach (VotingClassifier + preprocessing)
+    reach_model = _Artifact("reach_voting.joblib", "reach", onnx="reach_voting.onnx")
+    reach_ohe = _Artifact("reach_ohe.joblib", "reach")
+    reach_scaler = _Artifact("reach_scaler.joblib", "reach")
+    reach_meta = _Artifact("reach_meta.json", "reach", kind="json", default=dict)
+    reach_threshold = _Artifact(
+        "reach_thresh.joblib", "reach",
+        transform=lambda data: data.get("best_thresh", 0.40), default=0.40
+    )
+    
+    # Status (fake/real) ensemble
+    status_xgb = _Artifact("status_xgb.joblib", "status")
+    status_rf = _Artifact("status_rf.joblib", "status", onnx="status_rf.onnx")
+    status_lgb = _Artifact("status_lgb.joblib", "status")
+    status_style_features = _Artifact("status_style_features.joblib", "status", default=list)
+    status_meta = _Artifact("status_meta.json", "status", kind="json", default=dict)
+    status_threshold = _Artifact(
+        "status_meta.json", "status", kind="json",
+        transform=lambda meta: meta.get("best_threshold", 0.55), default=0.55
+    )
+    
+    def __init__(self, models_dir="models", mmap_mode=None, use_bundles=None, backend=None, track_memory=None):
         # Fix path for Streamlit Cloud - use absolute path if relative path doesn't work
         if not os.path.isabs(models_dir):
             # Try relative path first
@@ -28,96 +117,222 @@ class ModelRegistry:
         print(f"[INFO] Models directory set to: {self.models_dir}")
         print(f"[INFO] Models directory exists: {os.path.exists(self.models_dir)}")
         
-        self.emotion_model = None
-        self.emotion_le = None
-        self.reach_model = None
-        self.reach_ohe = None
-        self.reach_scaler = None
-        self.reach_threshold = 0.40
-        self.status_xgb = None
-        self.status_rf = None
-        self.status_lgb = None
-        self.status_threshold = 0.55
-        
-        # Feature metadata
-        self.reach_meta = {}
-        self.status_meta = {}
-        self.status_style_features = []
+        # joblib mmap_mode ("r" shares NumPy arrays across worker processes through
+        # the page cache; needs uncompressed dumps - see export_models.py --mmap).
+        # None = use config.MODEL_MMAP_MODE, False = never memory-map
+        if mmap_mode is None:
+            mmap_mode = config.MODEL_MMAP_MODE
+        self.mmap_mode = mmap_mode or None
         
-    def load_emotion_model(self):
-        """Load emotion detection pipeline (TF-IDF + LinearSVC)"""
-        try:
-            self.emotion_model = joblib.load(
-                os.path.join(self.models_dir, "emotion_svm_pipeline.joblib")
-            )
-            self.emotion_le = joblib.load(
-                os.path.join(self.models_dir, "emotion_label_encoder.joblib")
-            )
-            return True
-        except Exception as e:
-            print(f"Error loading emotion model: {e}")
-            return False
+        # Bundles hold joblib dumps as bytes, which cannot be memory-mapped
+        if use_bundles is None:
+            use_bundles = config.MODEL_BUNDLES
+        self.use_bundles = bool(use_bundles) and self.mmap_mode is None
+        self._bundles = {}  # group -> ModelBundle, BundleError or None (no bundle)
+        
+        self.backend = backend or config.MODEL_BACKEND
+        if self.backend not in ("sklearn", "onnx"):
+            raise ValueError(f"Unknown MODEL_BACKEND: {self.backend!r}")
+        
+        # tracemalloc while loading (None = config.TRACK_MODEL_MEMORY); diagnostics only
+        self.track_memory = config.TRACK_MODEL_MEMORY if track_memory is None else bool(track_memory)
+        
+        self._artifacts = {}
+        self._load_lock = threading.RLock()
+        self.load_stats = {}
+        self._reach_assembler = None  # (reach_meta it was built from, assembler)
     
-    def load_reach_model(self):
-        """Load reach prediction ensemble (VotingClassifier)"""
-        try:
-            self.reach_model = joblib.load(
-                os.path.join(self.models_dir, "reach_voting.joblib")
-            )
-            self.reach_ohe = joblib.load(
-                os.path.join(self.models_dir, "reach_ohe.joblib")
-            )
-            self.reach_scaler = joblib.load(
-                os.path.join(self.models_dir, "reach_scaler.joblib")
-            )
-            
-            # Load metadata
-            with open(os.path.join(self.models_dir, "reach_meta.json"), "r") as f:
-                self.reach_meta = json.load(f)
-            
-            # Load threshold
-            thresh_data = joblib.load(
-                os.path.join(self.models_dir, "reach_thresh.joblib")
-            )
-            self.reach_threshold = thresh_data.get("best_thresh", 0.40)
+    @classmethod
+    def artifact_names(cls, group=None):
+        """Names of all lazy artifacts, optionally restricted to one group"""
+        return [
+            name for name, attr in vars(cls).items()
+            if isinstance(attr, _Artifact) and (group is None or attr.group == group)
+        ]
+    
+    def is_loaded(self, name):
+        return name in self._artifacts
+    
+    def _bundle(self, group):
+        """The group's bundle, read and validated once (None if there is none)"""
+        if not self.use_bundles:
+            return None
+        if group not in self._bundles:
+            from utils.model_bundle import ModelBundle, BundleError, bundle_path
             
-            return True
-        except Exception as e:
-            print(f"Error loading reach model: {e}")
-            return False
+            path = bundle_path(self.models_dir, group)
+            bundle = None
+            if os.path.exists(path):
+                start = time.perf_counter()
+                try:
+                    bundle = ModelBundle.read(path, task=group)
+                    print(f"[OK] Read {os.path.basename(path)} v{bundle.version} "
+                          f"({os.path.getsize(path):,} bytes) in {(time.perf_counter() - start) * 1000:.1f} ms")
+                except (BundleError, OSError) as e:
+                    print(f"[ERROR] Rejected model bundle {path}: {e}")
+                    bundle = e if isinstance(e, BundleError) else BundleError(str(e))
+            self._bundles[group] = bundle
+        return self._bundles[group]
     
-    def load_status_model(self):
-        """Load status (fake/real) detection ensemble"""
-        try:
-            status_xgb_path = os.path.join(self.models_dir, "status_xgb.joblib")
-            status_rf_path = os.path.join(self.models_dir, "status_rf.joblib")
-            status_lgb_path = os.path.join(self.models_dir, "status_lgb.joblib")
-            status_meta_path = os.path.join(self.models_dir, "status_meta.json")
-            status_style_path = os.path.join(self.models_dir, "status_style_features.joblib")
+    def _release_bundle(self, group):
+        """Drop a bundle's raw bytes once every artifact of its group is loaded"""
+        bundle = self._bundles.get(group)
+        if bundle is not None and not isinstance(bundle, Exception):
+            if all(name in self._artifacts for name in self.artifact_names(group=group)):
+                bundle.release()
+    
+    def _source(self, artifact):
+        """(filename, kind) an artifact is read from under the configured backend"""
+        if self.backend == "onnx" and artifact.onnx:
+            from utils.onnx_backend import onnxruntime_available
             
-            print(f"[DEBUG] Loading status_xgb from: {status_xgb_path} (exists: {os.path.exists(status_xgb_path)})")
-            print(f"[DEBUG] Loading status_rf from: {status_rf_path} (exists: {os.path.exists(status_rf_path)})")
-            print(f"[DEBUG] Loading status_lgb from: {status_lgb_path} (exists: {os.path.exists(status_lgb_path)})")
+            bundle = self._bundle(artifact.group)
+            if bundle is not None and not isinstance(bundle, Exception):
+                exported = artifact.onnx in bundle
+            else:
+                exported = os.path.exists(os.path.join(self.models_dir, artifact.onnx))
+            if exported and onnxruntime_available():
+                return artifact.onnx, "onnx"
+            reason = "onnxruntime is not installed" if exported else f"no {artifact.onnx}"
+            print(f"[INFO] {artifact.name}: {reason} - using the sklearn model")
+        return artifact.filename, artifact.kind
+    
+    def _read(self, artifact, filename, kind):
+        bundle = self._bundle(artifact.group)
+        if isinstance(bundle, Exception):
+            raise bundle
+        if bundle is not None:
+            return bundle.load(filename)
+        
+        path = os.path.join(self.models_dir, filename)
+        if kind == "onnx":
+            from utils.onnx_backend import OnnxClassifier
+            return OnnxClassifier(path)
+        if kind == "json":
+            with open(path, "r") as f:
+                return json.load(f)
+        return joblib.load(path, mmap_mode=self.mmap_mode)
+    
+    def _load_artifact(self, artifact):
+        """Load one artifact (thread-safe), recording time and memory footprint"""
+        with self._load_lock:
+            if artifact.name in self._artifacts:
+                return
             
-            self.status_xgb = joblib.load(status_xgb_path)
-            self.status_rf = joblib.load(status_rf_path)
-            self.status_lgb = joblib.load(status_lgb_path)
+            filename, kind = self._source(artifact)
+            path = os.path.join(self.models_dir, filename)
+            stats = {
+                "file": filename,
+                "file_bytes": os.path.getsize(path) if os.path.exists(path) else None,
+                "mmap_mode": self.mmap_mode if kind == "joblib" else None,
+                "backend": "onnx" if kind == "onnx" else "sklearn",
+            }
+            bundle = self._bundle(artifact.group)
+            if bundle is not None and not isinstance(bundle, Exception) and filename in bundle:
+                stats.update({
+                    "file": f"{os.path.basename(bundle.path)}:{filename}",
+                    "file_bytes": bundle.member_bytes(filename),
+                    "bundle_version": bundle.version,
+                })
             
-            # Load metadata
-            with open(status_meta_path, "r") as f:
-                meta = json.load(f)
-                self.status_threshold = meta.get("best_threshold", 0.55)
+            track_memory = self.track_memory and not tracemalloc.is_tracing()
+            if track_memory:
+                tracemalloc.start()
+            rss_before = _current_rss_bytes()
+            start = time.perf_counter()
             
-            # Load style features
-            self.status_style_features = joblib.load(status_style_path)
+            try:
+                value = self._read(artifact, filename, kind)
+                if artifact.transform is not None:
+                    value = artifact.transform(value)
+                stats["error"] = None
+            except Exception as e:
+                print(f"[ERROR] Error loading {artifact.name} ({filename}): {e}")
+                value = artifact.default_value()
+                stats["error"] = str(e)
+            finally:
+                stats["seconds"] = time.perf_counter() - start
+                rss_after = _current_rss_bytes()
+                if rss_before is not None and rss_after is not None:
+                    stats["rss_delta_bytes"] = rss_after - rss_before
+                if track_memory:
+                    current, _ = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    stats["python_bytes"] = current
             
+            self._artifacts[artifact.name] = value
+            self.load_stats[artifact.name] = stats
+            self._release_bundle(artifact.group)
+            if stats["error"] is None:
+                print(f"[OK] Loaded {artifact.name} in {stats['seconds'] * 1000:.1f} ms")
+    
+    def preload(self, names=None):
+        """
+        Eagerly load artifacts by name or group ("emotion", "reach", "status")
+        
+        Returns:
+            dict of artifact name -> True if it loaded without error
+        """
+        if names is None:
+            names = self.artifact_names()
+        elif isinstance(names, str):
+            names = [names]
+        
+        expanded = []
+        for name in names:
+            group_members = self.artifact_names(group=name)
+            expanded.extend(group_members if group_members else [name])
+        
+        results = {}
+        for name in expanded:
+            artifact = vars(type(self)).get(name)
+            if not isinstance(artifact, _Artifact):
+                raise ValueError(f"Unknown model artifact: {name}")
+            getattr(self, name)
+            results[name] = self.load_stats.get(name, {}).get("error") is None
+        return results
+    
+    def load_emotion_model(self):
+        """Load emotion detection pipeline (TF-IDF + LinearSVC)"""
+        return all(self.preload("emotion").values())
+    
+    def load_reach_model(self):
+        """Load reach prediction ensemble (VotingClassifier)"""
+        return all(self.preload("reach").values())
+    
+    def load_status_model(self):
+        """Load status (fake/real) detection ensemble"""
+        ok = all(self.preload("status").values())
+        if ok:
             print(f"[OK] Status models loaded successfully!")
-            return True
-        except Exception as e:
-            print(f"[ERROR] Error loading status model: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+        return ok
+    
+    def memory_report(self):
+        """Per-artifact load time and footprint, largest first"""
+        return sorted(
+            ({"artifact": name, **stats} for name, stats in self.load_stats.items()),
+            key=lambda row: row.get("python_bytes") or row.get("rss_delta_bytes") or 0,
+            reverse=True,
+        )
+    
+    @property
+    def reach_assembler(self):
+        """ReachFeatureAssembler for the loaded reach_meta (rebuilt if reach_meta is replaced)"""
+        meta = self.reach_meta
+        with self._load_lock:
+            cached = self._reach_assembler
+            if cached is None or cached[0] is not meta:
+                from utils.feature_assembler import ReachFeatureAssembler
+                
+                num_cols = meta.get("num_cols", config.REACH_NUMERIC_FEATURES)
+                cached = (meta, ReachFeatureAssembler(num_cols, embedding_dim=config.EMBEDDING_DIM))
+                self._reach_assembler = cached
+            return cached[1]
+    
+    @property
+    def emotion_engine(self):
+        """Process-wide emotion transformer shared by every registry"""
+        return get_emotion_engine()
     
     def load_all(self):
         """Load all models"""
@@ -129,8 +344,186 @@ class ModelRegistry:
         return results
 
 
-def get_model_registry(models_dir="models"):
-    """Factory function to get loaded model registry"""
-    registry = ModelRegistry(models_dir)
-    registry.load_all()
+class EmotionEngine:
+    """
+    Long-lived HuggingFace emotion classifier
+    
+    The transformers pipeline is built once on first use (or on warmup) and
+    reused for every prediction. Calls are serialized because HF pipelines
+    and fast tokenizers are not safe to share across threads.
+    """
+    
+    def __init__(self, model_name=None, device=-1, max_chars=None):
+        self.model_name = model_name or config.EMOTION_MODEL
+        self.device = device  # -1 = CPU (use 0 for GPU if available)
+        self.max_chars = max_chars or config.EMOTION_MAX_CHARS
+        self._pipe = None
+        self._load_lock = threading.Lock()
+        self._call_lock = threading.Lock()
+        
+        # Latency counters
+        self.load_seconds = None
+        self.first_call_seconds = None
+        self.last_call_seconds = None
+        self.total_call_seconds = 0.0
+        self.calls = 0
+    
+    @property
+    def is_loaded(self):
+        return self._pipe is not None
+    
+    def load(self):
+        """Build the pipeline once; later calls return the cached instance"""
+        if self._pipe is not None:
+            return self._pipe
+        
+        with self._load_lock:
+            if self._pipe is None:
+                from transformers import pipeline as hf_pipeline
+                
+                start = time.perf_counter()
+                # top_k=None to get all 6 emotion probabilities
+                self._pipe = hf_pipeline(
+                    "text-classification",
+                    model=self.model_name,
+                    top_k=None,
+                    device=self.device
+                )
+                self.load_seconds = time.perf_counter() - start
+                print(f"[OK] Emotion engine loaded in {self.load_seconds:.2f}s")
+        return self._pipe
+    
+    def warmup(self):
+        """Load weights and run one dummy inference so the first user call is warm"""
+        self.classify("warmup")
+        return self.stats()
+    
+    def classify(self, text):
+        """Return the raw list of {label, score} dicts for one text"""
+        pipe = self.load()
+        
+        with self._call_lock:
+            start = time.perf_counter()
+            results = pipe(str(text)[:self.max_chars])[0]
+            elapsed = time.perf_counter() - start
+            
+            if self.first_call_seconds is None:
+                self.first_call_seconds = elapsed
+            self.last_call_seconds = elapsed
+            self.total_call_seconds += elapsed
+            self.calls += 1
+        
+        return results
+    
+    def classify_batch(self, texts, batch_size=None):
+        """Return one list of {label, score} dicts per text, in a single pipeline call"""
+        pipe = self.load()
+        texts = [str(t)[:self.max_chars] for t in texts]
+        if not texts:
+            return []
+        
+        with self._call_lock:
+            start = time.perf_counter()
+            results = pipe(texts, batch_size=batch_size or config.EMBEDDER_BATCH_SIZE)
+            elapsed = time.perf_counter() - start
+            
+            if self.first_call_seconds is None:
+                self.first_call_seconds = elapsed
+            self.last_call_seconds = elapsed
+            self.total_call_seconds += elapsed
+            self.calls += 1
+        
+        return results
+    
+    def stats(self):
+        """Cold-start vs. warm latency counters"""
+        warm_calls = self.calls - 1
+        warm_avg = None
+        if warm_calls > 0:
+            warm_avg = (self.total_call_seconds - self.first_call_seconds) / warm_calls
+        
+        return {
+            "model": self.model_name,
+            "loaded": self.is_loaded,
+            "load_seconds": self.load_seconds,
+            "first_call_seconds": self.first_call_seconds,
+            "last_call_seconds": self.last_call_seconds,
+            "avg_warm_call_seconds": warm_avg,
+            "calls": self.calls,
+        }
+
+
+_emotion_engine = None
+_emotion_engine_lock = threading.Lock()
+
+
+def get_emotion_engine():
+    """Return the process-wide EmotionEngine (created lazily, never reloaded)"""
+    global _emotion_engine
+    if _emotion_engine is None:
+        with _emotion_engine_lock:
+            if _emotion_engine is None:
+                _emotion_engine = EmotionEngine()
+    return _emotion_engine
+
+
+def get_model_registry(models_dir="models", preload=None, mmap_mode=None, use_bundles=None, backend=None):
+    """
+    Factory function to get a model registry
+    Artifacts load lazily; pass `preload` (names or groups, or "all") to warm them now
+    """
+    registry = ModelRegistry(models_dir, mmap_mode=mmap_mode, use_bundles=use_bundles, backend=backend)
+    if preload == "all":
+        registry.load_all()
+    elif preload:
+        registry.preload(preload)
     return registry
+
+
+def _load_onnx_embedder():
+    """OnnxSentenceEmbedder for config.EMBEDDER_MODEL, or None (with the reason printed)"""
+    from utils.onnx_embedder import EMBEDDER_META, OnnxSentenceEmbedder, embedder_dir
+    
+    model_dir = embedder_dir()
+    if not os.path.exists(os.path.join(model_dir, EMBEDDER_META)):
+        print(f"[INFO] No ONNX embedder in {model_dir} (export_models.py --onnx-embedder) - using torch")
+        return None
+    try:
+        embedder = OnnxSentenceEmbedder(model_dir, quantized=config.EMBEDDER_ONNX_QUANTIZED)
+    except ImportError as e:
+        print(f"[INFO] ONNX embedder unavailable ({e}) - using torch")
+        return None
+    if embedder.model_name != config.EMBEDDER_MODEL:
+        # Embeddings from another model would silently shift every prediction
+        print(f"[ERROR] ONNX embedder was exported from {embedder.model_name!r}, "
+              f"config uses {config.EMBEDDER_MODEL!r} - using torch")
+        return None
+    print(f"[OK] ONNX embedder loaded ({embedder.variant})")
+    return embedder
+
+
+def load_embedder(micro_batching=None, backend=None):
+    """
+    Build the caption embedder used by the status and reach models
+    backend: "torch" (SentenceTransformer) or "onnx" (default config.EMBEDDER_BACKEND)
+    Wrapped in the LRU embedding cache when config.CACHE_EMBEDDINGS is on;
+    cache misses go through the dynamic batcher when micro-batching is on
+    """
+    if micro_batching is None:
+        micro_batching = config.EMBEDDER_MICRO_BATCHING
+    backend = backend or config.EMBEDDER_BACKEND
+    if backend not in ("torch", "onnx"):
+        raise ValueError(f"Unknown EMBEDDER_BACKEND: {backend!r}")
+    
+    embedder = _load_onnx_embedder() if backend == "onnx" else None
+    if embedder is None:
+        from sentence_transformers import SentenceTransformer
+        embedder = SentenceTransformer(config.EMBEDDER_MODEL, device=config.EMBEDDER_DEVICE)
+    if micro_batching:
+        from utils.embedding_batcher import EmbeddingBatcher
+        embedder = EmbeddingBatcher(embedder)
+    if config.CACHE_EMBEDDINGS:
+        # Status, reach and best-time all encode the same caption - share one encode
+        from utils.embedding_cache import CachedEmbedder
+        embedder = CachedEmbedder(embedder, max_mb=config.EMBEDDING_CACHE_MB)
+    return embedder
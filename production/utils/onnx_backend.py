@@ -0,0 +1,235 @@
+"""
+ONNX export and onnxruntime CPU backend for the tree-ensemble models
+export_models.py --onnx converts status_rf (RandomForest) and the reach
+VotingClassifier (XGBoost + CatBoost + LogReg, soft voting) to ONNX graphs.
+The voting members are merged into one graph that averages their
+probabilities, so a prediction is a single session run instead of
+per-estimator Python dispatch in sklearn.
+
+Exports are checked against the original model's predict_proba and refused
+when any probability differs by more than config.ONNX_PROBA_TOLERANCE.
+ModelRegistry serves them through OnnxClassifier when
+config.MODEL_BACKEND = "onnx" (needs onnxruntime; skl2onnx / onnxmltools
+are only needed to export).
+"""
+import importlib.util
+import json
+import os
+
+import numpy as np
+
+import config
+
+
+# Same opsets for every member so their graphs can be merged
+ONNX_TARGET_OPSET = 15
+ONNX_ML_OPSET = 2
+INPUT_NAME = "input"
+OUTPUT_NAME = "probabilities"
+
+
+def onnxruntime_available():
+    return importlib.util.find_spec("onnxruntime") is not None
+
+
+class OnnxClassifier:
+    """
+    predict_proba / predict on an onnxruntime CPU session
+
+    Drop-in for the sklearn classifiers the inference code calls: accepts
+    dense or scipy.sparse float input and returns float64 probabilities.
+
+    Usage:
+    ------
+    clf = OnnxClassifier("models/status_rf.onnx")   # path or serialized bytes
+    clf.predict_proba(X)[:, 1]
+    """
+
+    def __init__(self, model, intra_op_threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = config.ONNX_INTRA_OP_THREADS if intra_op_threads is None else intra_op_threads
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model, options, providers=["CPUExecutionProvider"])
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.classes_ = np.array(json.loads(metadata.get("classes", "[0, 1]")))
+        self.source = metadata.get("source")
+        self.n_features_in_ = self.session.get_inputs()[0].shape[1]
+
+    def predict_proba(self, X):
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        probs = self.session.run([OUTPUT_NAME], {INPUT_NAME: X})[0]
+        return probs.astype(np.float64)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+# ============================================
+# EXPORT
+# ============================================
+def _strip_zipmap(model):
+    """Return the probability tensor a ZipMap node would turn into a list of dicts"""
+    import onnx
+
+    graph = model.graph
+    for node in [n for n in graph.node if n.op_type == "ZipMap"]:
+        tensor, mapped = node.input[0], node.output[0]
+        graph.node.remove(node)
+        for output in [o for o in graph.output if o.name == mapped]:
+            graph.output.remove(output)
+        for other in graph.node:
+            other.output[:] = [mapped if o == tensor else o for o in other.output]
+        graph.output.append(onnx.helper.make_tensor_value_info(mapped, onnx.TensorProto.FLOAT, None))
+    return model
+
+
+def _rename_input(model, name):
+    old = model.graph.input[0].name
+    if old != name:
+        model.graph.input[0].name = name
+        for node in model.graph.node:
+            node.input[:] = [name if i == old else i for i in node.input]
+    return model
+
+
+def _convert_estimator(estimator, n_features):
+    """
+    One fitted classifier as an ONNX model with float input `input` and a
+    [N, n_classes] float output `probabilities`
+    """
+    module = type(estimator).__module__
+    if module.startswith("catboost"):
+        from catboost.utils import convert_to_onnx_object
+        model = _strip_zipmap(convert_to_onnx_object(estimator))
+    elif module.startswith("xgboost"):
+        from onnxmltools.convert import convert_xgboost
+        from onnxmltools.convert.common.data_types import FloatTensorType
+        model = convert_xgboost(
+            estimator, initial_types=[(INPUT_NAME, FloatTensorType([None, n_features]))],
+            target_opset=ONNX_TARGET_OPSET,
+        )
+    elif module.startswith("lightgbm"):
+        from onnxmltools.convert import convert_lightgbm
+        from onnxmltools.convert.common.data_types import FloatTensorType
+        model = convert_lightgbm(
+            estimator, initial_types=[(INPUT_NAME, FloatTensorType([None, n_features]))],
+            target_opset=ONNX_TARGET_OPSET, zipmap=False,
+        )
+    else:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+        model = convert_sklearn(
+            estimator, initial_types=[(INPUT_NAME, FloatTensorType([None, n_features]))],
+            target_opset={"": ONNX_TARGET_OPSET, "ai.onnx.ml": ONNX_ML_OPSET},
+            options={id(estimator): {"zipmap": False}},
+        )
+    return _rename_input(model, INPUT_NAME)
+
+
+def _merge_soft_voting(members, weights, n_features):
+    """One graph running every member on the same input and averaging their probabilities"""
+    import onnx
+    from onnx import compose, helper, TensorProto
+
+    nodes, initializers, outputs, opsets = [], [], [], {}
+    for i, member in enumerate(members):
+        prefixed = compose.add_prefix(member, f"m{i}_", rename_inputs=False)
+        nodes.extend(prefixed.graph.node)
+        initializers.extend(prefixed.graph.initializer)
+        outputs.append(f"m{i}_{OUTPUT_NAME}")
+        for opset in member.opset_import:
+            opsets[opset.domain] = max(opsets.get(opset.domain, 0), opset.version)
+
+    if weights is None:
+        nodes.append(helper.make_node("Mean", outputs, [OUTPUT_NAME]))
+    else:
+        # np.average(probas, weights=weights) as in VotingClassifier
+        total = float(np.sum(weights))
+        scaled = []
+        for i, (name, weight) in enumerate(zip(outputs, weights)):
+            initializers.append(helper.make_tensor(f"w{i}", TensorProto.FLOAT, [], [weight / total]))
+            nodes.append(helper.make_node("Mul", [name, f"w{i}"], [f"{name}_w"]))
+            scaled.append(f"{name}_w")
+        nodes.append(helper.make_node("Sum", scaled, [OUTPUT_NAME]))
+
+    graph = helper.make_graph(
+        nodes, "soft_voting",
+        [helper.make_tensor_value_info(INPUT_NAME, TensorProto.FLOAT, [None, n_features])],
+        [helper.make_tensor_value_info(OUTPUT_NAME, TensorProto.FLOAT, [None, None])],
+        initializer=initializers,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid(d, v) for d, v in opsets.items()])
+    model.ir_version = max(member.ir_version for member in members)
+    onnx.checker.check_model(model)
+    return model
+
+
+def to_onnx(model, n_features=None):
+    """
+    Convert a fitted classifier (soft VotingClassifier members merged) to ONNX
+
+    Returns:
+        onnx.ModelProto with input `input` and output `probabilities`
+    """
+    n_features = int(n_features or model.n_features_in_)
+    if type(model).__name__ == "VotingClassifier":
+        if model.voting != "soft":
+            raise ValueError("Only soft-voting VotingClassifiers can be exported to ONNX")
+        members = [_convert_estimator(est, n_features) for est in model.estimators_]
+        onnx_model = _merge_soft_voting(members, model.weights, n_features)
+    else:
+        onnx_model = _convert_estimator(model, n_features)
+
+    del onnx_model.metadata_props[:]
+    for key, value in (("classes", json.dumps(np.asarray(model.classes_).tolist())),
+                       ("source", type(model).__name__)):
+        onnx_model.metadata_props.add(key=key, value=value)
+    return onnx_model
+
+
+def max_proba_difference(model, onnx_clf, X):
+    """Largest absolute probability difference between a model and its ONNX export"""
+    return float(np.max(np.abs(model.predict_proba(X) - onnx_clf.predict_proba(X))))
+
+
+def export_onnx(model, path, n_features=None, X_check=None, tolerance=None, check_rows=512):
+    """
+    Export a model to ONNX and verify its probabilities
+
+    Args:
+        model: fitted classifier
+        path: destination .onnx file
+        X_check: real validation rows to compare on (export_onnx_models --onnx-check);
+            without them only uniform random rows of the input width are used
+        tolerance: max absolute probability difference (default config.ONNX_PROBA_TOLERANCE)
+
+    Returns:
+        max absolute difference observed
+
+    Raises:
+        ValueError if the export disagrees with the model (nothing is written)
+    """
+    tolerance = config.ONNX_PROBA_TOLERANCE if tolerance is None else tolerance
+    n_features = int(n_features or model.n_features_in_)
+    data = to_onnx(model, n_features).SerializeToString()
+
+    if X_check is None:
+        X_check = np.random.RandomState(42).rand(check_rows, n_features)
+    diff = max_proba_difference(model, OnnxClassifier(data), X_check)
+    if diff > tolerance:
+        raise ValueError(f"ONNX probabilities differ by {diff:.2e} (tolerance {tolerance:.0e})")
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return diff
@@ -0,0 +1,222 @@
+"""
+ONNX / int8 sentence embedder backend
+export_models.py --onnx-embedder exports the SentenceTransformer in
+config.EMBEDDER_MODEL (transformer + mean pooling + L2 normalize) to a single
+ONNX graph, then writes a dynamically int8-quantized copy with onnxruntime.
+OnnxSentenceEmbedder runs it with onnxruntime and the model's fast tokenizer
+(tokenizers, no torch / transformers import), behind the same encode() call
+the predictors, CachedEmbedder and EmbeddingBatcher already use.
+
+Select it with config.EMBEDDER_BACKEND = "onnx"; check it against the torch
+model with `python benchmark.py embedder-onnx` before switching.
+"""
+import inspect
+import json
+import os
+
+import numpy as np
+
+import config
+
+
+EMBEDDER_META = "embedder_meta.json"
+FP32_MODEL = "model.onnx"
+INT8_MODEL = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+OUTPUT_NAME = "sentence_embedding"
+
+
+def embedder_dir(models_dir=None):
+    """Export folder (default: production/models/<EMBEDDER_ONNX_DIR>)"""
+    if models_dir is None:
+        models_dir = os.path.join(os.path.dirname(__file__), "..", config.MODELS_DIR)
+    return os.path.join(models_dir, config.EMBEDDER_ONNX_DIR)
+
+
+# ============================================
+# EXPORT
+# ============================================
+def _pooling_mode(pooling):
+    mode = getattr(pooling, "pooling_mode", None)
+    if isinstance(mode, str):
+        return mode
+    return pooling.get_pooling_mode_str()
+
+
+def export_embedder(out_dir, model_name=None, quantize=True, opset=17, per_channel=True, reduce_range=False):
+    """
+    Export a SentenceTransformer to ONNX (and a dynamic int8 copy)
+
+    Args:
+        out_dir: destination folder (model.onnx, model_int8.onnx, tokenizer.json, embedder_meta.json)
+        model_name: SentenceTransformer ID or path (default config.EMBEDDER_MODEL)
+        quantize: also write the int8 model
+        per_channel / reduce_range: onnxruntime quantize_dynamic options
+            (reduce_range=True avoids int8 saturation on older AVX2 CPUs without VNNI)
+
+    Returns:
+        dict written to embedder_meta.json
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model_name = model_name or config.EMBEDDER_MODEL
+    st = SentenceTransformer(model_name, device="cpu")
+    modules = list(st)
+    if len(modules) < 2 or _pooling_mode(modules[1]) != "mean":
+        raise ValueError(f"{model_name}: only transformer + mean pooling models can be exported")
+    normalize = any(type(module).__name__ == "Normalize" for module in modules[2:])
+
+    class PooledEncoder(torch.nn.Module):
+        """Transformer + masked mean pooling (+ L2 normalize) as one graph"""
+
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            hidden = self.transformer(
+                input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+            )[0]
+            mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            if normalize:
+                pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+            return pooled
+
+    os.makedirs(out_dir, exist_ok=True)
+    encoder = PooledEncoder(modules[0].auto_model).eval()
+    # TorchScript exporter; `dynamo` only exists (and defaults to True) on newer torch
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    sample = st.tokenizer(["export sample"], return_tensors="pt")
+    if "token_type_ids" not in sample:
+        sample["token_type_ids"] = torch.zeros_like(sample["input_ids"])
+    with torch.no_grad():
+        torch.onnx.export(
+            encoder,
+            tuple(sample[name] for name in INPUT_NAMES),
+            os.path.join(out_dir, FP32_MODEL),
+            input_names=INPUT_NAMES,
+            output_names=[OUTPUT_NAME],
+            dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in INPUT_NAMES},
+                          OUTPUT_NAME: {0: "batch"}},
+            opset_version=opset,
+            **legacy,
+        )
+
+    st.tokenizer.save_pretrained(out_dir)
+    if not os.path.exists(os.path.join(out_dir, TOKENIZER_FILE)):
+        raise ValueError(f"{model_name} has no fast tokenizer (tokenizer.json) to export")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+
+        # Shape inference + graph cleanup first, as onnxruntime recommends before quantizing
+        prepared = os.path.join(out_dir, "model_prepared.onnx")
+        quant_pre_process(os.path.join(out_dir, FP32_MODEL), prepared, skip_symbolic_shape=True)
+        try:
+            quantize_dynamic(
+                prepared, os.path.join(out_dir, INT8_MODEL),
+                weight_type=QuantType.QInt8, per_channel=per_channel, reduce_range=reduce_range,
+            )
+        finally:
+            os.remove(prepared)
+
+    meta = {
+        "model": model_name,
+        "embedding_dim": int(st.get_sentence_embedding_dimension()),
+        "max_seq_length": int(st.max_seq_length),
+        "normalize": normalize,
+        "pad_token": st.tokenizer.pad_token,
+        "pad_token_id": int(st.tokenizer.pad_token_id),
+        "models": {"fp32": FP32_MODEL, **({"int8": INT8_MODEL} if quantize else {})},
+        "quantization": {"per_channel": per_channel, "reduce_range": reduce_range} if quantize else None,
+    }
+    with open(os.path.join(out_dir, EMBEDDER_META), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+# ============================================
+# RUNTIME
+# ============================================
+class OnnxSentenceEmbedder:
+    """
+    SentenceTransformer.encode() on onnxruntime
+
+    Usage:
+    ------
+    embedder = OnnxSentenceEmbedder("models/embedder_onnx")              # int8
+    embedder = OnnxSentenceEmbedder("models/embedder_onnx", quantized=False)
+    embedder.encode(["caption one", "caption two"])                      # (2, 384) float32
+    """
+
+    def __init__(self, model_dir, quantized=True, intra_op_threads=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, EMBEDDER_META), "r") as f:
+            self.meta = json.load(f)
+        variant = "int8" if quantized else "fp32"
+        if variant not in self.meta["models"]:
+            raise ValueError(f"{model_dir} has no {variant} export")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = config.EMBEDDER_ONNX_THREADS if intra_op_threads is None else intra_op_threads
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, self.meta["models"][variant]), options, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.meta["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.meta["pad_token_id"], pad_token=self.meta["pad_token"])
+
+        self.model_name = self.meta["model"]
+        self.variant = variant
+        self.device = "cpu"
+        self.max_seq_length = self.meta["max_seq_length"]
+
+    def get_sentence_embedding_dimension(self):
+        return self.meta["embedding_dim"]
+
+    def _encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        return self.session.run([OUTPUT_NAME], {k: v for k, v in feeds.items() if k in self._inputs})[0]
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        """
+        Same call and output as SentenceTransformer.encode (numpy output only)
+
+        Captions are sorted by length before batching, as SentenceTransformer
+        does, so each batch pads to similar lengths.
+        """
+        if kwargs.get("convert_to_tensor") or kwargs.get("output_value", "sentence_embedding") != "sentence_embedding":
+            raise ValueError("OnnxSentenceEmbedder only returns numpy sentence embeddings")
+
+        single = isinstance(sentences, str)
+        texts = [str(s).strip() for s in ([sentences] if single else sentences)]
+        if not texts:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        out = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            out[idx] = self._encode_batch([texts[i] for i in idx])
+
+        if normalize_embeddings and not self.meta["normalize"]:
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        if not convert_to_numpy:
+            out = list(out)
+        return out[0] if single else out
@@ -1,117 +1,249 @@
 """
 Persistent storage for scheduled posts
-Saves to JSON file so posts persist across app restarts
+Saves posts so they persist across app restarts. The backend is selected by
+config.POST_STORAGE_BACKEND:
+    "json"    - one scheduled_posts.json file, rewritten on every change
+    "sqlite"  - scheduled_posts.db (WAL mode, single-row updates)
+    "journal" - scheduled_posts.json snapshot + append-only change journal
 """
 import json
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
 
+import config
 
-class PostStorage:
-    """Handle persistent storage of scheduled posts"""
-    
-    STORAGE_FILE = "scheduled_posts.json"
-    
-    @staticmethod
-    def get_storage_path():
-        """Get the path to the storage file"""
-        return os.path.join(os.path.dirname(__file__), "..", "scheduled_posts.json")
-    
-    @staticmethod
-    def load_posts():
+
+DATETIME_FIELDS = ('scheduled_dt', 'created_at', 'posted_at')
+
+
+def serialize_post(post):
+    """Copy of a post with datetime fields as ISO strings (JSON-safe)"""
+    post_copy = post.copy()
+    for field in DATETIME_FIELDS:
+        if isinstance(post_copy.get(field), datetime):
+            post_copy[field] = post_copy[field].isoformat()
+    return post_copy
+
+
+def write_json_atomic(path, data, indent=2):
+    """Write JSON to a temp file, fsync it, then rename over `path` (never leaves a truncated file)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def deserialize_post(post):
+    """Convert ISO datetime strings back to datetime objects (in place)"""
+    for field in DATETIME_FIELDS:
+        if isinstance(post.get(field), str):
+            post[field] = datetime.fromisoformat(post[field])
+    return post
+
+
+class JsonPostStore:
+    """Whole-file JSON backend (every change rewrites the file)"""
+
+    def __init__(self, storage_path):
+        self.storage_path = storage_path
+
+    def load_posts(self):
         """Load scheduled posts from file"""
         try:
-            storage_path = PostStorage.get_storage_path()
-            
-            if not os.path.exists(storage_path):
+            if not os.path.exists(self.storage_path):
                 return []
-            
-            with open(storage_path, 'r') as f:
+
+            with open(self.storage_path, 'r') as f:
                 data = json.load(f)
-            
-            # Convert datetime strings back to datetime objects
-            for post in data:
-                if 'scheduled_dt' in post and isinstance(post['scheduled_dt'], str):
-                    post['scheduled_dt'] = datetime.fromisoformat(post['scheduled_dt'])
-                if 'created_at' in post and isinstance(post['created_at'], str):
-                    post['created_at'] = datetime.fromisoformat(post['created_at'])
-                if 'posted_at' in post and isinstance(post['posted_at'], str):
-                    post['posted_at'] = datetime.fromisoformat(post['posted_at'])
-            
-            return data
+
+            return [deserialize_post(post) for post in data]
         except Exception as e:
             print(f"Error loading posts: {e}")
             return []
-    
-    @staticmethod
-    def save_posts(posts):
+
+    def save_posts(self, posts):
         """Save scheduled posts to file"""
         try:
-            storage_path = PostStorage.get_storage_path()
-            
-            # Convert datetime objects to ISO format strings for JSON serialization
-            serialized_posts = []
-            for post in posts:
-                post_copy = post.copy()
-                if 'scheduled_dt' in post_copy and isinstance(post_copy['scheduled_dt'], datetime):
-                    post_copy['scheduled_dt'] = post_copy['scheduled_dt'].isoformat()
-                if 'created_at' in post_copy and isinstance(post_copy['created_at'], datetime):
-                    post_copy['created_at'] = post_copy['created_at'].isoformat()
-                if 'posted_at' in post_copy and isinstance(post_copy['posted_at'], datetime):
-                    post_copy['posted_at'] = post_copy['posted_at'].isoformat()
-                serialized_posts.append(post_copy)
-            
-            with open(storage_path, 'w') as f:
-                json.dump(serialized_posts, f, indent=2)
-            
+            serialized_posts = [serialize_post(post) for post in posts]
+            write_json_atomic(self.storage_path, serialized_posts)
+
             return True
         except Exception as e:
             print(f"Error saving posts: {e}")
             return False
-    
-    @staticmethod
-    def add_post(post):
-        """Add a new post and save"""
-        posts = PostStorage.load_posts()
+
+    def add_post(self, post):
+        posts = self.load_posts()
+        if post.get('id') is None:
+            post['id'] = max((p['id'] for p in posts), default=0) + 1
         posts.append(post)
-        PostStorage.save_posts(posts)
-        return posts
-    
-    @staticmethod
-    def update_post(post_id, updated_post):
-        """Update an existing post and save"""
-        posts = PostStorage.load_posts()
+        return self.save_posts(posts)
+
+    def update_post(self, post_id, updated_post):
+        posts = self.load_posts()
         for i, post in enumerate(posts):
             if post['id'] == post_id:
                 posts[i] = updated_post
-                PostStorage.save_posts(posts)
-                return posts
-        return posts
-    
+                return self.save_posts(posts)
+        return False
+
+    def delete_post(self, post_id):
+        posts = self.load_posts()
+        remaining = [p for p in posts if p['id'] != post_id]
+        if len(remaining) == len(posts):
+            return False
+        return self.save_posts(remaining)
+
+    def get_post(self, post_id):
+        return next((p for p in self.load_posts() if p['id'] == post_id), None)
+
+    def load_pending(self, due_before=None):
+        pending = [
+            p for p in self.load_posts()
+            if p.get('status') == 'Pending' and isinstance(p.get('scheduled_dt'), datetime)
+            and (due_before is None or p['scheduled_dt'] <= due_before)
+        ]
+        return sorted(pending, key=lambda p: p['scheduled_dt'])
+
+    def next_post_id(self):
+        return max((p['id'] for p in self.load_posts()), default=0) + 1
+
+    def change_token(self):
+        try:
+            return os.stat(self.storage_path).st_mtime_ns
+        except OSError:
+            return None
+
+
+class PostStorage:
+    """Handle persistent storage of scheduled posts"""
+
+    STORAGE_FILE = "scheduled_posts.json"
+
+    _backend = None
+    _backend_lock = threading.Lock()
+
+    @staticmethod
+    def get_storage_path():
+        """Get the path to the JSON storage file"""
+        return os.path.join(os.path.dirname(__file__), "..", "scheduled_posts.json")
+
+    @staticmethod
+    def get_db_path():
+        """Get the path to the SQLite database"""
+        return os.path.join(os.path.dirname(__file__), "..", config.POST_STORAGE_DB)
+
+    @staticmethod
+    def get_journal_path():
+        """Get the path to the append-only change journal"""
+        return os.path.join(os.path.dirname(__file__), "..", config.POST_STORAGE_JOURNAL)
+
+    @staticmethod
+    def backend():
+        """Storage backend for config.POST_STORAGE_BACKEND (created once per process)"""
+        if PostStorage._backend is None:
+            with PostStorage._backend_lock:
+                if PostStorage._backend is None:
+                    kind = config.POST_STORAGE_BACKEND
+                    if kind == "sqlite":
+                        from utils.sqlite_post_store import SqlitePostStore
+                        # Existing JSON posts are imported on first use
+                        backend = SqlitePostStore(PostStorage.get_db_path(), migrate_from=PostStorage.get_storage_path())
+                    elif kind == "journal":
+                        from utils.journal_post_store import JournalPostStore
+                        # The JSON file doubles as the compaction snapshot
+                        backend = JournalPostStore(PostStorage.get_storage_path(), PostStorage.get_journal_path())
+                    elif kind == "json":
+                        backend = JsonPostStore(PostStorage.get_storage_path())
+                    else:
+                        raise ValueError(f"Unknown POST_STORAGE_BACKEND: {kind!r}")
+                    PostStorage._backend = backend
+        return PostStorage._backend
+
+    @staticmethod
+    def location():
+        """Human-readable path of the active store"""
+        backend = PostStorage.backend()
+        path = getattr(backend, 'db_path', None) or getattr(backend, 'journal_path', None) or backend.storage_path
+        return os.path.abspath(path)
+
+    @staticmethod
+    def load_posts():
+        """Load all scheduled posts"""
+        return PostStorage.backend().load_posts()
+
+    @staticmethod
+    def save_posts(posts):
+        """Replace all stored posts"""
+        return PostStorage.backend().save_posts(posts)
+
+    @staticmethod
+    def add_post(post, return_posts=True):
+        """
+        Add a new post and save
+        A post with 'id' None gets its id from the backend (written to the dict)
+        Returns all posts, or just the success flag with return_posts=False
+        """
+        ok = PostStorage.backend().add_post(post)
+        return PostStorage.load_posts() if return_posts else ok
+
     @staticmethod
-    def delete_post(post_id):
-        """Delete a post and save"""
-        posts = PostStorage.load_posts()
-        posts = [p for p in posts if p['id'] != post_id]
-        PostStorage.save_posts(posts)
-        return posts
-    
+    def update_post(post_id, updated_post, return_posts=True):
+        """
+        Update an existing post and save
+        Returns all posts, or just the success flag with return_posts=False
+        """
+        ok = PostStorage.backend().update_post(post_id, updated_post)
+        return PostStorage.load_posts() if return_posts else ok
+
+    @staticmethod
+    def delete_post(post_id, return_posts=True):
+        """
+        Delete a post and save
+        Returns all posts, or just the success flag with return_posts=False
+        """
+        ok = PostStorage.backend().delete_post(post_id)
+        return PostStorage.load_posts() if return_posts else ok
+
+    @staticmethod
+    def get_post(post_id):
+        """Single post by id (None if missing)"""
+        return PostStorage.backend().get_post(post_id)
+
+    @staticmethod
+    def load_pending(due_before=None):
+        """Pending posts ordered by scheduled_dt (optionally only those due by `due_before`)"""
+        return PostStorage.backend().load_pending(due_before)
+
+    @staticmethod
+    def next_post_id():
+        """Next unused post id (racy across sessions - prefer add_post with 'id' None)"""
+        return PostStorage.backend().next_post_id()
+
+    @staticmethod
+    def change_token():
+        """Opaque value that changes when another writer modifies the store"""
+        return PostStorage.backend().change_token()
+
     @staticmethod
     def clear_old_posts(days=7):
         """Remove posts older than specified days"""
         try:
             posts = PostStorage.load_posts()
             now = datetime.now()
-            
+
             # Keep posts that are recent or have status 'Pending'
             filtered_posts = [
                 p for p in posts
-                if p.get('status') == 'Pending' or 
-                   (p.get('posted_at') and 
+                if p.get('status') == 'Pending' or
+                   (p.get('posted_at') and
                     (now - datetime.fromisoformat(p['posted_at'])).days < days)
             ]
-            
+
             PostStorage.save_posts(filtered_posts)
             return filtered_posts
         except Exception as e:
@@ -1,59 +1,33 @@
 """
 Preprocessing utilities - EXACT logic from notebooks
 """
-import re
 import numpy as np
 import pandas as pd
-from textblob import TextBlob
+from utils.caption_features import clean_text, count_astral
+from utils.sentiment import get_sentiment_scorer
 
 
 def clean_text_basic(text):
     """Basic text cleaning"""
-    t = re.sub(r'http\S+', '', str(text))
-    t = re.sub(r'@\w+', '', t)
-    t = re.sub(r'#\w+', '', t)
-    t = re.sub(r'[^a-zA-Z\s]', ' ', t)
-    return t.lower().strip()
+    return clean_text(text)
 
 
 def get_sentiment(text):
     """
-    Get sentiment score using TextBlob
+    Get sentiment score (TextBlob pattern polarity, see utils.sentiment)
     Maps to: negative=-1, neutral=0, positive=1
     """
-    try:
-        blob = TextBlob(str(text))
-        sentiment = blob.sentiment
-        # sentiment may be a namedtuple with .polarity or a tuple/list; handle both safely
-        polarity = None
-        try:
-            polarity = sentiment.polarity  # type: ignore[attr-defined]
-        except Exception:
-            # Try attribute access fallback
-            polarity = getattr(sentiment, "polarity", None)
-            if polarity is None:
-                # If sentiment is a sequence (tuple/list), grab first element
-                if isinstance(sentiment, (list, tuple)):
-                    polarity = sentiment[0]
-                else:
-                    # Avoid attempting to iterate unknown non-sequence objects (e.g., cached_property)
-                    # Default to neutral polarity when we cannot extract a numeric polarity
-                    polarity = 0.0
-        if polarity is None:
-            polarity = 0.0
-        if polarity > 0.1:
-            return 1  # positive
-        elif polarity < -0.1:
-            return -1  # negative
-        else:
-            return 0  # neutral
-    except:
-        return 0
+    return get_sentiment_scorer().label(text)
+
+
+def get_sentiment_batch(texts):
+    """get_sentiment for a Series / list of texts; returns an int64 array"""
+    return get_sentiment_scorer().label_batch(texts)
 
 
 def count_emojis(text):
     """Count emojis in text"""
-    return len(re.findall(r'[\U00010000-\U0010ffff]', str(text)))
+    return count_astral(str(text))
 
 
 def emotion_preprocessing(text):
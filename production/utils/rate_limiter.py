@@ -0,0 +1,251 @@
+"""
+Client-side rate limiting for Graph API calls
+Token buckets sized from config.RATE_LIMIT_REQUESTS per config.RATE_LIMIT_WINDOW.
+Publishing goes through KeyedRateLimiter: buckets keyed per page ID and per
+access token, optionally shared between processes through a SQLite file.
+TokenBucket is a single bucket that can be passed as an extra limit to
+ScheduledPostManager.publish_bulk(rate_limiter=...).
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import config
+
+
+def _refill(tokens, updated, now, rate, capacity):
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    `capacity` tokens refill continuously at `rate` tokens per second, so
+    bursts up to `capacity` are allowed and the long-run rate is `rate`.
+
+    Usage:
+    ------
+    bucket = TokenBucket.from_config()
+    bucket.acquire()            # blocks until a token is available
+    if bucket.try_acquire():    # non-blocking
+        ...
+    """
+
+    def __init__(self, rate, capacity):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, requests=None, window=None):
+        requests = requests or config.RATE_LIMIT_REQUESTS
+        window = window or config.RATE_LIMIT_WINDOW
+        return cls(rate=requests / window, capacity=requests)
+
+    def _refill(self, now):
+        self._tokens = _refill(self._tokens, self._updated, now, self.rate, self.capacity)
+        self._updated = now
+
+    def _take(self, tokens):
+        """Take tokens if available; otherwise return seconds until they will be"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def try_acquire(self, tokens=1):
+        """Non-blocking: True if the tokens were taken"""
+        return self._take(tokens) == 0.0
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Block until `tokens` are available
+        Returns False if that would take longer than `timeout` seconds
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {self.capacity:g}")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def available(self):
+        """Tokens currently in the bucket"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+# ============================================
+# KEYED BUCKETS (per page / per access token)
+# ============================================
+class MemoryBucketStore:
+    """Bucket state for one process"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, keys, tokens, rate, capacity):
+        """Take `tokens` from every key, or none; returns 0.0 or the seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            levels = {
+                key: _refill(*self._buckets.get(key, (capacity, now)), now, rate, capacity)
+                for key in keys
+            }
+            wait = max((tokens - level) / rate for level in levels.values())
+            if wait <= 0:
+                for key, level in levels.items():
+                    self._buckets[key] = (level - tokens, now)
+                return 0.0
+            for key, level in levels.items():
+                self._buckets[key] = (level, now)
+            return wait
+
+
+class SqliteBucketStore:
+    """
+    Bucket state in a SQLite file shared by every worker on the host
+
+    Each take() is one IMMEDIATE transaction, so concurrent processes never
+    spend the same tokens. Uses wall-clock time so buckets agree across processes.
+    """
+
+    SCHEMA = "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._conn().execute(self.SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, keys, tokens, rate, capacity):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            placeholders = ",".join("?" * len(keys))
+            rows = dict(
+                (key, (level, updated)) for key, level, updated in
+                conn.execute(f"SELECT key, tokens, updated FROM buckets WHERE key IN ({placeholders})", keys)
+            )
+            levels = {key: _refill(*rows.get(key, (capacity, now)), now, rate, capacity) for key in keys}
+            wait = max((tokens - level) / rate for level in levels.values())
+            spend = tokens if wait <= 0 else 0
+            conn.executemany(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                [(key, level - spend, now) for key, level in levels.items()],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return max(0.0, wait)
+
+
+class KeyedRateLimiter:
+    """
+    Token buckets keyed by page ID and access token
+
+    A request names every bucket it counts against (e.g. its page and its
+    token); tokens are taken from all of them or none.
+
+    Usage:
+    ------
+    limiter = get_keyed_limiter()
+    keys = KeyedRateLimiter.keys_for(page_id="123", access_token=token)
+    if limiter.acquire(keys, timeout=30):      # blocking
+        ...
+    if limiter.try_acquire(keys):              # non-blocking
+        ...
+    """
+
+    def __init__(self, rate, capacity, store=None):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.store = store or MemoryBucketStore()
+
+    @classmethod
+    def from_config(cls, backend=None):
+        backend = backend or config.RATE_LIMIT_BACKEND
+        if backend == "sqlite":
+            db_path = os.path.join(os.path.dirname(__file__), "..", config.RATE_LIMIT_DB)
+            store = SqliteBucketStore(db_path)
+        elif backend == "memory":
+            store = MemoryBucketStore()
+        else:
+            raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend!r}")
+        return cls(config.RATE_LIMIT_REQUESTS / config.RATE_LIMIT_WINDOW, config.RATE_LIMIT_REQUESTS, store)
+
+    @staticmethod
+    def keys_for(page_id=None, access_token=None):
+        """Bucket keys for a request (tokens are hashed - never stored in clear)"""
+        keys = []
+        if page_id:
+            keys.append(f"page:{page_id}")
+        if access_token:
+            keys.append("token:" + hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:16])
+        return keys
+
+    def _take(self, keys, tokens):
+        if not keys:
+            return 0.0
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {self.capacity:g}")
+        return self.store.take(list(keys), tokens, self.rate, self.capacity)
+
+    def try_acquire(self, keys, tokens=1):
+        """Non-blocking: True if the tokens were taken from every key"""
+        return self._take(keys, tokens) == 0.0
+
+    def acquire(self, keys, tokens=1, timeout=None):
+        """
+        Block until every key has `tokens` available
+        Returns False if that would take longer than `timeout` seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take(keys, tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+_keyed_limiter = None
+_keyed_lock = threading.Lock()
+
+
+def get_keyed_limiter():
+    """Process-wide KeyedRateLimiter (backend from config.RATE_LIMIT_BACKEND)"""
+    global _keyed_limiter
+    if _keyed_limiter is None:
+        with _keyed_lock:
+            if _keyed_limiter is None:
+                _keyed_limiter = KeyedRateLimiter.from_config()
+    return _keyed_limiter
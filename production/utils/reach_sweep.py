@@ -0,0 +1,144 @@
+"""
+Reach sweep engine - scores one caption across many posting slots at once
+Text features and the embedding are computed once; every (day, hour) slot
+becomes one row of a single matrix scored with one predict_proba call.
+"""
+import numpy as np
+from datetime import datetime
+
+import config
+from utils.feature_engineering import engineer_reach_features
+from utils.feature_assembler import to_model_input
+
+
+DAY_MAP = {
+    "Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3,
+    "Friday": 4, "Saturday": 5, "Sunday": 6
+}
+DAY_NAMES = list(DAY_MAP.keys())
+
+
+class ReachSweepError(RuntimeError):
+    """The reach model could not score the sweep's slots"""
+
+
+def format_hour(hour):
+    """Convert hour (0-23) to 12-hour format for display"""
+    if hour == 0:
+        return "12:00 AM"
+    elif hour < 12:
+        return f"{hour}:00 AM"
+    elif hour == 12:
+        return "12:00 PM"
+    else:
+        return f"{hour-12}:00 PM"
+
+
+def slot_time_features(dow, hour):
+    """Time features for one (day-of-week, hour) slot - same formulas as engineer_reach_features"""
+    return {
+        "hour": hour,
+        "dow": dow,
+        "is_weekend": 1 if dow in [5, 6] else 0,
+        "hour_sin": np.sin(2 * np.pi * hour / 24),
+        "hour_cos": np.cos(2 * np.pi * hour / 24),
+        "dow_sin": np.sin(2 * np.pi * dow / 7),
+        "dow_cos": np.cos(2 * np.pi * dow / 7),
+    }
+
+
+class ReachSweep:
+    """
+    Score a caption over a set of posting slots with one model call
+
+    Usage:
+    ------
+    sweep = ReachSweep(caption, embedder, model_registry)
+    probs = sweep.score([(2, h) for h in range(24)])
+    """
+
+    def __init__(self, caption, embedder, model_registry):
+        self.caption = caption
+        self.model_registry = model_registry
+        self.num_cols = list(model_registry.reach_meta.get("num_cols", config.REACH_NUMERIC_FEATURES))
+
+        # Caption-level work happens exactly once per sweep
+        self.text_features = engineer_reach_features(caption, timestamp=datetime.now(), category="", language="")
+        self.embedding = embedder.encode([caption], convert_to_numpy=True)
+
+    def build_numeric(self, slots):
+        """Unscaled (n_slots, n_num_cols) matrix: text features repeated, time columns per slot"""
+        rows = []
+        for dow, hour in slots:
+            features = dict(self.text_features)
+            features.update(slot_time_features(dow, hour))
+            rows.append([features.get(col, 0) for col in self.num_cols])
+        return np.array(rows, dtype=float).reshape(len(slots), len(self.num_cols))
+
+    def build_matrix(self, slots):
+        """Model input for all slots: embedding + empty categorical + scaled numeric"""
+        num_scaled = self.model_registry.reach_scaler.transform(self.build_numeric(slots))
+        X = self.model_registry.reach_assembler.assemble(self.embedding, num_scaled)
+        return to_model_input(X)
+
+    def score(self, slots):
+        """
+        Reach probability per slot
+
+        Raises:
+            ReachSweepError if the model call fails (no all-zero grid is
+            returned, it would look like a valid prediction)
+        """
+        slots = list(slots)
+        if not slots:
+            return np.zeros(0)
+
+        model = self.model_registry.reach_model
+        try:
+            X = self.build_matrix(slots)
+            if hasattr(model, "predict_proba"):
+                return model.predict_proba(X)[:, 1].astype(float)
+            return np.asarray(model.predict(X), dtype=float)
+        except Exception as e:
+            print(f"[ERROR] Reach sweep failed for {len(slots)} slots: {e}")
+            raise ReachSweepError(f"Reach prediction failed: {str(e)}") from e
+
+    def day(self, dow):
+        """List of (hour_str, reach_probability, hour_int) for each hour of one day"""
+        probs = self.score([(dow, hour) for hour in range(24)])
+        return [(format_hour(hour), float(probs[hour]), hour) for hour in range(24)]
+
+    def week(self):
+        """(7, 24) probability grid - rows Monday..Sunday, columns hours 0-23"""
+        slots = [(dow, hour) for dow in range(7) for hour in range(24)]
+        return self.score(slots).reshape(7, 24)
+
+
+def top_slots(grid, k=5, threshold=None):
+    """
+    Rank the best (day, hour) cells of a 7x24 grid
+
+    Returns:
+        List of dicts sorted by probability (highest first)
+    """
+    grid = np.asarray(grid)
+    flat = grid.ravel()
+    k = min(k, flat.size)
+    # Stable sort keeps earlier days/hours first on ties
+    order = np.argsort(-flat, kind="stable")[:k]
+
+    ranked = []
+    for idx in order:
+        dow, hour = divmod(int(idx), grid.shape[1])
+        prob = float(flat[idx])
+        slot = {
+            "day": DAY_NAMES[dow],
+            "dow": dow,
+            "hour": hour,
+            "hour_str": format_hour(hour),
+            "probability": prob,
+        }
+        if threshold is not None:
+            slot["label"] = "High" if prob >= threshold else "Low"
+        ranked.append(slot)
+    return ranked
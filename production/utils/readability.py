@@ -0,0 +1,130 @@
+"""
+Readability (Flesch-Kincaid grade) for the reach features
+The textstat implementation is resolved once at import instead of on every
+call. For textstat 0.7.x (pyphen syllables) the same formula is evaluated
+here with per-word syllable counts memoized in a bounded LRU cache, so the
+vocabulary shared across captions - and the 24-hour sweep, which re-scores
+one caption - is hyphenated once. Other textstat versions are called as-is.
+"""
+import math
+import re
+from functools import lru_cache
+
+import numpy as np
+import textstat
+
+import config
+
+
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+SENTENCE_PATTERN = re.compile(r"\b[^.!?]+[.!?]*", re.UNICODE)
+
+
+def _resolve_textstat():
+    """(instance, flesch_kincaid_grade) from whichever textstat API is installed"""
+    fk_fn = getattr(textstat, "flesch_kincaid_grade", None)
+    if callable(fk_fn):
+        return getattr(fk_fn, "__self__", None), fk_fn
+    # fallback to various possible TextStat class locations in different textstat versions
+    TextStatClass = (
+        getattr(textstat, "TextStat", None)
+        or getattr(textstat, "Textstat", None)
+        or getattr(textstat, "textstat", None)
+    )
+    if TextStatClass is None:
+        try:
+            from textstat import textstat as _ttextstat  # type: ignore
+            TextStatClass = getattr(_ttextstat, "TextStat", None) or getattr(_ttextstat, "Textstat", None) or _ttextstat
+        except Exception:
+            TextStatClass = None
+    if TextStatClass is None:
+        return None, None
+    inst = TextStatClass() if callable(TextStatClass) else TextStatClass
+    fk_method = getattr(inst, "flesch_kincaid_grade", None)
+    return inst, fk_method if callable(fk_method) else None
+
+
+TEXTSTAT, TEXTSTAT_FK = _resolve_textstat()
+# textstat 0.7.x counts syllables with pyphen - evaluated locally below
+_PYPHEN = getattr(TEXTSTAT, "pyphen", None)
+
+
+@lru_cache(maxsize=config.READABILITY_SYLLABLE_CACHE)
+def word_syllables(word):
+    """Syllables in one lower-cased, punctuation-free word (pyphen hyphenation points + 1)"""
+    return len(_PYPHEN.positions(word)) + 1
+
+
+def _legacy_round(number, points):
+    """textstat's rounding (half away from zero)"""
+    p = 10 ** points
+    return float(math.floor((number * p) + math.copysign(0.5, number))) / p
+
+
+def _counts(text):
+    """(words, syllables, sentences) exactly as textstat 0.7.x counts them"""
+    words = len(PUNCTUATION_PATTERN.sub("", text).split())
+    syllables = sum(map(word_syllables, PUNCTUATION_PATTERN.sub("", text.lower()).split()))
+    sentences = SENTENCE_PATTERN.findall(text)
+    # Sentences of two words or fewer are not counted
+    short = sum(1 for s in sentences if len(PUNCTUATION_PATTERN.sub("", s).split()) <= 2)
+    return words, syllables, max(1, len(sentences) - short)
+
+
+def _fk_from_counts(words, syllables, sentences):
+    sentence_length = _legacy_round(float(words / sentences), 1)
+    syllables_per_word = _legacy_round(float(syllables) / float(words), 1) if words else 0.0
+    flesch = float(0.39 * sentence_length) + float(11.8 * syllables_per_word) - 15.59
+    return _legacy_round(flesch, 1)
+
+
+def flesch_kincaid_grade(text):
+    """
+    Flesch-Kincaid grade of `text` (same value as textstat.flesch_kincaid_grade)
+    Returns 0.0 if no textstat implementation is available or scoring fails
+    """
+    try:
+        if _PYPHEN is not None:
+            return _fk_from_counts(*_counts(text))
+        if TEXTSTAT_FK is not None:
+            return TEXTSTAT_FK(text)
+    except Exception:
+        pass
+    return 0.0
+
+
+def _round_array(values, points):
+    """_legacy_round over a NumPy array"""
+    p = 10 ** points
+    return np.floor(values * p + np.copysign(0.5, values)) / p
+
+
+def flesch_kincaid_grade_batch(texts):
+    """
+    flesch_kincaid_grade for many texts
+
+    Args:
+        texts: pd.Series or any iterable of strings
+
+    Returns:
+        np.ndarray of float grades, in input order
+    """
+    texts = [str(t) for t in texts]
+    if _PYPHEN is None:
+        return np.array([flesch_kincaid_grade(t) for t in texts], dtype=float)
+
+    counts = np.zeros((len(texts), 3), dtype=np.int64)
+    failed = np.zeros(len(texts), dtype=bool)
+    for row, text in enumerate(texts):
+        try:
+            counts[row] = _counts(text)
+        except Exception:
+            failed[row] = True
+    words, syllables, sentences = counts[:, 0], counts[:, 1], np.maximum(counts[:, 2], 1)
+
+    sentence_length = _round_array(words / sentences, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        syllables_per_word = np.where(words > 0, _round_array(syllables / np.maximum(words, 1), 1), 0.0)
+    grades = _round_array(0.39 * sentence_length + 11.8 * syllables_per_word - 15.59, 1)
+    grades[failed] = 0.0
+    return grades
@@ -1,40 +1,145 @@
 """
 Scheduler utility for managing scheduled posts
 """
-from datetime import datetime
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from itertools import zip_longest
+
+import config
 
 class ScheduledPostManager:
     """Manages scheduled posts and checks when to post them"""
     
     @staticmethod
-    def check_and_post(scheduled_posts, facebook_poster):
+    def publish(post, facebook_poster, now=None):
+        """
+        Publish one due post and record the outcome on the post dict
+        Sets status to 'Posted' (with posted_at / post_id) or 'Failed' (with error)
+        Returns True if the post was published
+        """
+        now = now or datetime.now()
+        try:
+            success, result = facebook_poster.publish_post(message=post['caption'])
+        except Exception as e:
+            success, result = False, {'error': str(e)}
+        
+        if success:
+            post['status'] = 'Posted'
+            post['posted_at'] = now
+            post['post_id'] = result.get('post_id', 'unknown')
+            post.pop('error', None)
+        else:
+            post['status'] = 'Failed'
+            post['error'] = result.get('error', 'Unknown error')
+        return success
+    
+    @staticmethod
+    def publish_bulk(posts, poster_for, max_workers=None, per_page_limit=None, rate_limiter=None, on_result=None):
+        """
+        Publish many due posts concurrently
+        
+        Posts run on a bounded thread pool; at most `per_page_limit` requests
+        are in flight per page. Request budget comes from each poster's keyed
+        per-page / per-token limiter, so no extra global bucket is applied
+        unless `rate_limiter` is given.
+        
+        Args:
+            posts: post dicts to publish (status is updated in place)
+            poster_for: callable post -> FacebookPoster for that post's page
+            rate_limiter: optional extra TokenBucket; a post that cannot get a
+                          token within config.RATE_LIMIT_MAX_WAIT is marked
+                          'Failed' without being sent
+            on_result: optional callback(post, report_row), called from the
+                       calling thread as each post finishes (e.g. to persist it)
+        
+        Returns:
+            List of report rows (one per post, in completion order):
+            {'id', 'page_id', 'success', 'status', 'post_id', 'error', 'elapsed_ms'}
+        """
+        posts = list(posts)
+        if not posts:
+            return []
+        max_workers = max_workers or config.BULK_PUBLISH_WORKERS
+        per_page_limit = per_page_limit or config.BULK_PUBLISH_PER_PAGE
+        
+        # Interleave pages so one busy page does not hold every worker on its semaphore
+        by_page = {}
+        for post in posts:
+            poster = poster_for(post)
+            by_page.setdefault(str(poster.page_id or ''), []).append((post, poster))
+        page_slots = {page_id: threading.Semaphore(per_page_limit) for page_id in by_page}
+        ordered = [item for batch in zip_longest(*by_page.values()) for item in batch if item is not None]
+        
+        def run(post, poster):
+            page_id = str(poster.page_id or '')
+            # Wait for budget before taking a page slot, so a drained bucket never parks the page's workers
+            if rate_limiter is not None and not rate_limiter.acquire(timeout=config.RATE_LIMIT_MAX_WAIT):
+                post['status'] = 'Failed'
+                post['error'] = "Client-side rate limit reached - post was not sent"
+                success, elapsed_ms = False, 0.0
+            else:
+                with page_slots[page_id]:
+                    start = time.perf_counter()
+                    success = ScheduledPostManager.publish(post, poster)
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+            return {
+                'id': post['id'],
+                'page_id': page_id,
+                'success': success,
+                'status': post['status'],
+                'post_id': post.get('post_id') if success else None,
+                'error': post.get('error'),
+                'elapsed_ms': elapsed_ms,
+            }
+        
+        report = []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(ordered))) as pool:
+            futures = {pool.submit(run, post, poster): post for post, poster in ordered}
+            for future in as_completed(futures):
+                row = future.result()
+                report.append(row)
+                if on_result is not None:
+                    on_result(futures[future], row)
+        return report
+    
+    @staticmethod
+    def check_and_post(scheduled_posts, facebook_poster, due_index=None, concurrent=False):
         """
         Check if any scheduled posts are due to be posted
+        
+        Args:
+            scheduled_posts: list of post dicts (or dict of post id -> post)
+            facebook_poster: FacebookPoster used to publish
+            due_index: optional DueIndex over the same posts - only due posts
+                       are visited instead of scanning the whole list. With a
+                       list, the posts come from the index (build it with
+                       DueIndex.from_posts or add(..., post=post))
+            concurrent: publish due posts through publish_bulk
+        
         Returns list of posts that were posted
         """
         posted = []
         now = datetime.now()
         
-        for post in scheduled_posts:
-            if post['status'] == 'Pending':
-                scheduled_dt = post['scheduled_dt']
-                
-                # Check if it's time to post (within 1 minute tolerance)
-                time_diff = (scheduled_dt - now).total_seconds()
-                
-                if time_diff <= 0:  # Time has arrived
-                    try:
-                        success, result = facebook_poster.publish_post(message=post['caption'])
-                        
-                        if success:
-                            post['status'] = 'Posted'
-                            post['posted_at'] = now
-                            post['post_id'] = result.get('post_id', 'unknown')
-                            posted.append(post['id'])
-                    except Exception as e:
-                        post['status'] = 'Failed'
-                        post['error'] = str(e)
+        if due_index is not None:
+            if isinstance(scheduled_posts, dict):
+                due_posts = (scheduled_posts.get(post_id) for post_id in due_index.pop_due(now))
+            else:
+                # The index keeps the post dicts - no id -> post table rebuilt per tick
+                due_posts = due_index.pop_due_posts(now)
+        else:
+            due_posts = (post for post in scheduled_posts if post['scheduled_dt'] <= now)
+        
+        due_posts = [post for post in due_posts if post is not None and post['status'] == 'Pending']
+        if concurrent:
+            report = ScheduledPostManager.publish_bulk(due_posts, lambda post: facebook_poster)
+            return [row['id'] for row in report if row['success']]
+        
+        for post in due_posts:
+            if ScheduledPostManager.publish(post, facebook_poster, now):
+                posted.append(post['id'])
         
         return posted
     
@@ -0,0 +1,286 @@
+"""
+Fast TextBlob-compatible sentiment polarity
+Re-implements TextBlob's default PatternAnalyzer (pattern's English
+tokenizer, en-sentiment lexicon and assessment rules) without building a
+TextBlob per caption. The lexicon is flattened once into
+{word: (polarity, intensity, is_modifier)}, token splitting is memoized and
+only polarity is scored, so results match TextBlob(text).sentiment.polarity.
+
+It builds on textblob's private `_text` module (parity checked against
+textblob 0.17.1 and 0.20.1). get_sentiment_scorer() verifies it against
+TextBlob on probe captions and falls back to TextBlobSentiment if the
+private API is missing, shaped differently or scores differently.
+"""
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+
+# Same mapping and thresholds as the notebooks' get_sentiment
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+
+def polarity_label(polarity):
+    """Map polarity to negative=-1, neutral=0, positive=1"""
+    if polarity > POSITIVE_THRESHOLD:
+        return 1
+    elif polarity < NEGATIVE_THRESHOLD:
+        return -1
+    return 0
+
+
+# Captions exercising negation, modifiers, "!", sarcasm, emoticons and sentence breaks
+_PROBE_CAPTIONS = (
+    "not a good day :(",
+    "Very VERY happy!! Never bad.",
+    "it's \"terribly\" good (!) ... really not great",
+    "I love it.\n\nHated the ending x D",
+)
+
+
+class _PolarityLabels:
+    """label / label_batch on top of a polarity(text) method"""
+
+    def label(self, text):
+        """-1 / 0 / 1 sentiment label (0 if the text cannot be scored)"""
+        try:
+            return polarity_label(self.polarity(text))
+        except Exception:
+            return 0
+
+    def label_batch(self, texts):
+        """
+        Labels for many texts (each distinct text is scored once)
+
+        Args:
+            texts: pd.Series or any iterable of strings
+
+        Returns:
+            np.ndarray of int64 labels, in input order
+        """
+        values = [str(t) for t in texts]
+        labels = {}
+        for text in values:
+            if text not in labels:
+                labels[text] = self.label(text)
+        return np.fromiter((labels[t] for t in values), dtype=np.int64, count=len(values))
+
+
+class TextBlobSentiment(_PolarityLabels):
+    """Fallback scorer: TextBlob(text).sentiment.polarity per call"""
+
+    def __init__(self):
+        from textblob import TextBlob
+
+        self._blob = TextBlob
+        try:
+            from textblob.en import sentiment as pattern_sentiment
+            len(pattern_sentiment)
+            self.lexicon = dict.fromkeys(pattern_sentiment)
+        except Exception:
+            self.lexicon = {}
+
+    def polarity(self, text):
+        return self._blob(str(text)).sentiment.polarity
+
+
+class SentimentScorer(_PolarityLabels):
+    """
+    Polarity scorer with TextBlob's pattern rules and a preloaded lexicon
+
+    Usage:
+    ------
+    scorer = get_sentiment_scorer()
+    scorer.polarity("not a good day :(")     # same as TextBlob(...).sentiment.polarity
+    scorer.label("so happy!")                # -1 / 0 / 1
+    scorer.label_batch(captions)             # np.ndarray of labels
+    """
+
+    def __init__(self, token_cache_size=65536):
+        from textblob import _text
+        from textblob.en import sentiment as pattern_sentiment
+
+        self._text = _text
+        # len() triggers TextBlob's lazy XML load (including its derived "-ly" adverbs)
+        len(pattern_sentiment)
+        modifiers = tuple(pattern_sentiment.modifiers)
+        self.lexicon = {
+            word: (scores[None][0], scores[None][2], any(m in scores for m in modifiers))
+            for word, scores in dict.items(pattern_sentiment)
+            if None in scores
+        }
+        self.negations = frozenset(pattern_sentiment.negations)
+        self.modifier = pattern_sentiment.modifier
+
+        # Lower-cased emoticon -> polarity of the first mood that lists it
+        self.emoticons = {}
+        for (_, polarity), faces in _text.EMOTICONS.items():
+            for face in faces:
+                self.emoticons.setdefault(face.lower(), polarity)
+
+        self._punctuation = tuple(_text.PUNCTUATION.replace(".", ""))
+        self._trailing = self._punctuation + (".",)
+        self._replace = dict(_text.replacements)
+        self._sentence_end = ("...", ".", "!", "?", _text.EOS)
+        self._sentence_tail = ("'", '"', "”", "’", "...", ".", "!", "?", ")", _text.EOS)
+        self._linebreak = _text.re.compile(r"\n{2,}")
+        self._whitespace = _text.re.compile(r"\s+")
+        self._split_token = lru_cache(maxsize=token_cache_size)(self._split_token_uncached)
+
+    # ---------- tokenizer (textblob._text.find_tokens) ----------
+    def _split_token_uncached(self, t):
+        """Split leading / trailing punctuation off one whitespace-delimited token"""
+        _text = self._text
+        tokens, tail = [], []
+        while t.startswith(self._punctuation) and t not in self._replace:
+            tokens.append(t[0])
+            t = t[1:]
+        while t.endswith(self._trailing) and t not in self._replace:
+            if t.endswith(self._punctuation):
+                tail.append(t[-1])
+                t = t[:-1]
+            if t.endswith("..."):
+                tail.append("...")
+                t = t[:-3].rstrip(".")
+            if t.endswith("."):
+                if (t in _text.ABBREVIATIONS or _text.RE_ABBR1.match(t) is not None
+                        or _text.RE_ABBR2.match(t) is not None or _text.RE_ABBR3.match(t) is not None):
+                    break
+                tail.append(t[-1])
+                t = t[:-1]
+        if t != "":
+            tokens.append(t)
+        tokens.extend(reversed(tail))
+        return tuple(tokens)
+
+    def tokenize(self, string):
+        """Lower-cased tokens exactly as PatternAnalyzer assesses them"""
+        if "'" in string:
+            for a, b in self._replace.items():
+                string = string.replace(a, b)
+        for quote in ("“", "”", "‘", "’", "'", '"'):
+            if quote in string:
+                string = string.replace(quote, f" {quote} ")
+        if "\n" in string:
+            string = self._linebreak.sub(f" {self._text.EOS} ", string.replace("\r\n", "\n"))
+
+        tokens = []
+        for raw in string.split():
+            tokens.extend(self._split_token(raw))
+
+        sentence_end = self._sentence_end
+        if any(t in sentence_end for t in tokens):
+            sentences = self._sentences(tokens)
+        else:
+            sentences = [" ".join(tokens)] if tokens else []
+
+        _text = self._text
+        words = []
+        for s in sentences:
+            if "(" in s:
+                s = _text.RE_SARCASM.sub("(!)", s)
+            s = _text.RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), s)
+            words.extend(s.split())
+        return [w.lower() for w in words]
+
+    def _sentences(self, tokens):
+        """Group tokens into sentences (sarcasm / emoticon patterns never cross them)"""
+        eos = self._text.EOS
+        sentence_end, sentence_tail = self._sentence_end, self._sentence_tail
+        sentences, i, j = [[]], 0, 0
+        while j < len(tokens):
+            if tokens[j] in sentence_end:
+                # Handle citations, trailing parenthesis, repeated punctuation (!?)
+                while j < len(tokens) and tokens[j] in sentence_tail:
+                    if tokens[j] in ("'", '"') and sentences[-1].count(tokens[j]) % 2 == 0:
+                        break  # Balanced quotes
+                    j += 1
+                sentences[-1].extend(t for t in tokens[i:j] if t != eos)
+                sentences.append([])
+                i = j
+            j += 1
+        sentences[-1].extend(tokens[i:j])
+        return [" ".join(s) for s in sentences if len(s) > 0]
+
+    # ---------- scoring (textblob._text.Sentiment.assessments) ----------
+    def polarity(self, text):
+        """Polarity in [-1, 1], identical to TextBlob(text).sentiment.polarity"""
+        lexicon, negations, emoticons = self.lexicon, self.negations, self.emoticons
+        punctuation = self._text.PUNCTUATION
+        a = []        # [polarity, intensity, negated] per assessed chunk
+        m = None      # preceding modifier word
+        n = None      # preceding negation
+        for w in self.tokenize(str(text)):
+            entry = lexicon.get(w)
+            if entry is not None:
+                p, i, is_modifier = entry
+                if m is None:
+                    a.append([p, i, 1])
+                else:
+                    last = a[-1]
+                    last[0] = max(-1.0, min(p * last[1], +1.0))
+                    last[1] = i
+                if n is not None:
+                    a[-1][1] = 1.0 / a[-1][1]
+                    a[-1][2] = -1
+                m = w if is_modifier else None
+                n = w if w in negations else None
+            else:
+                if w in negations:
+                    n = w
+                elif n and len(w.strip("'")) > 1:
+                    n = None
+                if n is not None and m is not None and self.modifier(m):
+                    a[-1][2] = -1
+                    n = None
+                elif m and len(w) > 2:
+                    m = None
+                if w == "!" and len(a) > 0:
+                    a[-1][0] = max(-1.0, min(a[-1][0] * 1.25, +1.0))
+                if w == "(!)":
+                    a.append([0.0, 1.0, 1])
+                if w.isalpha() is False and len(w) <= 5 and w not in punctuation:
+                    face = emoticons.get(w)
+                    if face is not None:
+                        a.append([face, 1.0, 1])
+
+        total = 0
+        for p, _, negated in a:
+            # "not good" = slightly bad, "not bad" = slightly good
+            total += p * -0.5 if negated < 0 else p
+        return total / float(len(a) or 1)
+
+    def matches_textblob(self, captions=_PROBE_CAPTIONS):
+        """True if polarity() equals TextBlob(text).sentiment.polarity on every caption"""
+        from textblob import TextBlob
+        return all(self.polarity(c) == TextBlob(c).sentiment.polarity for c in captions)
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_sentiment_scorer():
+    """
+    Process-wide scorer (lexicon loaded once)
+
+    SentimentScorer if it reproduces TextBlob on this textblob version,
+    otherwise TextBlobSentiment
+    """
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                try:
+                    scorer = SentimentScorer()
+                    if not scorer.matches_textblob():
+                        raise ValueError("polarity differs from TextBlob on the probe captions")
+                except Exception as e:
+                    from importlib.metadata import version
+                    print(f"[INFO] Fast sentiment scorer unavailable on textblob {version('textblob')} "
+                          f"({e}) - using TextBlob per caption")
+                    scorer = TextBlobSentiment()
+                _scorer = scorer
+    return _scorer
@@ -0,0 +1,188 @@
+"""
+SQLite backend for PostStorage
+One row per post (full post as JSON plus indexed status / scheduled_dt
+columns), WAL mode so the app and scheduler daemon can read while the other
+writes, and single-row INSERT / UPDATE / DELETE instead of whole-file rewrites.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from utils.post_storage import serialize_post, deserialize_post
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id           INTEGER PRIMARY KEY,
+    status       TEXT NOT NULL DEFAULT 'Pending',
+    scheduled_dt TEXT,
+    data         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posts_status ON posts (status, scheduled_dt);
+CREATE INDEX IF NOT EXISTS idx_posts_scheduled_dt ON posts (scheduled_dt);
+"""
+
+SCHEMA_VERSION = 1
+
+
+def _sort_key(value):
+    """Fixed-width ISO string so scheduled_dt compares correctly as TEXT"""
+    if isinstance(value, datetime):
+        return value.isoformat(sep='T', timespec='microseconds')
+    if isinstance(value, str):
+        return _sort_key(datetime.fromisoformat(value))
+    return None
+
+
+class SqlitePostStore:
+    """
+    Scheduled posts in a SQLite database
+
+    Connections are per thread (Streamlit and the daemon both use threads).
+    `migrate_from` imports an existing scheduled_posts.json the first time the
+    database is created; the JSON file is left untouched.
+    """
+
+    def __init__(self, db_path, migrate_from=None):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        if migrate_from and conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+            self.migrate_json(migrate_from)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit; multi-row changes open their own transaction
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(post):
+        return (
+            post['id'],
+            post.get('status', 'Pending'),
+            _sort_key(post.get('scheduled_dt')),
+            json.dumps(serialize_post(post)),
+        )
+
+    @staticmethod
+    def _posts(rows):
+        return [deserialize_post(json.loads(data)) for (data,) in rows]
+
+    def migrate_json(self, json_path):
+        """Import posts from a scheduled_posts.json file; returns the number imported"""
+        from utils.post_storage import JsonPostStore
+
+        if not os.path.exists(json_path):
+            return 0
+        posts = JsonPostStore(json_path).load_posts()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?)", [self._row(p) for p in posts])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"[OK] Imported {len(posts)} post(s) from {json_path}")
+        return len(posts)
+
+    # ---------- PostStorage backend API ----------
+    def load_posts(self):
+        try:
+            return self._posts(self._conn().execute("SELECT data FROM posts ORDER BY id"))
+        except Exception as e:
+            print(f"Error loading posts: {e}")
+            return []
+
+    def save_posts(self, posts):
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM posts")
+            conn.executemany("INSERT INTO posts VALUES (?, ?, ?, ?)", [self._row(p) for p in posts])
+            conn.execute("COMMIT")
+            return True
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"Error saving posts: {e}")
+            return False
+
+    def add_post(self, post):
+        """Insert a post; with post['id'] None, SQLite assigns the id (set on the dict)"""
+        conn = self._conn()
+        assign_id = post.get('id') is None
+        try:
+            if not assign_id:
+                conn.execute("INSERT INTO posts VALUES (?, ?, ?, ?)", self._row(post))
+                return True
+            # rowid from the insert itself, so concurrent sessions never pick the same id
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute(
+                "INSERT INTO posts (status, scheduled_dt, data) VALUES (?, ?, '{}')", self._row(post)[1:3]
+            )
+            post['id'] = cursor.lastrowid
+            conn.execute("UPDATE posts SET data = ? WHERE id = ?", (self._row(post)[3], post['id']))
+            conn.execute("COMMIT")
+            return True
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if assign_id:
+                post['id'] = None
+            print(f"Error saving post: {e}")
+            return False
+
+    def update_post(self, post_id, updated_post):
+        try:
+            cursor = self._conn().execute(
+                "UPDATE posts SET id = ?, status = ?, scheduled_dt = ?, data = ? WHERE id = ?",
+                self._row(updated_post) + (post_id,),
+            )
+            return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error saving post: {e}")
+            return False
+
+    def delete_post(self, post_id):
+        try:
+            return self._conn().execute("DELETE FROM posts WHERE id = ?", (post_id,)).rowcount > 0
+        except Exception as e:
+            print(f"Error deleting post: {e}")
+            return False
+
+    def get_post(self, post_id):
+        rows = self._conn().execute("SELECT data FROM posts WHERE id = ?", (post_id,)).fetchall()
+        posts = self._posts(rows)
+        return posts[0] if posts else None
+
+    def load_pending(self, due_before=None):
+        if due_before is None:
+            rows = self._conn().execute(
+                "SELECT data FROM posts WHERE status = 'Pending' AND scheduled_dt IS NOT NULL "
+                "ORDER BY scheduled_dt"
+            )
+        else:
+            rows = self._conn().execute(
+                "SELECT data FROM posts WHERE status = 'Pending' AND scheduled_dt <= ? "
+                "ORDER BY scheduled_dt",
+                (_sort_key(due_before),),
+            )
+        return self._posts(rows)
+
+    def next_post_id(self):
+        return self._conn().execute("SELECT COALESCE(MAX(id), 0) + 1 FROM posts").fetchone()[0]
+
+    def change_token(self):
+        # Changes only when another connection commits - our own writes don't count
+        return self._conn().execute("PRAGMA data_version").fetchone()[0]